@@ -4,6 +4,7 @@ Creates a Streamlit powered website
 
 import os
 import pathlib
+import tempfile
 import asyncio
 from pathlib import Path
 import streamlit as st
@@ -16,25 +17,26 @@ from inference.impl.blip2_model import Blip2Model
 from inference.impl.llava_model import LlavaModel
 from vector_store import initialize_chroma_client
 from vector_store import get_chroma_collection
+from vector_store import get_max_batch_size
 from processor.image_processor.compression.img_compressor import compress_to_webP
 from utils.timer import timer_decorator
 from utils.stream import stream_text
 from utils.generate_gif_placeholder import generate_interim_gif
-from processor.video_processor.scene_detector import SceneDetector
-from processor.video_processor.scene_saver import SceneSaver
+from utils.hashtag_index import create_hashtag_index
+from utils.caption_variants import MAX_VARIANTS
 from configuration_manager.config_manager import ConfigManager
 
 
 @timer_decorator
-def load_model(chroma_collection, model_name):
+def load_model(chroma_collection, model_name, max_batch_size):
     """
     Loads the model
     """
     inference: InferenceAbstract = None
     if model_name == "llava":
-        inference: InferenceAbstract = LlavaModel(chroma_collection)
+        inference: InferenceAbstract = LlavaModel(chroma_collection, max_batch_size)
     elif model_name == "blip2":
-        inference: InferenceAbstract = Blip2Model(chroma_collection)
+        inference: InferenceAbstract = Blip2Model(chroma_collection, max_batch_size)
     else:
         raise ValueError(f"Model {model_name} not supported")
 
@@ -61,15 +63,11 @@ def initialize_resources():
             - `chroma_collection` (vector_store.ChromaCollection): A ChromaCollection instance representing the image_caption_vector collection.
 
     """
+    app_config = ConfigManager.get_config_manager().get_app_config()
     chatbot = LLMChatbot()
-    image_caption_gen: CaptionGenerator = ImageCaptionGenerator(chatbot)
-    video_caption_generator: CaptionGenerator = VideoCaptionGenerator(
-        chatbot, SceneDetector(), SceneSaver()
-    )
 
     giphy_image = os.path.join(Path.cwd(), "../resources", "giphy.gif")
 
-    app_config = ConfigManager.get_config_manager().get_app_config()
     model_name = app_config.model_selection.model_name
     chroma_db_config = None
     if model_name == "llava":
@@ -79,10 +77,19 @@ def initialize_resources():
     else:
         raise ValueError(f"Model {model_name} not supported")
 
-    chroma_collection = get_chroma_collection(
-        initialize_chroma_client(), chroma_db_config
+    chroma_client = initialize_chroma_client()
+    chroma_collection = get_chroma_collection(chroma_client, chroma_db_config)
+    inference = load_model(
+        chroma_collection, model_name, get_max_batch_size(chroma_client)
+    )
+
+    hashtag_index = create_hashtag_index(app_config.hashtags)
+    image_caption_gen: CaptionGenerator = ImageCaptionGenerator(
+        chatbot, hashtag_index=hashtag_index
+    )
+    video_caption_generator: CaptionGenerator = VideoCaptionGenerator(
+        chatbot, app_config.video_processing, hashtag_index
     )
-    inference = load_model(chroma_collection, model_name)
     return image_caption_gen, video_caption_generator, giphy_image, inference
 
 
@@ -92,8 +99,11 @@ def save_uploaded_file(uploaded_file, local_directory="temp"):
     Save uploaded file to local directory and return the file path.
     """
     os.makedirs(local_directory, exist_ok=True)
-    file_path = os.path.join(local_directory, uploaded_file.name)
-    with open(file_path, "wb") as f:
+    # A unique name, so concurrent uploads of equally named files do not collide
+    file_descriptor, file_path = tempfile.mkstemp(
+        suffix=f"_{uploaded_file.name}", dir=local_directory
+    )
+    with os.fdopen(file_descriptor, "wb") as f:
         f.write(uploaded_file.getbuffer())
     return file_path
 
@@ -105,8 +115,11 @@ def compress_image(uploaded_file):
     """
     compressed_image = compress_to_webP(uploaded_file.getvalue())
     compressed_file_name = os.path.splitext(uploaded_file.name)[0] + "_compressed.webp"
-    file_path = os.path.join("temp", compressed_file_name)
-    with open(file_path, "wb") as f:
+    os.makedirs("temp", exist_ok=True)
+    file_descriptor, file_path = tempfile.mkstemp(
+        suffix=f"_{compressed_file_name}", dir="temp"
+    )
+    with os.fdopen(file_descriptor, "wb") as f:
         f.write(compressed_image.getbuffer())
     return file_path, compressed_image.getbuffer().nbytes
 
@@ -124,35 +137,30 @@ def process_and_generate_caption(
     """
 
     if file_extension in (".png", ".jpeg", ".jpg"):
-        caption, compressed_image_path = image_caption_gen.generate_caption(
-            file_path,
-            params["caption_size"],
-            params["context"],
-            params["caption_style"],
-            params["influencer_persona"],
-            params["content_type"],
-            params["num_hashtags"],
-            params["tone"],
-            params["social_media"],
-            inference,
-        )
-        asyncio.run(stream_text(caption))
-        st.image(compressed_image_path)
+        caption_generator = image_caption_gen
     elif file_extension in (".mp4", ".mov"):
-        # TODO : Revisit this for lazy loading of video
-        caption = video_caption_generator.generate_caption(
-            file_path,
-            params["caption_size"],
-            params["context"],
-            params["caption_style"],
-            params["influencer_persona"],
-            params["content_type"],
-            params["num_hashtags"],
-            params["tone"],
-            params["social_media"],
-            inference,
-        )
-        asyncio.run(stream_text(caption))
+        caption_generator = video_caption_generator
+    else:
+        return
+
+    # The caption is displayed token by token while the chatbot writes it
+    caption = caption_generator.generate_caption_stream(
+        file_path,
+        params["caption_size"],
+        params["context"],
+        params["caption_style"],
+        params["content_type"],
+        params["influencer_persona"],
+        params["num_hashtags"],
+        params["tone"],
+        params["social_media"],
+        inference,
+        num_variants=params["num_variants"],
+    )
+    asyncio.run(stream_text(caption))
+    if caption_generator is image_caption_gen:
+        st.image(file_path)
+    else:
         st.video(file_path)
 
 
@@ -318,6 +326,12 @@ def app():
 
     context = st.text_area("Write your context here...")
     num_hashtags = st.number_input("How many hashtags do you want to add?", step=1)
+    num_variants = st.number_input(
+        "How many caption variants do you want to compare?",
+        min_value=1,
+        max_value=MAX_VARIANTS,
+        step=1,
+    )
     generate_interim_gif(giphy_image)
     if st.button("Generate Caption"):
         if uploaded_file is None:
@@ -334,6 +348,7 @@ def app():
                     "influencer_persona": influencer,
                     "context": context,
                     "num_hashtags": num_hashtags,
+                    "num_variants": num_variants,
                     "tone": tone,
                     "social_media": social_media,
                 },
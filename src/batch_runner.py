@@ -0,0 +1,301 @@
+"""
+Captions a directory or manifest of images and videos without a browser.
+
+Usage (from the src directory):
+    python batch_runner.py archive/ --output captions.jsonl --workers 4 --tone casual
+    python batch_runner.py manifest.jsonl --output captions.jsonl
+
+A manifest is either a text file with one path per line or a JSON lines
+file whose objects hold a "path" and optionally per-file caption
+parameters. Results are appended to the output file as JSON lines, one per
+file. The output doubles as the checkpoint: rerunning the same command
+skips every file that already has a caption, so an interrupted run resumes
+where it stopped and failed files are retried.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from captioning.impl.image_caption_generator import ImageCaptionGenerator
+from captioning.impl.video_caption_generator import VideoCaptionGenerator
+from configuration_manager.config_manager import ConfigManager
+from inference.model_factory import create_inference
+from llm_chatbot import LLMChatbot
+from utils.caption_variants import MAX_VARIANTS, parse_variants
+from utils.hashtag_index import create_hashtag_index
+from utils.logger import log
+
+IMAGE_EXTENSIONS = (".png", ".jpeg", ".jpg")
+VIDEO_EXTENSIONS = (".mp4", ".mov")
+CAPTION_PARAMETERS = (
+    "caption_size",
+    "context",
+    "caption_style",
+    "content_type",
+    "influencer_persona",
+    "num_hashtags",
+    "tone",
+    "social_media",
+    "num_variants",
+)
+
+
+def find_media(input_path):
+    """
+    Lists the images and videos to caption.
+
+    Args:
+        input_path (str): A directory, searched recursively, or a manifest.
+
+    Returns:
+        list: One dict per file with its "path" and any per-file parameters.
+    """
+    if os.path.isdir(input_path):
+        items = []
+        for root, _, files in os.walk(input_path):
+            for name in files:
+                if name.lower().endswith(IMAGE_EXTENSIONS + VIDEO_EXTENSIONS):
+                    items.append({"path": os.path.join(root, name)})
+        return sorted(items, key=lambda item: item["path"])
+
+    manifest_dir = os.path.dirname(os.path.abspath(input_path))
+    items = []
+    with open(input_path, "r", encoding="utf-8") as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line) if line.startswith("{") else {"path": line}
+            item["path"] = os.path.join(manifest_dir, item["path"])
+            items.append(item)
+    return items
+
+
+def load_completed(output_path):
+    """
+    Returns the files that already have a caption in the output.
+
+    Args:
+        output_path (str): The JSON lines output of earlier runs.
+
+    Returns:
+        set: The paths of the captioned files.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, "r", encoding="utf-8") as output:
+        for line in output:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # The last line of an interrupted run may be incomplete
+                continue
+            if "caption" in record:
+                completed.add(record["path"])
+    return completed
+
+
+def _ends_with_newline(path):
+    """Tells whether a non-empty file ends with a line break."""
+    with open(path, "rb") as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) == b"\n"
+
+
+def collect_stream(response):
+    """
+    Joins a streamed chat response into one string.
+
+    Args:
+        response: A chat response, or an iterable of streamed chunks.
+
+    Returns:
+        str: The full message content.
+    """
+    if isinstance(response, dict):
+        return response["message"]["content"]
+    return "".join(chunk["message"]["content"] for chunk in response)
+
+
+class BatchRunner:
+    """
+    Captions many files with a pool of worker threads.
+
+    The vision model is shared by all workers, which take turns on it,
+    while video decoding, prompt building and LLM calls run in parallel.
+
+    Attributes:
+        image_caption_generator (ImageCaptionGenerator): Captions images.
+        video_caption_generator (VideoCaptionGenerator): Captions videos.
+        inference (InferenceAbstract): The vision model.
+        output_path (str): The JSON lines output and checkpoint.
+        workers (int): Number of files captioned at the same time.
+    """
+
+    def __init__(
+        self,
+        image_caption_generator,
+        video_caption_generator,
+        inference,
+        output_path,
+        workers=1,
+    ):
+        self.image_caption_generator = image_caption_generator
+        self.video_caption_generator = video_caption_generator
+        self.inference = inference
+        self.output_path = output_path
+        self.workers = workers
+
+    def caption_item(self, item, params):
+        """
+        Captions one file.
+
+        Args:
+            item (dict): The "path" of the file and per-file parameters.
+            params (dict): The default caption parameters.
+
+        Returns:
+            dict: The output record, with a "caption" or an "error".
+        """
+        path = item["path"]
+        params = {
+            **params,
+            **{key: item[key] for key in CAPTION_PARAMETERS if key in item},
+        }
+        extension = os.path.splitext(path)[1].lower()
+        try:
+            if extension in IMAGE_EXTENSIONS:
+                generator = self.image_caption_generator
+            elif extension in VIDEO_EXTENSIONS:
+                generator = self.video_caption_generator
+            else:
+                raise ValueError(f"Unsupported file type {extension}")
+            response = generator.generate_caption(
+                path,
+                params["caption_size"],
+                params["context"],
+                params["caption_style"],
+                params["content_type"],
+                params["influencer_persona"],
+                params["num_hashtags"],
+                params["tone"],
+                params["social_media"],
+                self.inference,
+                num_variants=params["num_variants"],
+            )
+            if isinstance(response, tuple):
+                # Image captions come with the path of the compressed image
+                response = response[0]
+            caption = collect_stream(response)
+            record = {"path": path, "caption": caption}
+            if params["num_variants"] > 1:
+                record["variants"] = parse_variants(caption)
+            return record
+        except Exception as e:
+            log.error(f"Failed to caption {path}: {e}")
+            return {"path": path, "error": str(e)}
+
+    def run(self, items, params):
+        """
+        Captions every file that has no caption in the output yet.
+
+        Every result is appended and flushed as soon as it is ready, so an
+        interrupted run loses at most the files being captioned.
+
+        Args:
+            items (list): The files, as returned by `find_media`.
+            params (dict): The default caption parameters.
+
+        Returns:
+            dict: The number of files skipped, captioned and failed.
+        """
+        completed = load_completed(self.output_path)
+        pending = [item for item in items if item["path"] not in completed]
+        summary = {"skipped": len(items) - len(pending), "captioned": 0, "failed": 0}
+        log.info(
+            f"Captioning {len(pending)} file(s), {summary['skipped']} already done."
+        )
+        if not pending:
+            return summary
+
+        output_dir = os.path.dirname(os.path.abspath(self.output_path))
+        os.makedirs(output_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor, open(
+            self.output_path, "a", encoding="utf-8"
+        ) as output:
+            if output.tell() and not _ends_with_newline(self.output_path):
+                # Start after the line an interrupted run left unfinished
+                output.write("\n")
+            futures = [
+                executor.submit(self.caption_item, item, params) for item in pending
+            ]
+            for future in as_completed(futures):
+                record = future.result()
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+                summary["failed" if "error" in record else "captioned"] += 1
+        return summary
+
+
+def parse_args(argv=None):
+    """Parses the command line."""
+    parser = argparse.ArgumentParser(
+        description="Caption a directory or manifest of images and videos."
+    )
+    parser.add_argument("input", help="A directory or a manifest file.")
+    parser.add_argument(
+        "--output", default="captions.jsonl", help="JSON lines output and checkpoint."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=2, help="Files captioned at the same time."
+    )
+    parser.add_argument("--caption-size", default="small")
+    parser.add_argument("--context", default="")
+    parser.add_argument("--caption-style", default="informative")
+    parser.add_argument("--content-type", default="image")
+    parser.add_argument("--influencer-persona", default="general")
+    parser.add_argument("--num-hashtags", type=int, default=0)
+    parser.add_argument("--tone", default="casual")
+    parser.add_argument("--social-media", default="Instagram")
+    parser.add_argument(
+        "--num-variants",
+        type=int,
+        default=1,
+        help=f"Alternative captions per file, written in one request (1-{MAX_VARIANTS}).",
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be a positive integer")
+    if not 1 <= args.num_variants <= MAX_VARIANTS:
+        parser.error(f"--num-variants must be between 1 and {MAX_VARIANTS}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    params = {key: getattr(args, key) for key in CAPTION_PARAMETERS}
+    items = find_media(args.input)
+
+    app_config = ConfigManager.get_config_manager().get_app_config()
+    chatbot = LLMChatbot()
+    hashtag_index = create_hashtag_index(app_config.hashtags)
+    runner = BatchRunner(
+        ImageCaptionGenerator(chatbot, hashtag_index=hashtag_index),
+        VideoCaptionGenerator(chatbot, app_config.video_processing, hashtag_index),
+        create_inference(app_config),
+        args.output,
+        args.workers,
+    )
+    summary = runner.run(items, params)
+    log.info(
+        f"Captioned {summary['captioned']}, failed {summary['failed']}, "
+        f"skipped {summary['skipped']} file(s)."
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
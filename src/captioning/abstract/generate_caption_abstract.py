@@ -4,7 +4,9 @@ Returns:
     str: Caption
 """
 
+import asyncio
 from abc import ABC, abstractmethod
+from utils.caption_variants import parse_variants, variant_instructions
 from utils.hashtag import Hashtag
 from prompt_processor.prompt_factory import PromptFactory
 
@@ -14,8 +16,15 @@ class CaptionGenerator(ABC):
     Abstract base class for generating captions for images or videos.
     """
 
-    def __init__(self, chatbot):
+    def __init__(self, chatbot, hashtag_index=None):
+        """
+        Args:
+            chatbot (LLMChatbot): The chatbot writing the caption.
+            hashtag_index (HashtagIndex): Suggests hashtags from earlier
+                captions and learns from every new one. Optional.
+        """
         self.chatbot = chatbot
+        self.hashtag_index = hashtag_index
 
     @abstractmethod
     def generate_caption(
@@ -63,12 +72,184 @@ class CaptionGenerator(ABC):
 
         return prompt
 
-    def _generate_caption_with_hashtags(self, content, num_hashtags):
+    @abstractmethod
+    def get_visual_description(self, media_path, inference):
         """
-        Generates a caption with hashtags.
+        Describes what is shown in a media file with the vision model.
+
+        Args:
+            media_path (str): The path of the image or video.
+            inference (InferenceAbstract): The captioning model.
+
+        Returns:
+            str: The visual description the caption prompt is built from.
         """
-        hashtag = Hashtag(content, self.chatbot)
-        stream_caption = self.chatbot.get_response(
-            hashtag.generate_hashtagged_caption(num_hashtags), True
+        pass
+
+    async def generate_caption_stream(
+        self,
+        media_path,
+        caption_size,
+        context,
+        style,
+        content_type,
+        influencer,
+        num_hashtags,
+        tone,
+        social_media,
+        inference=None,
+        num_variants=1,
+    ):
+        """
+        Streams the caption of a media file as the chatbot writes it.
+
+        The vision model and the prompt run in a worker thread, so the event
+        loop stays free to update the UI, and every chunk of the chatbot
+        response is yielded the moment it arrives. Hashtags the caption is
+        missing are only looked up once it is complete and arrive as a last
+        chunk. With `num_variants` above 1 the chatbot writes that many
+        alternative captions in the same response, each under a
+        '### Variant N' heading.
+
+        Yields:
+            dict: The chunks of the chatbot response.
+        """
+        variants_prompt = variant_instructions(num_variants)
+
+        def build_prompt():
+            imagetotext = self.get_visual_description(media_path, inference)
+            prompt = self.generate_content_new(
+                imagetotext,
+                caption_size,
+                context,
+                style,
+                tone,
+                content_type,
+                influencer,
+                num_hashtags,
+                social_media,
+            )
+            return prompt, f"{imagetotext} {context}"
+
+        prompt, topic = await asyncio.to_thread(build_prompt)
+        parts = []
+        async for chunk in self.chatbot.get_response_async(prompt + variants_prompt):
+            parts.append(chunk["message"]["content"])
+            yield chunk
+        caption = "".join(parts)
+        suffix = await asyncio.to_thread(
+            self._missing_hashtags, caption, num_hashtags, num_variants, topic
         )
-        return stream_caption
+        if suffix:
+            yield {"message": {"role": "assistant", "content": suffix}}
+        self._remember_caption(caption + suffix)
+
+    def write_caption(
+        self,
+        imagetotext,
+        caption_size,
+        context,
+        style,
+        content_type,
+        influencer,
+        num_hashtags,
+        tone,
+        social_media,
+        stream=True,
+        num_variants=1,
+    ):
+        """
+        Writes the caption of a visual description with the chatbot.
+
+        Returns:
+            The chatbot response, as a stream unless `stream` is False. It
+            holds `num_variants` labelled captions, see `parse_variants`.
+        """
+        content = self.generate_content_new(
+            imagetotext,
+            caption_size,
+            context,
+            style,
+            tone,
+            content_type,
+            influencer,
+            num_hashtags,
+            social_media,
+        )
+        return self._generate_caption_with_hashtags(
+            content, num_hashtags, stream, num_variants, f"{imagetotext} {context}"
+        )
+
+    def _generate_caption_with_hashtags(
+        self, content, num_hashtags, stream=True, num_variants=1, topic=None
+    ):
+        """
+        Generates a caption with hashtags, streamed unless `stream` is False.
+
+        The prompt is sent unchanged, it already asks for `num_hashtags`
+        hashtags. Only if the finished caption has fewer, the missing ones
+        are appended after its text, so they never delay the first token.
+        With `num_variants` above 1 the response holds that many labelled
+        captions, written in a single chatbot call. `topic`, the visual
+        description and context, is what earlier captions' hashtags are
+        matched against.
+        """
+        response = self.chatbot.get_response(
+            content + variant_instructions(num_variants), stream
+        )
+        if stream:
+            return self._finish_streamed_caption(
+                response, num_hashtags, num_variants, topic
+            )
+        caption = response["message"]["content"]
+        caption += self._missing_hashtags(caption, num_hashtags, num_variants, topic)
+        self._remember_caption(caption)
+        # Coalesced requests share the response object, so it is not modified
+        return {"message": {"role": "assistant", "content": caption}, "done": True}
+
+    def _finish_streamed_caption(
+        self, stream_caption, num_hashtags, num_variants, topic=None
+    ):
+        """
+        Passes a caption stream through, adds the missing hashtags as a last
+        chunk and remembers the full caption.
+        """
+        parts = []
+        for chunk in stream_caption:
+            parts.append(chunk["message"]["content"])
+            yield chunk
+        caption = "".join(parts)
+        suffix = self._missing_hashtags(caption, num_hashtags, num_variants, topic)
+        if suffix:
+            yield {"message": {"role": "assistant", "content": suffix}}
+        self._remember_caption(caption + suffix)
+
+    def _missing_hashtags(self, caption, num_hashtags, num_variants=1, topic=None):
+        """
+        Returns the text to append to a finished caption that has fewer than
+        `num_hashtags` hashtags.
+
+        Captions written as several variants are left as they are, since
+        appended hashtags would only reach the last variant.
+        """
+        if num_hashtags <= 0 or num_variants > 1:
+            return ""
+        hashtag = Hashtag(
+            caption, self.chatbot, hashtag_index=self.hashtag_index, topic=topic
+        )
+        missing = hashtag.generate_missing_hashtags(num_hashtags)
+        if not missing:
+            return ""
+        if not hashtag.parse_hashtags()[1]:
+            separator = "\n\n"
+        elif caption[-1:].isspace():
+            separator = ""
+        else:
+            separator = " "
+        return separator + " ".join(missing)
+
+    def _remember_caption(self, caption):
+        """Adds the hashtags of a finished caption to the hashtag index."""
+        if self.hashtag_index is not None:
+            for variant in parse_variants(caption):
+                self.hashtag_index.add_caption(variant)
@@ -1,12 +1,30 @@
 from captioning.abstract.generate_caption_abstract import CaptionGenerator
 from inference.abstract.inference_abstract import InferenceAbstract
+from utils.description_cache import VisualDescriptionCache
+from utils.file_hash import compute_file_hash
 
 
 class ImageCaptionGenerator(CaptionGenerator):
     """
     A class that generates captions for images using a chatbot.
+
+    The visual description of every image is cached by image content and
+    model, so regenerating a caption with another tone, style, platform or
+    number of hashtags does not run the vision model again.
     """
 
+    def __init__(self, chatbot, description_cache_size=256, hashtag_index=None):
+        """
+        Initializes the generator.
+
+        Args:
+            chatbot (LLMChatbot): The chatbot writing the caption.
+            description_cache_size (int): Visual descriptions kept in memory.
+            hashtag_index (HashtagIndex): Hashtags of earlier captions.
+        """
+        super().__init__(chatbot, hashtag_index)
+        self.description_cache = VisualDescriptionCache(description_cache_size)
+
     def generate_caption(
         self,
         image_path,
@@ -19,6 +37,7 @@ class ImageCaptionGenerator(CaptionGenerator):
         tone,
         social_media,
         inference: InferenceAbstract = None,
+        num_variants=1,
     ):
         """
         Generates a caption for an image using the chatbot object.
@@ -29,23 +48,49 @@ class ImageCaptionGenerator(CaptionGenerator):
         - context (str): The context in which the caption is to be written.
         - style (str): The style in which the caption is to be written.
         - num_hashtags (int): The number of hashtags to be included in the caption.
+        - num_variants (int): The number of alternative captions written in one request.
 
         Returns:
         - response_json (JSON object): The JSON object containing the generated caption.
         - compressed_image_path (str): The path of the compressed image used for generating the caption.
         """
         compressed_image_path = image_path
-        imagetotext = inference.get_image_caption_pipeline(image_path)
-        content = self.generate_content_new(
+        imagetotext = self.describe_image(image_path, inference)
+        stream_caption = self.write_caption(
             imagetotext,
             caption_size,
             context,
             style,
-            tone,
             content_type,
             influencer,
             num_hashtags,
+            tone,
             social_media,
+            num_variants=num_variants,
         )
-        stream_caption = self._generate_caption_with_hashtags(content, num_hashtags)
         return stream_caption, compressed_image_path
+
+    def describe_image(self, image_path, inference):
+        """
+        Returns the visual description of an image, running the model only
+        for content it has not described before.
+
+        Args:
+        - image_path (str): The path of the image.
+        - inference (InferenceAbstract): The captioning model.
+
+        Returns:
+        - imagetotext (str): The visual description of the image.
+        """
+        key = (compute_file_hash(image_path), type(inference).__name__)
+        imagetotext = self.description_cache.get(key)
+        if imagetotext is None:
+            imagetotext = inference.get_image_caption_pipeline(image_path)
+            self.description_cache.set(key, imagetotext)
+        return imagetotext
+
+    def get_visual_description(self, media_path, inference):
+        """
+        Returns the visual description of an image.
+        """
+        return self.describe_image(media_path, inference)
@@ -1,21 +1,68 @@
 """A class that generates captions for videos using a chatbot."""
 
 import os
-import shutil
+import tempfile
+from dataclasses import asdict
 from captioning.abstract.generate_caption_abstract import CaptionGenerator
+from configuration_manager.config_manager import ConfigManager
 from inference.abstract.inference_abstract import InferenceAbstract
 from processor.video_processor import VideoProcessor
+from processor.video_processor import SceneSaver
+from processor.video_processor import SceneDeduplicator
+from processor.video_processor import create_scene_detector
+from processor.video_processor import iter_scene_batches
+from processor.video_processor import scene_to_image
+from utils.caption_compactor import compact_captions
+from utils.file_hash import compute_file_hash
+from utils.logger import log
+from utils.video_cache import VideoCaptionCache
+
+# Settings that do not change which scenes are detected or how they are captioned
+_UNCACHED_SETTINGS = (
+    "save_scenes_to_disk",
+    "scenes_dir",
+    "scene_queue_size",
+    "caption_token_budget",
+    "cache_enabled",
+    "cache_dir",
+    "cache_max_entries",
+)
 
 
 class VideoCaptionGenerator(CaptionGenerator):
     """
     A class that generates captions for videos using a chatbot.
+
+    Scenes are captioned in memory while the rest of the video is still
+    being decoded. Look-alike scenes are captioned once and the number of
+    captioned scenes per video is capped, and the scene captions are
+    compacted to a token budget before the prompt is built. The scene
+    captions of every video are cached by content hash, so regenerating a
+    caption with another tone or style only reruns the LLM. Every call gets
+    its own scene detector, and in the disk debug mode its own scenes
+    directory, so several videos can be captioned at the same time.
     """
 
-    def __init__(self, chatbot, scene_detector, scene_saver):
-        super().__init__(chatbot)
-        self.scene_detector = scene_detector
-        self.scene_saver = scene_saver
+    def __init__(self, chatbot, video_config=None, hashtag_index=None):
+        """
+        Initializes the generator.
+
+        Args:
+            chatbot (LLMChatbot): The chatbot writing the caption.
+            video_config (VideoProcessingConfig): The video processing
+                settings. Read from the configuration file if omitted.
+            hashtag_index (HashtagIndex): Hashtags of earlier captions.
+        """
+        super().__init__(chatbot, hashtag_index)
+        if video_config is None:
+            app_config = ConfigManager.get_config_manager().get_app_config()
+            video_config = app_config.video_processing
+        self.video_config = video_config
+        self.cache = None
+        if video_config.cache_enabled:
+            self.cache = VideoCaptionCache(
+                video_config.cache_dir, video_config.cache_max_entries
+            )
 
     def generate_caption(
         self,
@@ -29,6 +76,7 @@ class VideoCaptionGenerator(CaptionGenerator):
         tone,
         social_media,
         inference: InferenceAbstract = None,
+        num_variants=1,
     ):
         """
         Generate a caption for a video using a chatbot.
@@ -41,37 +89,161 @@ class VideoCaptionGenerator(CaptionGenerator):
             style (str): The style in which the caption should be written.
             num_hashtags (int): The number of hashtags to include in the caption.
             tone (string): Caption tone.
+            num_variants (int): Number of alternative captions written in one request.
 
         Returns:
             dict: A JSON object containing the response from the chatbot.
         """
+        all_captions = self.get_visual_description(video_path, inference)
 
-        scene_dir = "extracted_images"
-        os.makedirs(scene_dir, exist_ok=True)
-        vid_processor = VideoProcessor(
-            video_path, self.scene_detector, self.scene_saver
-        )
-        vid_processor.detect_scenes()
-        image_list = os.listdir(scene_dir)
-        all_captions = ""
-
-        for each_image in image_list:
-            text = inference.get_image_caption_pipeline(
-                os.path.join(scene_dir, each_image)
-            )
-            all_captions += " " + text
-
-        content = self.generate_content_new(
+        stream_caption = self.write_caption(
             all_captions,
             caption_size,
             context,
             style,
-            tone,
             content_type,
             influencer,
             num_hashtags,
+            tone,
             social_media,
+            num_variants=num_variants,
         )
-        stream_caption = self._generate_caption_with_hashtags(content, num_hashtags)
-        shutil.rmtree(scene_dir, ignore_errors=True)
         return stream_caption
+
+    def get_visual_description(self, media_path, inference):
+        """
+        Returns the scene captions of a video, compacted to the token budget.
+        """
+        return compact_captions(
+            [scene["caption"] for scene in self.describe_video(media_path, inference)],
+            token_budget=self.video_config.caption_token_budget,
+        )
+
+    def describe_video(self, video_path, inference):
+        """
+        Detects the scenes of a video and captions them.
+
+        The scene detector and scene saver are created for this call only and
+        are dropped afterwards, so concurrent calls never share state. If the
+        same file was described before with the same settings and model, the
+        cached scenes are returned without decoding the video.
+
+        Args:
+            video_path (str): The path to the video file.
+            inference (InferenceAbstract): The captioning model.
+
+        Returns:
+            list: One dict per scene with its `timestamp` in seconds and its
+            `caption`, in video order.
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(
+                compute_file_hash(video_path), self.get_cache_settings(inference)
+            )
+            scenes = self.cache.get(cache_key)
+            if scenes is not None:
+                log.info(f"Reusing the {len(scenes)} cached scene(s) of {video_path}.")
+                return scenes
+
+        vid_processor = VideoProcessor(
+            video_path,
+            create_scene_detector(self.video_config),
+            self.create_scene_saver(),
+            sampler=self.video_config.sampler,
+            num_workers=self.video_config.num_workers,
+            parallel_min_duration=self.video_config.parallel_min_duration,
+        )
+        deduplicator = SceneDeduplicator(
+            max_distance=self.video_config.scene_dedup_distance,
+            max_scenes=self.video_config.max_scenes_per_video,
+        )
+        captions = self.caption_scenes(
+            vid_processor,
+            inference,
+            self.video_config.scene_queue_size,
+            deduplicator,
+        )
+        fps = vid_processor.fps
+        scenes = [
+            {"timestamp": frame_index / fps if fps else None, "caption": caption}
+            for frame_index, caption in captions
+        ]
+        if cache_key is not None:
+            self.cache.set(cache_key, scenes)
+        return scenes
+
+    def get_cache_settings(self, inference):
+        """
+        Returns the settings a cached video description depends on.
+
+        Args:
+            inference (InferenceAbstract): The captioning model.
+
+        Returns:
+            dict: The scene detection settings and the captioning model.
+        """
+        settings = {
+            key: value
+            for key, value in asdict(self.video_config).items()
+            if key not in _UNCACHED_SETTINGS
+        }
+        settings["model"] = type(inference).__name__
+        return settings
+
+    def create_scene_saver(self):
+        """
+        Creates the scene saver of one request.
+
+        Returns:
+            SceneSaver or None: A saver writing to a new directory below
+            `scenes_dir` in the disk debug mode, None otherwise.
+        """
+        if not self.video_config.save_scenes_to_disk:
+            return None
+        os.makedirs(self.video_config.scenes_dir, exist_ok=True)
+        return SceneSaver(
+            tempfile.mkdtemp(prefix="scenes_", dir=self.video_config.scenes_dir)
+        )
+
+    @staticmethod
+    def caption_scenes(vid_processor, inference, max_queue_size=16, deduplicator=None):
+        """
+        Captions the scenes of a video while they are being detected.
+
+        Scene detection runs in a background thread and feeds a bounded
+        queue; every batch of scenes waiting in the queue is captioned with
+        one `caption_batch` call, so decoding and inference overlap. Scenes
+        are not kept once captioned, apart from the scene saver of the disk
+        debug mode, which lives as long as the request.
+
+        Args:
+            vid_processor (VideoProcessor): The processor of the video.
+            inference (InferenceAbstract): The captioning model.
+            max_queue_size (int): Scenes that can wait for the model.
+            deduplicator (SceneDeduplicator): Optionally drops look-alike
+                scenes, and scenes beyond its cap, before they are queued.
+
+        Returns:
+            list: (frame_index, caption) of every scene, in video order.
+        """
+        scene_saver = vid_processor.scene_saver
+        scenes = vid_processor.iter_scenes()
+        if deduplicator is not None:
+            scenes = deduplicator.filter(scenes, vid_processor.get_frame_count())
+        captions = []
+        for batch in iter_scene_batches(
+            scenes,
+            batch_size=inference.DEFAULT_BATCH_SIZE,
+            max_queue_size=max_queue_size,
+        ):
+            if scene_saver is not None:
+                for _, scene in batch:
+                    scene_saver.save_scene(scene)
+            batch_captions = inference.caption_batch(
+                [scene_to_image(scene) for _, scene in batch]
+            )
+            captions.extend(
+                zip([frame_index for frame_index, _ in batch], batch_captions)
+            )
+        return captions
@@ -7,6 +7,9 @@ from .config_models import (
     Variants,
     ModelSelectionConfig,
     ChromaDBConfig,
+    VideoProcessingConfig,
+    ServerConfig,
+    HashtagConfig,
 )
 
 __all__ = [
@@ -20,4 +23,7 @@ __all__ = [
     "Variants",
     "ModelSelectionConfig",
     "ChromaDBConfig",
+    "VideoProcessingConfig",
+    "ServerConfig",
+    "HashtagConfig",
 ]
@@ -14,6 +14,9 @@ from configuration_manager.config_models import (
     TransformConfig,
     ModelSelectionConfig,
     ChromaDBConfig,
+    VideoProcessingConfig,
+    ServerConfig,
+    HashtagConfig,
 )
 
 from datetime import datetime
@@ -30,6 +33,11 @@ class AppConfig:
     transform_config: TransformConfig = field(default_factory=TransformConfig)
     model_selection: ModelSelectionConfig = field(default_factory=ModelSelectionConfig)
     chroma_db: ChromaDBConfig = field(default_factory=ChromaDBConfig)
+    video_processing: VideoProcessingConfig = field(
+        default_factory=VideoProcessingConfig
+    )
+    server: ServerConfig = field(default_factory=ServerConfig)
+    hashtags: HashtagConfig = field(default_factory=HashtagConfig)
 
     def validate(self):
         """
@@ -87,6 +95,44 @@ class AppConfig:
 
         if not isinstance(self.ollama.stream, bool):
             raise ValueError("The 'stream' field in ollama must be a boolean.")
+        if not isinstance(self.ollama.host, str):
+            raise ValueError("The 'host' field in OllamaConfig must be a string.")
+        if (
+            not isinstance(self.ollama.max_concurrent_requests, int)
+            or self.ollama.max_concurrent_requests < 1
+        ):
+            raise ValueError(
+                "The 'max_concurrent_requests' field in OllamaConfig must be a positive integer."
+            )
+        if (
+            not isinstance(self.ollama.request_timeout, float)
+            or self.ollama.request_timeout <= 0
+        ):
+            raise ValueError(
+                "The 'request_timeout' field in OllamaConfig must be a positive float."
+            )
+        if not isinstance(self.ollama.max_retries, int) or self.ollama.max_retries < 0:
+            raise ValueError(
+                "The 'max_retries' field in OllamaConfig must be a non-negative integer."
+            )
+        for field_name in ("cache_enabled", "cache_nonzero_temperature"):
+            if not isinstance(getattr(self.ollama, field_name), bool):
+                raise ValueError(
+                    f"The '{field_name}' field in OllamaConfig must be a boolean."
+                )
+        if (
+            not isinstance(self.ollama.cache_max_entries, int)
+            or self.ollama.cache_max_entries < 1
+        ):
+            raise ValueError(
+                "The 'cache_max_entries' field in OllamaConfig must be a positive integer."
+            )
+        if not isinstance(self.ollama.cache_ttl, float) or self.ollama.cache_ttl < 0:
+            raise ValueError(
+                "The 'cache_ttl' field in OllamaConfig must be a non-negative float."
+            )
+        if not isinstance(self.ollama.cache_path, str):
+            raise ValueError("The 'cache_path' field in OllamaConfig must be a string.")
 
         # Validate ImageCompressionConfig
         if (
@@ -128,6 +174,173 @@ class AppConfig:
             raise ValueError(
                 "The 'llava' field in ChromaDBConfig must be a non-empty string."
             )
+        if self.chroma_db.embedding_mode not in ("raw", "compact"):
+            raise ValueError(
+                "The 'embedding_mode' field in ChromaDBConfig must be 'raw' or 'compact'."
+            )
+        if (
+            not isinstance(self.chroma_db.embedding_size, int)
+            or self.chroma_db.embedding_size < 1
+        ):
+            raise ValueError(
+                "The 'embedding_size' field in ChromaDBConfig must be a positive integer."
+            )
+        if (
+            not isinstance(self.chroma_db.near_duplicate_distance, int)
+            or self.chroma_db.near_duplicate_distance < 0
+        ):
+            raise ValueError(
+                "The 'near_duplicate_distance' field in ChromaDBConfig must be a non-negative integer."
+            )
+        if (
+            not isinstance(self.chroma_db.near_duplicate_min_bits, int)
+            or self.chroma_db.near_duplicate_min_bits < 0
+        ):
+            raise ValueError(
+                "The 'near_duplicate_min_bits' field in ChromaDBConfig must be a non-negative integer."
+            )
+        for field_name in ("write_queue_size", "write_batch_size"):
+            value = getattr(self.chroma_db, field_name)
+            if not isinstance(value, int) or value < 1:
+                raise ValueError(
+                    f"The '{field_name}' field in ChromaDBConfig must be a positive integer."
+                )
+        # Validate video_processing config
+        if self.video_processing.sampler not in ("grab", "seek"):
+            raise ValueError(
+                "The 'sampler' field in VideoProcessingConfig must be 'grab' or 'seek'."
+            )
+        if (
+            not isinstance(self.video_processing.num_workers, int)
+            or self.video_processing.num_workers < 0
+        ):
+            raise ValueError(
+                "The 'num_workers' field in VideoProcessingConfig must be a non-negative integer."
+            )
+        if (
+            not isinstance(self.video_processing.parallel_min_duration, float)
+            or self.video_processing.parallel_min_duration < 0
+        ):
+            raise ValueError(
+                "The 'parallel_min_duration' field in VideoProcessingConfig must be a non-negative float."
+            )
+        if self.video_processing.scene_detector not in (
+            "mean_diff",
+            "adaptive",
+            "histogram",
+        ):
+            raise ValueError(
+                "The 'scene_detector' field in VideoProcessingConfig must be 'mean_diff', 'adaptive' or 'histogram'."
+            )
+        if (
+            not isinstance(self.video_processing.num_diffs, int)
+            or self.video_processing.num_diffs < 2
+        ):
+            raise ValueError(
+                "The 'num_diffs' field in VideoProcessingConfig must be an integer of at least 2."
+            )
+        if not isinstance(self.video_processing.fast_scene_detection, bool):
+            raise ValueError(
+                "The 'fast_scene_detection' field in VideoProcessingConfig must be a boolean."
+            )
+        if (
+            not isinstance(self.video_processing.thumbnail_width, int)
+            or self.video_processing.thumbnail_width < 1
+        ):
+            raise ValueError(
+                "The 'thumbnail_width' field in VideoProcessingConfig must be a positive integer."
+            )
+        for field_name in ("adaptive_k", "adaptive_min_diff", "histogram_threshold"):
+            value = getattr(self.video_processing, field_name)
+            if not isinstance(value, float) or value < 0:
+                raise ValueError(
+                    f"The '{field_name}' field in VideoProcessingConfig must be a non-negative float."
+                )
+        if not isinstance(self.video_processing.save_scenes_to_disk, bool):
+            raise ValueError(
+                "The 'save_scenes_to_disk' field in VideoProcessingConfig must be a boolean."
+            )
+        if (
+            not isinstance(self.video_processing.scenes_dir, str)
+            or not self.video_processing.scenes_dir.strip()
+        ):
+            raise ValueError(
+                "The 'scenes_dir' field in VideoProcessingConfig must be a non-empty string."
+            )
+        if (
+            not isinstance(self.video_processing.scene_queue_size, int)
+            or self.video_processing.scene_queue_size < 1
+        ):
+            raise ValueError(
+                "The 'scene_queue_size' field in VideoProcessingConfig must be a positive integer."
+            )
+        for field_name in (
+            "scene_dedup_distance",
+            "max_scenes_per_video",
+            "caption_token_budget",
+            "cache_max_entries",
+        ):
+            value = getattr(self.video_processing, field_name)
+            if not isinstance(value, int) or value < 0:
+                raise ValueError(
+                    f"The '{field_name}' field in VideoProcessingConfig must be a non-negative integer."
+                )
+        if not isinstance(self.video_processing.cache_enabled, bool):
+            raise ValueError(
+                "The 'cache_enabled' field in VideoProcessingConfig must be a boolean."
+            )
+        if (
+            not isinstance(self.video_processing.cache_dir, str)
+            or not self.video_processing.cache_dir.strip()
+        ):
+            raise ValueError(
+                "The 'cache_dir' field in VideoProcessingConfig must be a non-empty string."
+            )
+
+        # Validate server config
+        if not isinstance(self.server.host, str) or not self.server.host.strip():
+            raise ValueError(
+                "The 'host' field in ServerConfig must be a non-empty string."
+            )
+        for field_name in (
+            "port",
+            "max_batch_size",
+            "max_queue_size",
+            "llm_workers",
+            "max_upload_mb",
+        ):
+            value = getattr(self.server, field_name)
+            if not isinstance(value, int) or value < 1:
+                raise ValueError(
+                    f"The '{field_name}' field in ServerConfig must be a positive integer."
+                )
+        if (
+            not isinstance(self.server.max_latency_ms, float)
+            or self.server.max_latency_ms < 0
+        ):
+            raise ValueError(
+                "The 'max_latency_ms' field in ServerConfig must be a non-negative float."
+            )
+
+        # Validate hashtags config
+        if not isinstance(self.hashtags.index_enabled, bool):
+            raise ValueError(
+                "The 'index_enabled' field in HashtagConfig must be a boolean."
+            )
+        if (
+            not isinstance(self.hashtags.index_path, str)
+            or not self.hashtags.index_path.strip()
+        ):
+            raise ValueError(
+                "The 'index_path' field in HashtagConfig must be a non-empty string."
+            )
+        if (
+            not isinstance(self.hashtags.max_captions, int)
+            or self.hashtags.max_captions < 1
+        ):
+            raise ValueError(
+                "The 'max_captions' field in HashtagConfig must be a positive integer."
+            )
 
 
 class ConfigManager:
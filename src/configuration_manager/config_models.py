@@ -10,8 +10,55 @@ class ModelSelectionConfig:
 
 @dataclass
 class ChromaDBConfig:
-    blip: str = "image_vectors_blip2"
-    llava: str = "image_vectors_llava"
+    blip: str = "image_compact_vectors_blip2"
+    llava: str = "image_compact_vectors_llava"
+    embedding_mode: str = "compact"
+    embedding_size: int = 16
+    near_duplicate_distance: int = 6
+    near_duplicate_min_bits: int = 8
+    write_queue_size: int = 1024
+    write_batch_size: int = 64
+
+
+@dataclass
+class VideoProcessingConfig:
+    sampler: str = "grab"
+    num_workers: int = 0
+    parallel_min_duration: float = 60.0
+    scene_detector: str = "mean_diff"
+    num_diffs: int = 30
+    fast_scene_detection: bool = True
+    thumbnail_width: int = 160
+    adaptive_k: float = 2.5
+    adaptive_min_diff: float = 2.0
+    histogram_threshold: float = 0.35
+    save_scenes_to_disk: bool = False
+    scenes_dir: str = "extracted_images"
+    scene_queue_size: int = 16
+    scene_dedup_distance: int = 6
+    max_scenes_per_video: int = 32
+    caption_token_budget: int = 300
+    cache_enabled: bool = True
+    cache_dir: str = "video_cache"
+    cache_max_entries: int = 512
+
+
+@dataclass
+class HashtagConfig:
+    index_enabled: bool = True
+    index_path: str = "hashtag_index.jsonl"
+    max_captions: int = 10000
+
+
+@dataclass
+class ServerConfig:
+    host: str = "127.0.0.1"
+    port: int = 8080
+    max_batch_size: int = 8
+    max_latency_ms: float = 25.0
+    max_queue_size: int = 256
+    llm_workers: int = 8
+    max_upload_mb: int = 20
 
 
 @dataclass
@@ -35,6 +82,15 @@ class OllamaConfig:
     temperature: int = 1
     top_p: float = 0.9
     stream: bool = False
+    host: str = ""
+    max_concurrent_requests: int = 4
+    request_timeout: float = 120.0
+    max_retries: int = 2
+    cache_enabled: bool = True
+    cache_max_entries: int = 1024
+    cache_ttl: float = 86400.0
+    cache_path: str = "llm_cache.sqlite3"
+    cache_nonzero_temperature: bool = False
 
 
 @dataclass
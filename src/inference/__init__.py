@@ -6,5 +6,12 @@ from .abstract.inference_abstract import InferenceAbstract
 from .impl.vit_model import VITModel
 from .impl.blip2_model import Blip2Model
 from .impl.llava_model import LlavaModel
+from .model_factory import create_inference
 
-__all__ = ["InferenceAbstract", "VITModel", "Blip2Model", "LlavaModel"]
+__all__ = [
+    "InferenceAbstract",
+    "VITModel",
+    "Blip2Model",
+    "LlavaModel",
+    "create_inference",
+]
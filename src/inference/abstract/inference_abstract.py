@@ -1,11 +1,22 @@
 """Caches the pre-trained model using pickle"""
 
+import gc
+import os
+import threading
 import warnings
 from abc import ABC, abstractmethod
 import torch
 from torchvision import transforms
 from PIL import Image
 from configuration_manager.config_manager import ConfigManager
+from vector_store import get_unique_image_id
+from vector_store import DEFAULT_MAX_BATCH_SIZE
+from vector_store import ChromaWriteBehindQueue
+from vector_store import get_captions_from_chroma
+from vector_store import compute_dhash
+from vector_store import PerceptualHashIndex
+from vector_store import is_informative_hash
+from utils.logger import log
 
 warnings.filterwarnings("ignore")
 
@@ -17,19 +28,49 @@ class InferenceAbstract(ABC):
     Methods:
         get_image_caption_pipeline(image_path: str) -> ImageCaptionPipeLine:
             Abstract method to be implemented for retrieving the image caption pipeline.
+        caption_batch(image_paths: list, batch_size: int) -> list:
+            Captions several images with one `generate` call per batch, or
+            one image at a time for models without batched captioning.
+        get_cache_stats() -> dict:
+            Returns the near-duplicate/hit/miss counters of the caption cache.
     """
 
-    def __init__(self, collection):
+    DEFAULT_BATCH_SIZE = 8
+
+    def __init__(self, collection, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
         """
         Initializes a new instance of the InferenceAbstract class.
 
         Args:
             collection (str): The name of the chromadb collection.
+            max_batch_size (int): Rows the chroma client of the collection
+                accepts per request, see `get_max_batch_size`.
 
         Returns:
             None
         """
         self.collection = collection
+        chroma_db_config = ConfigManager.get_config_manager().get_app_config().chroma_db
+        self.near_duplicate_distance = chroma_db_config.near_duplicate_distance
+        self.near_duplicate_min_bits = chroma_db_config.near_duplicate_min_bits
+        # Models without a collection, such as VITModel, store nothing
+        self.write_queue = None
+        if collection is not None:
+            self.write_queue = ChromaWriteBehindQueue(
+                collection,
+                max_queue_size=chroma_db_config.write_queue_size,
+                batch_size=chroma_db_config.write_batch_size,
+                embedding_mode=chroma_db_config.embedding_mode,
+                embedding_size=chroma_db_config.embedding_size,
+                max_batch_size=max_batch_size,
+            )
+        self._phash_index = None
+        self.near_duplicate_hits = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache_stats_lock = threading.Lock()
+        self._phash_index_lock = threading.Lock()
+        self._model_lock = threading.Lock()
 
     @staticmethod
     def get_device():
@@ -52,9 +93,301 @@ class InferenceAbstract(ABC):
 
     @staticmethod
     def load_image(image_path):
-        """Loads an image from the specified path and returns it."""
+        """
+        Loads an image from the specified path and returns it.
+
+        Images that are already in memory, such as video scenes, are only
+        converted to RGB.
+        """
+        if isinstance(image_path, Image.Image):
+            return image_path.convert("RGB")
         return Image.open(image_path).convert("RGB")
 
+    @staticmethod
+    def release_memory():
+        """
+        Releases cached accelerator memory and runs the garbage collector.
+
+        This is comparatively expensive, so it is called once per
+        `caption_batch` call rather than once per image.
+        """
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+            torch.cuda.synchronize()
+        gc.collect()
+
+    @property
+    def supports_batching(self):
+        """
+        Tells whether the model implements batched captioning.
+
+        Models that do not override `preprocess_images` and
+        `generate_captions` are captioned one image at a time through
+        `get_image_caption_pipeline`.
+        """
+        cls = type(self)
+        return (
+            cls.preprocess_images is not InferenceAbstract.preprocess_images
+            and cls.generate_captions is not InferenceAbstract.generate_captions
+        )
+
+    def caption_batch(self, image_paths, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Generates captions for several images.
+
+        The images are split into chunks of `batch_size`; the pixel values of
+        every chunk are stacked into one tensor and captioned with a single
+        padded `generate` call. Images that were captioned before are
+        answered without touching the model: near-duplicates (resized,
+        recompressed or filtered copies) through the perceptual hash index,
+        exact repeats through the chroma collection. Models without batched
+        captioning fall back to `get_image_caption_pipeline` per image.
+
+        Args:
+            image_paths (list): Paths of the images to caption, or PIL images.
+            batch_size (int): Maximum number of images per `generate` call.
+
+        Returns:
+            list: The generated captions, in the same order as `image_paths`.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer.")
+        if not self.supports_batching:
+            return [self.get_image_caption_pipeline(path) for path in image_paths]
+
+        os.environ["PYTORCH_CUDA_ALLOC_CONF"] = "max_split_size_mb:128"
+        captions = []
+        for start in range(0, len(image_paths), batch_size):
+            images = [
+                self.load_image(image_path)
+                for image_path in image_paths[start : start + batch_size]
+            ]
+            image_hashes = [compute_dhash(image) for image in images]
+            batch_captions = [
+                self._find_near_duplicate(image_hash) for image_hash in image_hashes
+            ]
+            pending = [
+                index for index, caption in enumerate(batch_captions) if caption is None
+            ]
+            if pending:
+                pending_captions = self._caption_images(
+                    [images[index] for index in pending],
+                    [image_hashes[index] for index in pending],
+                )
+                for index, caption in zip(pending, pending_captions):
+                    batch_captions[index] = caption
+            captions.extend(batch_captions)
+
+        self.release_memory()
+        return captions
+
+    def _caption_images(self, images, image_hashes):
+        """
+        Captions one batch of images that had no near-duplicate.
+
+        Exact repeats are looked up in the chroma collection; the remaining
+        images go through one `generate` call and are stored afterwards.
+
+        Args:
+            images (list): The PIL images of the batch.
+            image_hashes (list): The perceptual hash of every image.
+
+        Returns:
+            list: One caption per image, in batch order.
+        """
+        inputs = self.preprocess_images(images)
+        pixel_values = inputs["pixel_values"]
+        unique_ids = [
+            get_unique_image_id(pixel_values[index].unsqueeze(0))
+            for index in range(len(images))
+        ]
+        cached_captions = get_captions_from_chroma(self.collection, unique_ids)
+        misses = [
+            index
+            for index, unique_id in enumerate(unique_ids)
+            if unique_id not in cached_captions
+        ]
+        self._record_cache_lookup(len(images) - len(misses), len(misses))
+
+        captions = [cached_captions.get(unique_id) for unique_id in unique_ids]
+        if misses:
+            if len(misses) < len(images):
+                inputs = self._select_inputs(inputs, misses)
+            # One request at a time on the shared model, the rest of the
+            # pipeline (decoding, preprocessing, cache lookups) runs in parallel
+            with self._model_lock:
+                generated_captions = self.generate_captions(inputs)
+            for index, caption in zip(misses, generated_captions):
+                captions[index] = caption
+            self.store_captions(
+                [unique_ids[index] for index in misses],
+                inputs["pixel_values"],
+                generated_captions,
+                [image_hashes[index] for index in misses],
+            )
+
+        for image_hash, caption in zip(image_hashes, captions):
+            if self._is_informative(image_hash):
+                self.phash_index.add(image_hash, caption)
+        del inputs, pixel_values
+        return captions
+
+    @property
+    def phash_index(self):
+        """
+        The perceptual hash index of the collection, built on first use.
+
+        Returns:
+            PerceptualHashIndex: The index. It starts empty if the collection
+            cannot be read.
+        """
+        if self._phash_index is None:
+            with self._phash_index_lock:
+                if self._phash_index is None:
+                    try:
+                        self._phash_index = PerceptualHashIndex.from_collection(
+                            self.collection
+                        )
+                    except Exception as e:
+                        log.error(f"Could not load perceptual hashes: {e}")
+                        self._phash_index = PerceptualHashIndex()
+        return self._phash_index
+
+    def _find_near_duplicate(self, image_hash):
+        """
+        Returns the caption of a near-duplicate image, if one is indexed.
+
+        Args:
+            image_hash (int): The perceptual hash of the image.
+
+        Returns:
+            str or None: The reused caption, or None if there is no match,
+            near-duplicate lookup is disabled or the hash is too flat to
+            tell images apart.
+        """
+        if self.near_duplicate_distance <= 0 or not self._is_informative(image_hash):
+            return None
+        match = self.phash_index.find(image_hash, self.near_duplicate_distance)
+        if match is None:
+            return None
+        caption, distance = match
+        with self._cache_stats_lock:
+            self.near_duplicate_hits += 1
+        log.info(f"Reusing caption of a near-duplicate image (distance {distance}).")
+        return caption
+
+    def _is_informative(self, image_hash):
+        """
+        Tells whether a hash identifies its image well enough for reuse.
+
+        Dark, flat or low-texture images and fade or black video frames all
+        hash to (almost) the same value, so they are never matched.
+        """
+        return is_informative_hash(image_hash, self.near_duplicate_min_bits)
+
+    def get_cache_stats(self):
+        """
+        Returns the caption cache counters of this instance.
+
+        Returns:
+            dict: The number of near-duplicate hits, exact hits and misses and
+            the resulting hit rate.
+        """
+        with self._cache_stats_lock:
+            near_duplicate_hits = self.near_duplicate_hits
+            hits, misses = self.cache_hits, self.cache_misses
+        total = near_duplicate_hits + hits + misses
+        return {
+            "near_duplicate_hits": near_duplicate_hits,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": (near_duplicate_hits + hits) / total if total else 0.0,
+        }
+
+    def _record_cache_lookup(self, hits, misses):
+        """Adds the outcome of one caption cache lookup to the counters."""
+        with self._cache_stats_lock:
+            self.cache_hits += hits
+            self.cache_misses += misses
+        if hits:
+            log.info(f"Caption cache: {hits} hit(s), {misses} miss(es).")
+
+    @staticmethod
+    def _select_inputs(inputs, indices):
+        """
+        Returns the rows of a preprocessed batch at the given indices.
+
+        Args:
+            inputs: The output of `preprocess_images`.
+            indices (list): Positions of the images to keep.
+
+        Returns:
+            dict: The same keys as `inputs`, restricted to the selected images.
+        """
+        rows = torch.tensor(indices)
+        return {key: value[rows] for key, value in inputs.items()}
+
+    def store_captions(self, unique_ids, pixel_values, captions, image_hashes=None):
+        """
+        Queues the generated captions for the chroma database.
+
+        Every image of the batch is stored under the unique id derived from
+        its own pixel values, exactly as if it had been captioned on its own.
+        The entries are written by the write-behind queue, so the caption is
+        returned without waiting for the database. Without a collection
+        nothing is stored.
+
+        Args:
+            unique_ids (list): The unique id of every image of the batch.
+            pixel_values (torch.Tensor): Stacked pixel values of the batch.
+            captions (list): The caption generated for every image of the batch.
+            image_hashes (list): Optional perceptual hash of every image.
+
+        Returns:
+            None
+        """
+        if self.write_queue is None:
+            return
+        image_hashes = image_hashes or [None] * len(captions)
+        for index, (unique_id, caption) in enumerate(zip(unique_ids, captions)):
+            self.write_queue.submit(
+                unique_id,
+                pixel_values[index].unsqueeze(0),
+                caption,
+                image_hashes[index],
+            )
+
+    def preprocess_images(self, images):
+        """
+        Runs the model processor over a list of images.
+
+        Models that support batched captioning override this together with
+        `generate_captions`.
+
+        Args:
+            images (list): The PIL images of one batch.
+
+        Returns:
+            The processor output containing the stacked `pixel_values`.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support batched captioning."
+        )
+
+    def generate_captions(self, inputs):
+        """
+        Runs a single `generate` call over a preprocessed batch.
+
+        Args:
+            inputs: The output of `preprocess_images`.
+
+        Returns:
+            list: One stripped caption per image of the batch.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support batched captioning."
+        )
+
     @abstractmethod
     def get_image_caption_pipeline(self, image_path):
         pass
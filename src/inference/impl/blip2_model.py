@@ -1,14 +1,10 @@
 """Concrete class for caching and retrieving the BLIP2 image caption pipeline."""
 
-import os
-import gc
-import concurrent.futures
 import torch
 from inference.abstract.inference_abstract import InferenceAbstract
+from vector_store import DEFAULT_MAX_BATCH_SIZE
 from image_pipeline.abstract.image_pipeline_abstract import ImageCaptioningPipeline
 from image_pipeline.impl.blip2_pipeline import Blip2Pipeline
-from vector_store import get_unique_image_id
-from vector_store import add_image_to_chroma
 
 
 class Blip2Model(InferenceAbstract):
@@ -19,8 +15,8 @@ class Blip2Model(InferenceAbstract):
     BLIP2_MODEL = None
     BLIP2_PROCESSOR = None
 
-    def __init__(self, collection):
-        super().__init__(collection)
+    def __init__(self, collection, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+        super().__init__(collection, max_batch_size)
         self.image_pipeline: ImageCaptioningPipeline = Blip2Pipeline()
 
     def get_image_caption_pipeline(self, image_path):
@@ -33,53 +29,41 @@ class Blip2Model(InferenceAbstract):
         Args:
             image_path (str): The path to the image for which the caption
             pipeline is required.
-            device (str): The device on which the model and the inputs will be loaded.
         Returns:
             The image caption pipeline for the specified image path.
         """
-        device = self.get_device()
-        os.environ["PYTORCH_CUDA_ALLOC_CONF"] = "max_split_size_mb:128"
-        image = InferenceAbstract.load_image(image_path)
-        inputs = Blip2Model.BLIP2_PROCESSOR(images=image, return_tensors="pt").to(
-            device, torch.float16
+        return self.caption_batch([image_path], batch_size=1)[0]
+
+    def preprocess_images(self, images):
+        """
+        Runs the BLIP2 processor over a batch of images.
+
+        Args:
+            images (list): The PIL images of one batch.
+
+        Returns:
+            BatchFeature: The processor output with stacked `pixel_values`.
+        """
+        return Blip2Model.BLIP2_PROCESSOR(images=images, return_tensors="pt").to(
+            self.get_device(), torch.float16
         )
+
+    def generate_captions(self, inputs):
+        """
+        Generates one caption per image with a single BLIP2 `generate` call.
+
+        Args:
+            inputs (BatchFeature): The output of `preprocess_images`.
+
+        Returns:
+            list: The stripped captions, in batch order.
+        """
         generated_ids = Blip2Model.BLIP2_MODEL.generate(**inputs)
-        generated_text = Blip2Model.BLIP2_PROCESSOR.batch_decode(
+        generated_texts = Blip2Model.BLIP2_PROCESSOR.batch_decode(
             generated_ids, skip_special_tokens=True
-        )[0].strip()
-
-        torch.cuda.empty_cache()
-        torch.cuda.synchronize()
-        gc.collect()
-
-        pixel_values = inputs["pixel_values"]
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            unique_id_future = executor.submit(get_unique_image_id, pixel_values)
-
-            def store_in_chroma_db(fut, collection, pixel_values, generated_text):
-                """
-                Stores the generated image text in the chroma database.
-
-                Args:
-                    fut: The future object containing the unique id.
-                    collection: The collection in the chroma database.
-                    pixel_values: The pixel values of the generated image.
-                    generated_text: The text generated from the image.
-
-                Returns:
-                    None
-                """
-                unique_id = fut.result()
-                add_image_to_chroma(collection, unique_id, pixel_values, generated_text)
-
-            unique_id_future.add_done_callback(
-                lambda fut: store_in_chroma_db(
-                    fut, self.collection, pixel_values, generated_text
-                )
-            )
-            del inputs
+        )
         del generated_ids
-        return generated_text
+        return [generated_text.strip() for generated_text in generated_texts]
 
     def load_model(self):
         """
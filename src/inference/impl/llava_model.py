@@ -1,14 +1,10 @@
 """Concrete class for caching and retrieving the LLAVA image caption pipeline."""
 
-import os
-import gc
-import concurrent.futures
 import torch
 from inference.abstract.inference_abstract import InferenceAbstract
+from vector_store import DEFAULT_MAX_BATCH_SIZE
 from image_pipeline.abstract.image_pipeline_abstract import ImageCaptioningPipeline
 from image_pipeline.impl.llava_pipeline import LlavaPipeline
-from vector_store import get_unique_image_id
-from vector_store import add_image_to_chroma
 
 
 class LlavaModel(InferenceAbstract):
@@ -18,9 +14,10 @@ class LlavaModel(InferenceAbstract):
 
     LLAVA_MODEL = None
     LLAVA_PROCESSOR = None
+    PROMPT = "USER: <image>\nWhat are these?\nASSISTANT:"
 
-    def __init__(self, collection):
-        super().__init__(collection)
+    def __init__(self, collection, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+        super().__init__(collection, max_batch_size)
         self.image_pipeline: ImageCaptioningPipeline = LlavaPipeline()
 
     def get_image_caption_pipeline(self, image_path):
@@ -33,45 +30,50 @@ class LlavaModel(InferenceAbstract):
         Args:
             image_path (str): The path to the image for which the caption
             pipeline is required.
-            device (str): The device on which the model and the inputs will be loaded.
         Returns:
             The image caption pipeline for the specified image path.
         """
-        device = self.get_device()
-        os.environ["PYTORCH_CUDA_ALLOC_CONF"] = "max_split_size_mb:128"
-        image = InferenceAbstract.load_image(image_path)
-        inputs = LlavaModel.LLAVA_PROCESSOR(
-            "USER: <image>\nWhat are these?\nASSISTANT:",
-            images=image,
+        return self.caption_batch([image_path], batch_size=1)[0]
+
+    def preprocess_images(self, images):
+        """
+        Runs the LLAVA processor over a batch of images.
+
+        Every image is paired with the same prompt. The prompts are padded on
+        the left so that generation continues directly after each prompt.
+
+        Args:
+            images (list): The PIL images of one batch.
+
+        Returns:
+            BatchFeature: The processor output with stacked `pixel_values`.
+        """
+        LlavaModel.LLAVA_PROCESSOR.tokenizer.padding_side = "left"
+        return LlavaModel.LLAVA_PROCESSOR(
+            [LlavaModel.PROMPT] * len(images),
+            images=images,
+            padding=True,
             return_tensors="pt",
-        ).to(device, torch.float16)
+        ).to(self.get_device(), torch.float16)
+
+    def generate_captions(self, inputs):
+        """
+        Generates one caption per image with a single LLAVA `generate` call.
+
+        Args:
+            inputs (BatchFeature): The output of `preprocess_images`.
+
+        Returns:
+            list: The stripped captions, in batch order.
+        """
         generated_ids = LlavaModel.LLAVA_MODEL.generate(
             **inputs, max_new_tokens=200, do_sample=False
         )
-        generated_text = LlavaModel.LLAVA_PROCESSOR.batch_decode(
+        generated_texts = LlavaModel.LLAVA_PROCESSOR.batch_decode(
             generated_ids, skip_special_tokens=True
-        )[0].strip()
-
-        torch.cuda.empty_cache()
-        torch.cuda.synchronize()
-        gc.collect()
-
-        pixel_values = inputs["pixel_values"]
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            unique_id_future = executor.submit(get_unique_image_id, pixel_values)
-
-            def store_in_chroma_db(fut, collection, pixel_values, generated_text):
-                unique_id = fut.result()
-                add_image_to_chroma(collection, unique_id, pixel_values, generated_text)
-
-            unique_id_future.add_done_callback(
-                lambda fut: store_in_chroma_db(
-                    fut, self.collection, pixel_values, generated_text
-                )
-            )
-            del inputs
+        )
         del generated_ids
-        return generated_text
+        return [generated_text.strip() for generated_text in generated_texts]
 
     def load_model(self):
         """
@@ -0,0 +1,36 @@
+"""Creates the vision model selected in the configuration."""
+
+from inference.impl.blip2_model import Blip2Model
+from inference.impl.llava_model import LlavaModel
+from vector_store import (
+    get_chroma_collection,
+    get_max_batch_size,
+    initialize_chroma_client,
+)
+
+
+def create_inference(app_config):
+    """
+    Loads the vision model selected in the configuration.
+
+    Args:
+        app_config (AppConfig): The application configuration.
+
+    Returns:
+        InferenceAbstract: The loaded model, backed by its chroma collection.
+
+    Raises:
+        ValueError: If the configured model is not supported.
+    """
+    model_name = app_config.model_selection.model_name
+    if model_name == "llava":
+        model_class, collection_name = LlavaModel, app_config.chroma_db.llava
+    elif model_name == "blip2":
+        model_class, collection_name = Blip2Model, app_config.chroma_db.blip
+    else:
+        raise ValueError(f"Model {model_name} not supported")
+    chroma_client = initialize_chroma_client()
+    collection = get_chroma_collection(chroma_client, collection_name)
+    inference = model_class(collection, get_max_batch_size(chroma_client))
+    inference.load_model()
+    return inference
@@ -1,3 +1,11 @@
 from .llm_chatbot import LLMChatbot
+from .ollama_client import PooledOllamaClient, get_shared_client
+from .response_cache import ResponseCache, get_shared_response_cache
 
-__all__ = ["LLMChatbot"]
+__all__ = [
+    "LLMChatbot",
+    "PooledOllamaClient",
+    "get_shared_client",
+    "ResponseCache",
+    "get_shared_response_cache",
+]
@@ -1,20 +1,87 @@
-import ollama
+import json
 from configuration_manager.config_manager import ConfigManager
+from llm_chatbot.ollama_client import get_shared_client
+from llm_chatbot.response_cache import get_shared_response_cache
 
 
 class LLMChatbot:
     """
     A class representing a chatbot that interacts with the PHI3/LLAMA Chat API.
+
+    Responses to deterministic requests are cached, so repeating an
+    unchanged request does not call the model again.
     """
 
-    def __init__(self):
+    def __init__(self, client=None, response_cache=None):
         """
         Initializes a new Chatbot instance.
+
+        Args:
+            client (PooledOllamaClient): The client sending the requests.
+                Chatbots share one pooled client per Ollama configuration
+                if omitted.
+            response_cache (ResponseCache): The response cache. Read from
+                the Ollama configuration if omitted.
         """
         self.app_config = ConfigManager.get_config_manager().get_app_config()
         self.model = self.app_config.ollama.variants.phi3
         self.temperature = self.app_config.ollama.temperature
         self.top_p = self.app_config.ollama.top_p
+        self.client = client or get_shared_client(self.app_config.ollama)
+        if response_cache is None:
+            response_cache = get_shared_response_cache(self.app_config.ollama)
+        self.response_cache = response_cache
+
+    @staticmethod
+    def _messages(content):
+        return [{"role": "user", "content": content}]
+
+    def _options(self, temperature=None):
+        if temperature is None:
+            temperature = self.temperature
+        return {"temperature": temperature, "top_p": self.top_p}
+
+    def _cache_key(self, messages, options, format=None):
+        """Returns the cache key of a request, or None if it is not cached."""
+        if self.response_cache is None or not self.response_cache.is_cacheable(options):
+            return None
+        return self.response_cache.make_key(self.model, messages, options, format)
+
+    def _cached_response(self, cache_key):
+        """Returns a cached response in the shape of an Ollama response."""
+        if cache_key is None:
+            return None
+        content = self.response_cache.get(cache_key)
+        if content is None:
+            return None
+        return {"message": {"role": "assistant", "content": content}, "done": True}
+
+    def _chat(self, content, options, format=None):
+        """Sends a non-streamed request, answering repeats from the cache."""
+        messages = self._messages(content)
+        cache_key = self._cache_key(messages, options, format)
+        response = self._cached_response(cache_key)
+        if response is not None:
+            return response
+        response = self.client.chat(self.model, messages, options, format=format)
+        if cache_key is not None:
+            self.response_cache.set(cache_key, response["message"]["content"])
+        return response
+
+    def _chat_stream(self, content):
+        """Streams a response, replaying cached ones as a single chunk."""
+        messages, options = self._messages(content), self._options()
+        cache_key = self._cache_key(messages, options)
+        response = self._cached_response(cache_key)
+        if response is not None:
+            yield response
+            return
+        parts = []
+        for chunk in self.client.chat_stream(self.model, messages, options):
+            parts.append(chunk["message"]["content"])
+            yield chunk
+        if cache_key is not None:
+            self.response_cache.set(cache_key, "".join(parts))
 
     def get_response(self, content, stream=False):
         """Sends a message to the Ollama llama-3 or phi-3 chat model and returns its
@@ -26,10 +93,43 @@ class LLMChatbot:
         Returns:
             dict: A dictionary containing the response from the chat model.
         """
-        stream_caption = ollama.chat(
-            model=self.model,
-            messages=[{"role": "user", "content": content}],
-            stream=stream,
-            options={"temperature": self.temperature, "top_p": self.top_p},
-        )
-        return stream_caption
+        if stream:
+            return self._chat_stream(content)
+        return self._chat(content, self._options())
+
+    def get_json_response(self, content):
+        """Asks the chat model for a JSON answer and parses it.
+
+        The request is sent with temperature 0, so the answer is
+        deterministic and repeated requests are served from the cache.
+
+        Args:
+            content (str): The content of the message to be sent.
+        Returns:
+            The parsed JSON answer.
+        Raises:
+            ValueError: If the answer is not valid JSON.
+        """
+        response = self._chat(content, self._options(temperature=0), format="json")
+        return json.loads(response["message"]["content"])
+
+    async def get_response_async(self, content):
+        """Streams the response of the chat model without blocking the event loop.
+
+        Args:
+            content (str): The content of the message to be sent.
+        Yields:
+            dict: The response chunks, as soon as the model produces them.
+        """
+        messages, options = self._messages(content), self._options()
+        cache_key = self._cache_key(messages, options)
+        response = self._cached_response(cache_key)
+        if response is not None:
+            yield response
+            return
+        parts = []
+        async for chunk in self.client.chat_stream_async(self.model, messages, options):
+            parts.append(chunk["message"]["content"])
+            yield chunk
+        if cache_key is not None:
+            self.response_cache.set(cache_key, "".join(parts))
@@ -0,0 +1,383 @@
+"""
+Pooled Ollama client shared by every chatbot of the process
+"""
+
+import asyncio
+import functools
+import json
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+import httpx
+import ollama
+from utils.logger import log
+
+_RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def _is_retryable(error):
+    """Tells whether a failed request is worth sending again."""
+    if isinstance(error, ollama.ResponseError):
+        return error.status_code in _RETRYABLE_STATUS_CODES
+    return isinstance(error, (ConnectionError, httpx.TransportError))
+
+
+class PooledOllamaClient:
+    """
+    A thread-safe Ollama client with a persistent connection pool.
+
+    All requests share one keep-alive HTTP session, so the TCP connection to
+    Ollama is reused instead of being opened per call. At most
+    `max_concurrent_requests` requests per model are in flight; further
+    callers wait for a slot instead of piling up on the server. Identical
+    non-streamed requests that are in flight at the same time are coalesced
+    onto a single upstream call whose response every caller receives.
+    Connection errors, timeouts and overload responses are retried with
+    exponential backoff; streams are only retried before their first chunk.
+
+    Every method has an async variant that does not block the event loop.
+    Async clients are created per event loop, while the concurrency limit
+    and the coalescing are shared with the synchronous methods.
+
+    Attributes:
+        host (str): The Ollama server, None for the default or `OLLAMA_HOST`.
+        max_concurrent_requests (int): In-flight requests allowed per model.
+        timeout (float): Seconds before a request times out.
+        max_retries (int): Additional attempts for a failed request.
+        retry_backoff (float): Seconds before the first retry, doubled after
+            every further attempt.
+
+    Methods:
+        chat(model, messages, options, format): Returns the full response.
+        chat_stream(model, messages, options): Yields the response chunks.
+        chat_async(model, messages, options, format): Async `chat`.
+        chat_stream_async(model, messages, options): Async `chat_stream`.
+        get_stats(): Returns the request counters.
+    """
+
+    def __init__(
+        self,
+        host=None,
+        max_concurrent_requests=4,
+        timeout=120.0,
+        max_retries=2,
+        retry_backoff=0.5,
+    ):
+        if max_concurrent_requests < 1:
+            raise ValueError("max_concurrent_requests must be a positive integer.")
+        self.host = host or None
+        self.max_concurrent_requests = max_concurrent_requests
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._limits = httpx.Limits(
+            max_connections=max_concurrent_requests * 4,
+            max_keepalive_connections=max_concurrent_requests * 4,
+        )
+        self._client = ollama.Client(
+            host=self.host, timeout=timeout, limits=self._limits
+        )
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._semaphores = {}
+        self._in_flight = {}
+        self._coalesced_tasks = set()
+        self._active_requests = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "coalesced": 0,
+            "retries": 0,
+            "failed": 0,
+            "waited_for_slot": 0,
+        }
+
+    def get_stats(self):
+        """
+        Returns the client counters.
+
+        Returns:
+            dict: Requests sent upstream, requests answered by a coalesced
+            call, retries, failed requests, how often a caller had to wait
+            for a free slot and the requests currently in flight.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = self._active_requests
+        return stats
+
+    def _count(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def _semaphore(self, model):
+        """Returns the semaphore limiting the requests to `model`."""
+        with self._lock:
+            semaphore = self._semaphores.get(model)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_concurrent_requests)
+                self._semaphores[model] = semaphore
+            return semaphore
+
+    def _acquire(self, model):
+        semaphore = self._semaphore(model)
+        if not semaphore.acquire(blocking=False):
+            self._count("waited_for_slot")
+            semaphore.acquire()
+        self._count_active(1)
+        return semaphore
+
+    def _release(self, semaphore):
+        self._count_active(-1)
+        semaphore.release()
+
+    def _count_active(self, delta):
+        with self._lock:
+            self._active_requests += delta
+
+    async def _acquire_async(self, model):
+        semaphore = self._semaphore(model)
+        if not semaphore.acquire(blocking=False):
+            self._count("waited_for_slot")
+            # The slots are shared with the threads using the synchronous
+            # methods, so the blocking acquire waits in a worker thread
+            acquiring = asyncio.ensure_future(asyncio.to_thread(semaphore.acquire))
+            try:
+                await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                # Hands the slot back once the abandoned acquire gets it
+                acquiring.add_done_callback(lambda _: semaphore.release())
+                raise
+        self._count_active(1)
+        return semaphore
+
+    def _async_client(self):
+        """Returns the async client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = ollama.AsyncClient(
+                    host=self.host, timeout=self.timeout, limits=self._limits
+                )
+                self._async_clients[loop] = client
+            return client
+
+    @staticmethod
+    def _request_key(model, messages, options, format):
+        return json.dumps([model, messages, options, format], sort_keys=True)
+
+    def _join_or_lead(self, key):
+        """
+        Returns the in-flight future of `key` and whether the caller must
+        send the request itself.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            return future, True
+
+    def _finish(self, key, future, response=None, error=None):
+        with self._lock:
+            del self._in_flight[key]
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(response)
+
+    def _backoff(self, attempt, error):
+        self._count("retries")
+        delay = self.retry_backoff * 2**attempt
+        log.warning(f"Ollama request failed ({error}), retrying in {delay:.1f}s.")
+        return delay
+
+    def _send(self, model, **kwargs):
+        """Sends one request with retries, holding a slot of the model."""
+        semaphore = self._acquire(model)
+        try:
+            for attempt in range(self.max_retries + 1):
+                self._count("requests")
+                try:
+                    return self._client.chat(model=model, **kwargs)
+                except Exception as e:
+                    if attempt == self.max_retries or not _is_retryable(e):
+                        self._count("failed")
+                        raise
+                    time.sleep(self._backoff(attempt, e))
+        finally:
+            self._release(semaphore)
+
+    async def _send_async(self, model, **kwargs):
+        semaphore = await self._acquire_async(model)
+        try:
+            client = self._async_client()
+            for attempt in range(self.max_retries + 1):
+                self._count("requests")
+                try:
+                    return await client.chat(model=model, **kwargs)
+                except Exception as e:
+                    if attempt == self.max_retries or not _is_retryable(e):
+                        self._count("failed")
+                        raise
+                    await asyncio.sleep(self._backoff(attempt, e))
+        finally:
+            self._release(semaphore)
+
+    def chat(self, model, messages, options=None, format=None):
+        """
+        Sends a chat request and returns the complete response.
+
+        Args:
+            model (str): The Ollama model.
+            messages (list): The chat messages.
+            options (dict): Sampling options such as temperature and top_p.
+            format (str): "json" to constrain the answer to JSON.
+
+        Returns:
+            ChatResponse: The response, shared with coalesced callers.
+        """
+        key = self._request_key(model, messages, options, format)
+        future, leader = self._join_or_lead(key)
+        if not leader:
+            return future.result()
+        try:
+            response = self._send(
+                model, messages=messages, options=options, format=format
+            )
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, response)
+        return response
+
+    async def chat_async(self, model, messages, options=None, format=None):
+        """
+        Async variant of `chat`.
+
+        The upstream call runs in a task of its own that every caller awaits
+        shielded, so cancelling one caller, the one that sent the request
+        included, does not cancel it for the others.
+        """
+        key = self._request_key(model, messages, options, format)
+        future, leader = self._join_or_lead(key)
+        if not leader:
+            return await asyncio.shield(asyncio.wrap_future(future))
+        task = asyncio.ensure_future(
+            self._send_async(model, messages=messages, options=options, format=format)
+        )
+        # Tasks are only weakly referenced by the loop
+        self._coalesced_tasks.add(task)
+        task.add_done_callback(functools.partial(self._finish_task, key, future))
+        return await asyncio.shield(task)
+
+    def _finish_task(self, key, future, task):
+        """Hands the outcome of a detached `chat_async` request to the waiters."""
+        self._coalesced_tasks.discard(task)
+        if task.cancelled():
+            error = RuntimeError("The coalesced Ollama request was cancelled.")
+        else:
+            error = task.exception()
+            if error is not None and not isinstance(error, Exception):
+                error = RuntimeError(
+                    f"The coalesced Ollama request was aborted: {error!r}"
+                )
+        if error is not None:
+            self._finish(key, future, error=error)
+        else:
+            self._finish(key, future, task.result())
+
+    def chat_stream(self, model, messages, options=None):
+        """
+        Sends a chat request and yields the response chunks as they arrive.
+
+        The slot of the model is held until the stream is exhausted or
+        closed. Streams are not coalesced.
+
+        Args:
+            model (str): The Ollama model.
+            messages (list): The chat messages.
+            options (dict): Sampling options such as temperature and top_p.
+
+        Yields:
+            ChatResponse: The response chunks.
+        """
+        semaphore = self._acquire(model)
+        try:
+            for attempt in range(self.max_retries + 1):
+                self._count("requests")
+                started = False
+                try:
+                    for chunk in self._client.chat(
+                        model=model, messages=messages, options=options, stream=True
+                    ):
+                        started = True
+                        yield chunk
+                    return
+                except Exception as e:
+                    if started or attempt == self.max_retries or not _is_retryable(e):
+                        self._count("failed")
+                        raise
+                    time.sleep(self._backoff(attempt, e))
+        finally:
+            self._release(semaphore)
+
+    async def chat_stream_async(self, model, messages, options=None):
+        """Async variant of `chat_stream`."""
+        semaphore = await self._acquire_async(model)
+        try:
+            client = self._async_client()
+            for attempt in range(self.max_retries + 1):
+                self._count("requests")
+                started = False
+                try:
+                    stream = await client.chat(
+                        model=model, messages=messages, options=options, stream=True
+                    )
+                    async for chunk in stream:
+                        started = True
+                        yield chunk
+                    return
+                except Exception as e:
+                    if started or attempt == self.max_retries or not _is_retryable(e):
+                        self._count("failed")
+                        raise
+                    await asyncio.sleep(self._backoff(attempt, e))
+        finally:
+            self._release(semaphore)
+
+
+_shared_clients = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_shared_client(ollama_config):
+    """
+    Returns the pooled client for the connection settings of `ollama_config`.
+
+    Chatbots with the same settings share one client, and with it the
+    connection pool and the per-model concurrency limit.
+
+    Args:
+        ollama_config (OllamaConfig): The Ollama settings.
+
+    Returns:
+        PooledOllamaClient: The shared client.
+    """
+    settings = (
+        ollama_config.host,
+        ollama_config.max_concurrent_requests,
+        ollama_config.request_timeout,
+        ollama_config.max_retries,
+    )
+    with _shared_clients_lock:
+        client = _shared_clients.get(settings)
+        if client is None:
+            client = PooledOllamaClient(*settings)
+            _shared_clients[settings] = client
+        return client
@@ -0,0 +1,227 @@
+"""
+Cache of chat model responses, in memory and on disk
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from utils.logger import log
+
+_PRUNE_EVERY = 100
+
+
+class ResponseCache:
+    """
+    A thread-safe cache of chat responses with LRU and TTL eviction.
+
+    Responses are keyed by a hash of the model, the sampling options, the
+    response format and the messages, so an identical request is answered
+    without calling the model. The most recently used entries are kept in
+    memory; every entry is also written to an SQLite database, so the cache
+    survives restarts. Entries expire `ttl` seconds after they were stored.
+
+    With a non-zero temperature the model is expected to answer differently
+    every time, so such requests bypass the cache unless
+    `cache_nonzero_temperature` is set.
+
+    Attributes:
+        max_entries (int): Entries kept in memory.
+        ttl (float): Seconds an entry stays valid, 0 for no expiry.
+        db_path (str): The SQLite file, None to keep the cache in memory only.
+        cache_nonzero_temperature (bool): Whether to cache sampled responses.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that missed.
+    """
+
+    def __init__(
+        self,
+        max_entries=1024,
+        ttl=86400.0,
+        db_path=None,
+        cache_nonzero_temperature=False,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.cache_nonzero_temperature = cache_nonzero_temperature
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = self._open_db(db_path)
+
+    @staticmethod
+    def _open_db(db_path):
+        """Opens the database, or returns None if it cannot be used."""
+        try:
+            directory = os.path.dirname(os.path.abspath(db_path))
+            os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(db_path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, content TEXT NOT NULL, expires_at REAL)"
+            )
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            log.warning(f"Response cache database unavailable, memory only: {e}")
+            return None
+
+    @staticmethod
+    def make_key(model, messages, options=None, format=None):
+        """
+        Derives the cache key of a chat request.
+
+        Args:
+            model (str): The chat model.
+            messages (list): The chat messages.
+            options (dict): The sampling options.
+            format (str): The requested response format.
+
+        Returns:
+            str: The cache key.
+        """
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "options": options or {},
+                "format": format,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, options):
+        """
+        Tells whether responses to requests with these options are cached.
+
+        Args:
+            options (dict): The sampling options of the request.
+
+        Returns:
+            bool: True for deterministic requests, or for every request if
+            `cache_nonzero_temperature` is set.
+        """
+        if self.cache_nonzero_temperature:
+            return True
+        return not (options or {}).get("temperature")
+
+    def _expires_at(self):
+        return time.time() + self.ttl if self.ttl else None
+
+    def get(self, key):
+        """
+        Returns the response content stored under a key.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            str or None: The content, or None if there is no valid entry.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self._entries.pop(key, None)
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT content, expires_at FROM responses WHERE key = ?",
+                        (key,),
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    log.warning(f"Could not read the response cache: {e}")
+                    row = None
+                if row is not None and (row[1] is None or row[1] > now):
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def set(self, key, content):
+        """
+        Stores the response content of a request.
+
+        Args:
+            key (str): The cache key.
+            content (str): The full response content.
+        """
+        expires_at = self._expires_at()
+        with self._lock:
+            self._remember(key, content, expires_at)
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                    (key, content, expires_at),
+                )
+                self._writes += 1
+                if self._writes % _PRUNE_EVERY == 0:
+                    self._db.execute(
+                        "DELETE FROM responses WHERE expires_at <= ?", (time.time(),)
+                    )
+                self._db.commit()
+            except sqlite3.Error as e:
+                log.warning(f"Could not write the response cache: {e}")
+
+    def _remember(self, key, content, expires_at):
+        """Adds an entry to the in-memory tier. Called with the lock held."""
+        self._entries[key] = (content, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Removes every entry from memory and disk."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+
+_shared_caches = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_shared_response_cache(ollama_config):
+    """
+    Returns the response cache configured in the `ollama` section.
+
+    Chatbots with the same cache settings share one cache.
+
+    Args:
+        ollama_config (OllamaConfig): The Ollama settings.
+
+    Returns:
+        ResponseCache or None: The cache, or None if caching is disabled.
+    """
+    if not ollama_config.cache_enabled:
+        return None
+    settings = (
+        ollama_config.cache_max_entries,
+        ollama_config.cache_ttl,
+        ollama_config.cache_path,
+        ollama_config.cache_nonzero_temperature,
+    )
+    with _shared_caches_lock:
+        cache = _shared_caches.get(settings)
+        if cache is None:
+            cache = ResponseCache(*settings)
+            _shared_caches[settings] = cache
+        return cache
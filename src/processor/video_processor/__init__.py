@@ -3,7 +3,31 @@ Video Scene Detector Module
 """
 
 from .video_processor import VideoProcessor
-from .scene_saver import SceneSaver
+from .scene_saver import SceneSaver, scene_to_image
+from .scene_pipeline import iter_scene_batches
+from .scene_deduplicator import SceneDeduplicator, compute_frame_dhash
 from .scene_detector import SceneDetector
+from .abstract.scene_detector_abstract import SceneDetectorAbstract
+from .impl.adaptive_scene_detector import AdaptiveSceneDetector
+from .impl.histogram_scene_detector import HistogramSceneDetector
+from .scene_detector_factory import create_scene_detector
+from .frame_source import FrameSource, GrabFrameSource, SeekFrameSource
+from .frame_source import create_frame_source
 
-__all__ = ["VideoProcessor", "SceneSaver", "SceneDetector"]
+__all__ = [
+    "VideoProcessor",
+    "SceneSaver",
+    "scene_to_image",
+    "iter_scene_batches",
+    "SceneDeduplicator",
+    "compute_frame_dhash",
+    "SceneDetector",
+    "SceneDetectorAbstract",
+    "AdaptiveSceneDetector",
+    "HistogramSceneDetector",
+    "create_scene_detector",
+    "FrameSource",
+    "GrabFrameSource",
+    "SeekFrameSource",
+    "create_frame_source",
+]
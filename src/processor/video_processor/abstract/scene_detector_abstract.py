@@ -0,0 +1,52 @@
+"""Interface shared by the scene detection strategies"""
+
+from abc import ABC, abstractmethod
+
+
+class SceneDetectorAbstract(ABC):
+    """
+    Abstract base class for scene detectors.
+
+    VideoProcessor feeds a detector every sampled frame through
+    `process_frame`, asks `scene_changed` after each one and takes the frame
+    to save from `get_scene`.
+
+    Methods:
+        process_frame(frame): Processes a new frame.
+        scene_changed(): Returns whether the last frame starts a new scene.
+        get_scene(): Returns the last frame.
+        reset_state(): Forgets every frame seen so far.
+    """
+
+    @property
+    def warmup_frames(self):
+        """
+        Number of sampled frames the detector needs to see before its
+        decision for a frame is the same as after reading the whole video.
+        Used to seed the detector when a video is split into ranges.
+        """
+        return 0
+
+    @property
+    def supports_parallel(self):
+        """
+        Whether a video may be split into ranges for this detector, i.e.
+        whether its state is bounded by `warmup_frames`.
+        """
+        return True
+
+    @abstractmethod
+    def process_frame(self, frame):
+        pass
+
+    @abstractmethod
+    def scene_changed(self):
+        pass
+
+    @abstractmethod
+    def get_scene(self):
+        pass
+
+    @abstractmethod
+    def reset_state(self):
+        pass
@@ -0,0 +1,165 @@
+"""
+Compares the scene detectors on sample clips.
+
+Usage (from the src directory):
+    python -m processor.video_processor.benchmark_scene_detectors clip1.mp4 ...
+    python -m processor.video_processor.benchmark_scene_detectors --synthetic 60
+
+For every clip and detector the number of saved scenes, scenes per minute
+of video and the detection runtime are printed. Every saved scene is one
+BLIP2/LLaVA call later on, so fewer scenes at the same coverage is better.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+from prettytable import PrettyTable
+from configuration_manager.config_models import VideoProcessingConfig
+from processor.video_processor.scene_detector_factory import (
+    SCENE_DETECTORS,
+    create_scene_detector,
+)
+from processor.video_processor.video_processor import VideoProcessor
+
+
+class CountingSceneSaver:
+    """A scene saver that only counts the scenes it is given."""
+
+    def __init__(self):
+        self.scene_count = 0
+
+    def save_scene(self, scene):
+        """Counts a scene."""
+        self.scene_count += 1
+
+
+def write_synthetic_clip(path, seconds=60, fps=30, size=(320, 240)):
+    """
+    Writes a clip of slow pans over textured shots, hard cuts and fades.
+
+    Args:
+        path (str): Path of the video file to write.
+        seconds (int): Duration of the clip.
+        fps (int): Frame rate of the clip.
+        size (tuple): Width and height of the clip.
+
+    Returns:
+        str: The path of the clip.
+    """
+    width, height = size
+    rng = np.random.default_rng(0)
+    shots = []
+    for _ in range(max(2, seconds // 5)):
+        # A dominant colour with a smooth texture, wide enough to pan over
+        texture = rng.integers(-40, 40, (6, 16, 3)).astype(np.int16)
+        texture = cv2.resize(texture, (width * 2, height))
+        colour = rng.integers(40, 216, 3).astype(np.int16)
+        shots.append(np.clip(texture + colour, 0, 255).astype(np.uint8))
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    shot_length = 5 * fps
+    fade_length = fps
+    for frame_index in range(seconds * fps):
+        shot, offset = divmod(frame_index, shot_length)
+        current = shots[shot % len(shots)]
+        pan = offset * width // shot_length
+        frame = current[:, pan : pan + width]
+        # Every other transition is a fade into the next shot instead of a cut
+        if shot % 2 and offset >= shot_length - fade_length:
+            following = shots[(shot + 1) % len(shots)][:, :width]
+            alpha = (offset - shot_length + fade_length) / fade_length
+            frame = cv2.addWeighted(frame, 1 - alpha, following, alpha, 0)
+        writer.write(np.ascontiguousarray(frame))
+    writer.release()
+    return path
+
+
+def benchmark(video_paths, detector_names=SCENE_DETECTORS, video_config=None):
+    """
+    Runs every detector over every clip.
+
+    Args:
+        video_paths (list): Paths of the clips.
+        detector_names (tuple): Names accepted by `create_scene_detector`.
+        video_config (VideoProcessingConfig): Base settings of the detectors.
+
+    Returns:
+        list: One dict per clip and detector with the scene count, scenes
+        per minute and runtime in seconds.
+    """
+    video_config = video_config or VideoProcessingConfig()
+    results = []
+    for video_path in video_paths:
+        cap = cv2.VideoCapture(video_path)
+        minutes = cap.get(cv2.CAP_PROP_FRAME_COUNT) / cap.get(cv2.CAP_PROP_FPS) / 60
+        cap.release()
+        for detector_name in detector_names:
+            video_config.scene_detector = detector_name
+            scene_saver = CountingSceneSaver()
+            processor = VideoProcessor(
+                video_path,
+                create_scene_detector(video_config),
+                scene_saver,
+                sampler=video_config.sampler,
+            )
+            start = time.perf_counter()
+            processor.detect_scenes()
+            runtime = time.perf_counter() - start
+            results.append(
+                {
+                    "video": os.path.basename(video_path),
+                    "detector": detector_name,
+                    "scenes": scene_saver.scene_count,
+                    "scenes_per_minute": scene_saver.scene_count / minutes,
+                    "runtime": runtime,
+                }
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("videos", nargs="*", help="Sample clips to run on.")
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        metavar="SECONDS",
+        help="Also run on a generated clip of this many seconds.",
+    )
+    parser.add_argument(
+        "--detectors", nargs="+", default=list(SCENE_DETECTORS), help="Detectors."
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        videos = list(args.videos)
+        if args.synthetic:
+            videos.append(
+                write_synthetic_clip(
+                    os.path.join(temp_dir, "synthetic.avi"), args.synthetic
+                )
+            )
+        if not videos:
+            parser.error("pass at least one clip or --synthetic")
+
+        table = PrettyTable(
+            field_names=["Video", "Detector", "Scenes", "Scenes/min", "Runtime (s)"],
+            align="l",
+        )
+        for result in benchmark(videos, args.detectors):
+            table.add_row(
+                [
+                    result["video"],
+                    result["detector"],
+                    result["scenes"],
+                    f"{result['scenes_per_minute']:.1f}",
+                    f"{result['runtime']:.2f}",
+                ]
+            )
+        print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Frame sources that only decode the frames the scene detector looks at
+"""
+
+from abc import ABC, abstractmethod
+import cv2
+
+
+class FrameSource(ABC):
+    """
+    Abstract base class for iterating over the sampled frames of a video.
+
+    Iterating over a frame source yields `(frame_index, frame)` tuples for
+    every `step`-th frame in `[start_frame, end_frame)`.
+
+    Attributes:
+    -----------
+    cap : cv2.VideoCapture
+        An opened video capture.
+    step : int
+        Distance between two sampled frames.
+    start_frame : int
+        Index of the first frame to consider.
+    end_frame : int or None
+        Index one past the last frame to consider, None for the whole video.
+    """
+
+    def __init__(self, cap, step, start_frame=0, end_frame=None):
+        if step < 1:
+            raise ValueError("step must be a positive integer.")
+        self.cap = cap
+        self.step = step
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+
+    @abstractmethod
+    def __iter__(self):
+        pass
+
+
+class GrabFrameSource(FrameSource):
+    """
+    Reads the video sequentially, fully retrieving only the sampled frames.
+
+    `cap.grab()` advances over a frame without converting it to a BGR
+    image; `cap.retrieve()` is only called for frames whose index is a
+    multiple of `step`, so the colour conversion and the copy into a numpy
+    array are skipped for every other frame.
+    """
+
+    def __iter__(self):
+        frame_index = self.start_frame
+        if frame_index:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        while self.end_frame is None or frame_index < self.end_frame:
+            if not self.cap.grab():
+                break
+            if frame_index % self.step == 0:
+                ret, frame = self.cap.retrieve()
+                if not ret:
+                    break
+                yield frame_index, frame
+            frame_index += 1
+
+
+class SeekFrameSource(FrameSource):
+    """
+    Seeks directly to every sampled frame.
+
+    The decoder jumps to the keyframe before each sampled frame and decodes
+    from there, so frames between samples are never decoded at all. This
+    pays off for long videos sampled with a step larger than the keyframe
+    interval.
+    """
+
+    def __iter__(self):
+        end_frame = self.end_frame
+        if end_frame is None:
+            end_frame = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        first_frame = -(-self.start_frame // self.step) * self.step
+        for frame_index in range(first_frame, end_frame, self.step):
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            yield frame_index, frame
+
+
+FRAME_SOURCES = {"grab": GrabFrameSource, "seek": SeekFrameSource}
+
+
+def create_frame_source(sampler, cap, step, start_frame=0, end_frame=None):
+    """
+    Creates the frame source registered under `sampler`.
+
+    Args:
+        sampler (str): Either "grab" or "seek".
+        cap (cv2.VideoCapture): An opened video capture.
+        step (int): Distance between two sampled frames.
+        start_frame (int): Index of the first frame to consider.
+        end_frame (int): Index one past the last frame to consider.
+
+    Returns:
+        FrameSource: The frame source.
+
+    Raises:
+        ValueError: If the sampler is unknown.
+    """
+    frame_source_class = FRAME_SOURCES.get(sampler)
+    if frame_source_class is None:
+        raise ValueError(
+            f"Unknown frame sampler {sampler}, expected one of {list(FRAME_SOURCES)}"
+        )
+    return frame_source_class(cap, step, start_frame, end_frame)
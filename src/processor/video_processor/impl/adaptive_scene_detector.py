@@ -0,0 +1,84 @@
+"""Scene detection with an adaptive mean + k * std threshold"""
+
+import math
+from processor.video_processor.scene_detector import SceneDetector
+
+
+class AdaptiveSceneDetector(SceneDetector):
+    """
+    Reports a scene change when the difference to the previous frame is an
+    outlier of the recent differences.
+
+    SceneDetector fires whenever a difference is above the window average,
+    i.e. on roughly every other frame of a camera pan. This detector only
+    fires when the difference exceeds the mean of the previous differences
+    in the window by `k` standard deviations, and at least `min_diff`. It
+    starts deciding after `MIN_DIFFS` differences rather than a full window,
+    since the standard deviation already bounds the threshold.
+
+    Attributes:
+        k: float, number of standard deviations above the mean.
+        min_diff: float, smallest mean difference reported as a scene change,
+        so that noise on a static shot does not fire.
+    """
+
+    MIN_DIFFS = 5
+
+    def __init__(
+        self, num_diffs=30, k=2.5, min_diff=2.0, fast=False, thumbnail_width=160
+    ):
+        """
+        Initializes a new instance of the AdaptiveSceneDetector class.
+
+        Args:
+            num_diffs (int, optional): The number of mean differences the threshold is computed over. Defaults to 30.
+            k (float, optional): Number of standard deviations above the mean. Defaults to 2.5.
+            min_diff (float, optional): Smallest mean difference reported as a scene change. Defaults to 2.0.
+            fast (bool, optional): Compare downscaled grayscale thumbnails. Defaults to False.
+            thumbnail_width (int, optional): The width of the thumbnails in fast mode. Defaults to 160.
+        """
+        super().__init__(num_diffs, fast=fast, thumbnail_width=thumbnail_width)
+        self.k = k
+        self.min_diff = min_diff
+        self._square_sum = 0.0
+
+    def _add_diff(self, mean_diff):
+        """
+        Appends a mean difference and keeps the running sum of squares.
+
+        Parameters:
+        ----------
+        mean_diff : float
+            The mean difference between the current and previous frames.
+        """
+        if len(self.mean_diffs) == self.num_diffs:
+            self._square_sum -= self.mean_diffs[0] ** 2
+        self._square_sum += mean_diff**2
+        super()._add_diff(mean_diff)
+
+    def scene_changed(self):
+        """
+        Checks if the last difference is above mean + k * std of the others.
+
+        Returns:
+            bool: True if a scene change has occurred, False otherwise.
+        """
+        if len(self.mean_diffs) < min(self.MIN_DIFFS, self.num_diffs):
+            return False
+
+        last_diff = self.mean_diffs[-1]
+        count = len(self.mean_diffs) - 1
+        mean = (self._diff_sum - last_diff) / count
+        variance = (self._square_sum - last_diff**2) / count - mean**2
+        threshold = mean + self.k * math.sqrt(max(variance, 0.0))
+        return last_diff > max(threshold, self.min_diff)
+
+    def reset_state(self):
+        """
+        Resets the state of the object, including the running sum of squares.
+
+        Returns:
+            None
+        """
+        super().reset_state()
+        self._square_sum = 0.0
@@ -0,0 +1,131 @@
+"""Scene detection by HSV colour histogram distance"""
+
+import cv2
+from processor.video_processor.abstract.scene_detector_abstract import (
+    SceneDetectorAbstract,
+)
+
+
+class HistogramSceneDetector(SceneDetectorAbstract):
+    """
+    Reports a scene change when the colour distribution of a frame drifts
+    away from the frame that started the current scene.
+
+    Every frame is reduced to a normalised hue/saturation histogram of a
+    small thumbnail and compared with the histogram of the last scene's
+    first frame by Bhattacharyya distance (0 identical, 1 disjoint). A
+    camera pan over the same set keeps the colour distribution and does not
+    fire, while a cut or a fade accumulates distance until it crosses
+    `threshold`, because the reference is not replaced frame by frame.
+
+    Attributes:
+        threshold: float, the Bhattacharyya distance that starts a new scene.
+        bins: tuple, the number of hue and saturation bins.
+        thumbnail_width: int, the width the frame is shrunk to first.
+        curr_frame: numpy.ndarray or None, the current frame of the video.
+        distance: float, the distance of the current frame to the reference.
+    """
+
+    def __init__(self, threshold=0.35, bins=(16, 8), thumbnail_width=160):
+        """
+        Initializes a new instance of the HistogramSceneDetector class.
+
+        Args:
+            threshold (float, optional): The distance that starts a new scene. Defaults to 0.35.
+            bins (tuple, optional): The number of hue and saturation bins. Defaults to (16, 8).
+            thumbnail_width (int, optional): The width the frame is shrunk to first. Defaults to 160.
+        """
+        self.threshold = threshold
+        self.bins = bins
+        self.thumbnail_width = thumbnail_width
+        self.curr_frame = None
+        self.distance = 0.0
+        self._curr_hist = None
+        self._reference_hist = None
+
+    @property
+    def supports_parallel(self):
+        """
+        The reference histogram is the first frame of the current scene,
+        which can lie arbitrarily far back, so no warmup reproduces it and
+        videos are always read sequentially.
+        """
+        return False
+
+    def process_frame(self, frame):
+        """
+        Computes the histogram of a frame and its distance to the reference.
+
+        Parameters:
+        ----------
+        frame : ndarray
+            A single BGR frame of a video.
+        """
+        self.curr_frame = frame
+        self._curr_hist = self._get_histogram(frame)
+        if self._reference_hist is None:
+            self._reference_hist = self._curr_hist
+            self.distance = 0.0
+        else:
+            self.distance = cv2.compareHist(
+                self._reference_hist, self._curr_hist, cv2.HISTCMP_BHATTACHARYYA
+            )
+
+    def _get_histogram(self, frame):
+        """
+        Returns the normalised hue/saturation histogram of a frame thumbnail.
+
+        Parameters:
+        ----------
+        frame : ndarray
+            A single BGR frame of a video.
+
+        Returns:
+            numpy.ndarray: The histogram.
+        """
+        height, width = frame.shape[:2]
+        thumbnail_width = min(self.thumbnail_width, width)
+        thumbnail = cv2.resize(
+            frame,
+            (thumbnail_width, max(1, height * thumbnail_width // width)),
+            interpolation=cv2.INTER_AREA,
+        )
+        hsv = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2HSV)
+        hist = cv2.calcHist([hsv], [0, 1], None, list(self.bins), [0, 180, 0, 256])
+        return cv2.normalize(hist, hist).flatten()
+
+    def scene_changed(self):
+        """
+        Checks if the current frame is far enough from the reference.
+
+        The current frame becomes the new reference when it starts a scene.
+
+        Returns:
+            bool: True if a scene change has occurred, False otherwise.
+        """
+        if self.distance <= self.threshold:
+            return False
+        self._reference_hist = self._curr_hist
+        self.distance = 0.0
+        return True
+
+    def get_scene(self):
+        """
+        Returns a copy of the current frame.
+
+        Returns:
+            numpy.ndarray: The current frame.
+        """
+        return self.curr_frame.copy()
+
+    def reset_state(self):
+        """
+        Forgets the reference histogram and the current frame.
+
+        Returns:
+            None
+        """
+        self.curr_frame = None
+        self.distance = 0.0
+        self._curr_hist = None
+        self._reference_hist = None
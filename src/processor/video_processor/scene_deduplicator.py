@@ -0,0 +1,136 @@
+"""
+Drops scenes that look like a scene seen before in the same video
+"""
+
+from processor.video_processor.scene_saver import scene_to_image
+from vector_store.phash_index import DEFAULT_HASH_SIZE, compute_dhash
+from utils.logger import log
+
+
+def compute_frame_dhash(frame, hash_size=DEFAULT_HASH_SIZE):
+    """
+    Computes the difference hash of a BGR frame.
+
+    The frame is converted exactly like the scenes handed to the captioning
+    model and hashed with `vector_store.compute_dhash`, so a scene gets the
+    same hash here and in the perceptual hash index.
+
+    Args:
+        frame (numpy.ndarray): The BGR frame to hash.
+        hash_size (int): Number of rows of the hash grid; 8 gives a 64-bit hash.
+
+    Returns:
+        int: The hash as an unsigned integer.
+    """
+    return compute_dhash(scene_to_image(frame), hash_size)
+
+
+class SceneDeduplicator:
+    """
+    Keeps one representative scene per cluster of look-alike scenes.
+
+    Every scene is compared by dHash with the representatives kept so far,
+    not only with the previous scene, so a cut back to an earlier shot is
+    recognised. Scenes within `max_distance` bits of a representative join
+    its cluster and are dropped.
+
+    Attributes:
+        max_distance (int): Largest Hamming distance of a duplicate, 0 keeps
+            every scene.
+        max_scenes (int): Maximum number of scenes kept per video, spread
+            over its duration when the frame count is known, 0 for no limit.
+        representatives (list): The hashes of the kept scenes.
+        duplicates (int): Number of scenes dropped as duplicates.
+        over_quota (int): Number of scenes dropped to stay within the cap.
+    """
+
+    def __init__(self, max_distance=6, max_scenes=0):
+        self.max_distance = max_distance
+        self.max_scenes = max_scenes
+        self.representatives = []
+        self.duplicates = 0
+        self.over_quota = 0
+
+    def add(self, scene):
+        """
+        Adds a scene if it does not look like a kept scene.
+
+        Args:
+            scene (numpy.ndarray): The BGR scene frame.
+
+        Returns:
+            bool: True if the scene is new and was kept.
+        """
+        if self.max_distance <= 0:
+            self.representatives.append(None)
+            return True
+        scene_hash = compute_frame_dhash(scene)
+        for representative in self.representatives:
+            if bin(scene_hash ^ representative).count("1") <= self.max_distance:
+                self.duplicates += 1
+                return False
+        self.representatives.append(scene_hash)
+        return True
+
+    def quota(self, frame_index, num_frames=None):
+        """
+        Returns how many scenes may have been kept up to a frame.
+
+        The `max_scenes` budget is spread evenly over the frames of the
+        video, and budget not used by a quiet part carries over to the rest.
+
+        Args:
+            frame_index (int): Index of the frame.
+            num_frames (int): Number of frames of the video, None if unknown.
+
+        Returns:
+            int: The number of scenes allowed, `max_scenes` if the frame
+            count is unknown.
+        """
+        if not num_frames:
+            return self.max_scenes
+        allowed = -(-self.max_scenes * (frame_index + 1) // num_frames)
+        return min(max(allowed, 1), self.max_scenes)
+
+    def filter(self, scenes, num_frames=None):
+        """
+        Yields the scenes that start a new cluster as soon as they are found.
+
+        With a `max_scenes` cap, a scene is dropped while the scenes kept so
+        far already use up the quota of its position in the video, so the
+        kept scenes cover the whole video rather than only its start. Only
+        hashes are held, never frames. Reading stops once the full cap is
+        used.
+
+        Args:
+            scenes (iterator): (frame_index, frame) of the scenes of one
+                video, in order.
+            num_frames (int): Number of frames of the video. Without it the
+                first `max_scenes` scenes are kept.
+
+        Yields:
+            tuple: (frame_index, frame) of the representative scenes, in order.
+        """
+        try:
+            for frame_index, scene in scenes:
+                if self.max_scenes:
+                    if len(self.representatives) >= self.max_scenes:
+                        log.warning(
+                            f"Reached {self.max_scenes} scenes, skipping the rest of the video."
+                        )
+                        break
+                    if len(self.representatives) >= self.quota(frame_index, num_frames):
+                        self.over_quota += 1
+                        continue
+                if self.add(scene):
+                    yield frame_index, scene
+        finally:
+            if hasattr(scenes, "close"):
+                scenes.close()
+            if self.duplicates:
+                log.info(f"Skipped {self.duplicates} duplicate scene(s).")
+            if self.over_quota:
+                log.info(
+                    f"Skipped {self.over_quota} scene(s) to spread {self.max_scenes} "
+                    "scenes over the video."
+                )
@@ -1,21 +1,28 @@
+from collections import deque
 import cv2
+from .abstract.scene_detector_abstract import SceneDetectorAbstract
 
 
-class SceneDetector:
+class SceneDetector(SceneDetectorAbstract):
     """
     A class for detecting scene changes in a video.
 
+    A scene change is reported when the mean absolute difference to the
+    previous frame is above the average of the last `num_diffs` differences.
+
     Attributes:
-        prev_frame: numpy.ndarray or None, the previous frame of the video.
+        prev_frame: numpy.ndarray or None, the previous frame of the video,
+        always None in fast mode.
         prev_gray: numpy.ndarray or None, the previous frame in grayscale.
         curr_frame: numpy.ndarray or None, the current frame of the video.
         curr_gray: numpy.ndarray or None, the current frame in grayscale.
-        mean_diffs: list, a list of mean differences between current and
-        previous frames.
+        mean_diffs: deque, a ring buffer of the mean differences between
+        current and previous frames.
         num_diffs: int, the maximum number of mean differences to be stored in
-        the mean_diffs list.
-        diff_index: int, the index of the oldest mean difference in the
-        mean_diffs list.
+        the mean_diffs ring buffer.
+        fast: bool, whether frames are compared as downscaled grayscale
+        thumbnails.
+        thumbnail_width: int, the width of the thumbnails in fast mode.
 
     Methods:
         process_frame(frame): Processes a new frame and updates the mean
@@ -25,60 +32,114 @@ class SceneDetector:
         get_scene(): Returns the current frame.
     """
 
-    def __init__(self, num_diffs=30):
+    def __init__(self, num_diffs=30, fast=False, thumbnail_width=160):
         """
         Initializes a new instance of the SceneDetector class.
 
         Args:
-            num_diffs (int, optional): The maximum number of mean differences to be stored in the mean_diffs list. Defaults to 30.
+            num_diffs (int, optional): The maximum number of mean differences to be stored in the mean_diffs ring buffer. Defaults to 30.
+            fast (bool, optional): Compare downscaled grayscale thumbnails instead of full-resolution frames. Defaults to False.
+            thumbnail_width (int, optional): The width of the thumbnails in fast mode. Defaults to 160.
 
         Attributes:
             prev_frame (numpy.ndarray or None): The previous frame of the video.
+            prev_gray (numpy.ndarray or None): The previous frame in grayscale, kept so it is converted only once.
             curr_frame (numpy.ndarray or None): The current frame of the video.
-            mean_diffs (list): A list of mean differences between current and previous frames.
-            num_diffs (int): The maximum number of mean differences to be stored in the mean_diffs list.
-            diff_index (int): The index of the oldest mean difference in the mean_diffs list.
+            mean_diffs (deque): The last `num_diffs` mean differences between current and previous frames.
+            num_diffs (int): The maximum number of mean differences to be stored in the mean_diffs ring buffer.
         """
         self.prev_frame = None
+        self.prev_gray = None
         self.curr_frame = None
-        self.mean_diffs = []
+        self.curr_gray = None
         self.num_diffs = num_diffs
-        self.diff_index = 0
+        self.fast = fast
+        self.thumbnail_width = thumbnail_width
+        self.mean_diffs = deque(maxlen=num_diffs)
+        self._diff_sum = 0.0
 
     def process_frame(self, frame):
         """
-        Processes a single frame of a video and updates mean_diffs list.
+        Processes a single frame of a video and updates mean_diffs ring buffer.
 
         This method calculates the difference between the current frame and
         the previous frame, and calculates the mean difference.
-        It then appends the mean difference to mean_diffs list.
-        If the length of mean_diffs list is greater than num_diffs,
-        then the oldest difference is removed from the list.
+        It then appends the mean difference to the mean_diffs ring buffer,
+        which drops the oldest difference once it holds num_diffs values.
+        The running sum of the buffer is updated alongside.
+
+        In fast mode the frame is shrunk to a grayscale thumbnail first and
+        is not copied; the full-resolution frame is only copied by
+        `get_scene` when a scene is emitted, and `prev_frame` stays None.
 
         Parameters:
         ----------
         frame : ndarray
             A single frame of a video.
         """
-        self.curr_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        self.curr_frame = frame.copy()
-        if self.prev_frame is not None:
-            if self.curr_frame.shape != self.prev_frame.shape:
-                self.curr_frame = cv2.resize(
-                    self.curr_frame,
-                    (self.prev_frame.shape[1], self.prev_frame.shape[0]),
-                )
-
-            diff = cv2.absdiff(
-                self.curr_gray, cv2.cvtColor(self.prev_frame, cv2.COLOR_BGR2GRAY)
-            )
-            mean_diff = diff.mean()
-            self.mean_diffs.append(mean_diff)
-
-            if len(self.mean_diffs) > self.num_diffs:
-                self.mean_diffs.pop(0)
-
-        self.prev_frame = self.curr_frame
+        if self.fast:
+            self.curr_frame = frame
+            self.curr_gray = self._get_thumbnail(frame)
+        else:
+            self.curr_frame = frame.copy()
+            if self.prev_frame is not None:
+                if self.curr_frame.shape != self.prev_frame.shape:
+                    self.curr_frame = cv2.resize(
+                        self.curr_frame,
+                        (self.prev_frame.shape[1], self.prev_frame.shape[0]),
+                    )
+            self.curr_gray = cv2.cvtColor(self.curr_frame, cv2.COLOR_BGR2GRAY)
+
+        if self.prev_gray is not None:
+            self._add_diff(cv2.absdiff(self.curr_gray, self.prev_gray).mean())
+
+        # In fast mode only the thumbnail of the previous frame is compared,
+        # so no full-resolution frame is kept alive between calls
+        self.prev_frame = None if self.fast else self.curr_frame
+        self.prev_gray = self.curr_gray
+
+    @property
+    def warmup_frames(self):
+        """The first frame plus a full window of differences."""
+        return self.num_diffs + 1
+
+    def _add_diff(self, mean_diff):
+        """
+        Appends a mean difference to the ring buffer and the running sum.
+
+        Parameters:
+        ----------
+        mean_diff : float
+            The mean difference between the current and previous frames.
+        """
+        if len(self.mean_diffs) == self.num_diffs:
+            self._diff_sum -= self.mean_diffs[0]
+        self.mean_diffs.append(mean_diff)
+        self._diff_sum += mean_diff
+
+    def _get_thumbnail(self, frame):
+        """
+        Shrinks a frame to a grayscale thumbnail of `thumbnail_width` pixels.
+
+        The thumbnail height follows the first frame, so frames of a
+        different size still produce comparable thumbnails.
+
+        Parameters:
+        ----------
+        frame : ndarray
+            A single BGR frame of a video.
+
+        Returns:
+            numpy.ndarray: The grayscale thumbnail.
+        """
+        if self.prev_gray is not None:
+            size = (self.prev_gray.shape[1], self.prev_gray.shape[0])
+        else:
+            height, width = frame.shape[:2]
+            thumbnail_width = min(self.thumbnail_width, width)
+            size = (thumbnail_width, max(1, height * thumbnail_width // width))
+        thumbnail = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY)
 
     def scene_changed(self):
         """
@@ -91,7 +152,7 @@ class SceneDetector:
         if len(self.mean_diffs) < self.num_diffs:
             return False
 
-        threshold = sum(self.mean_diffs) / len(self.mean_diffs)
+        threshold = self._diff_sum / len(self.mean_diffs)
         return self.mean_diffs[-1] > threshold
 
     def get_scene(self):
@@ -101,13 +162,15 @@ class SceneDetector:
         Returns:
             numpy.ndarray: The current frame.
         """
+        if self.fast:
+            return self.curr_frame.copy()
         return self.curr_frame
 
     def reset_state(self):
         """
         Resets the state of the object.
 
-        This method resets the `prev_frame` attribute to `None` and clears the `mean_diffs` list.
+        This method resets the `prev_frame` and `prev_gray` attributes to `None` and clears the `mean_diffs` ring buffer.
 
         Parameters:
             None
@@ -116,4 +179,6 @@ class SceneDetector:
             None
         """
         self.prev_frame = None
-        self.mean_diffs = []
+        self.prev_gray = None
+        self.mean_diffs.clear()
+        self._diff_sum = 0.0
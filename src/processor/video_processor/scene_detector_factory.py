@@ -0,0 +1,49 @@
+"""Creates the scene detector selected in the configuration"""
+
+from processor.video_processor.scene_detector import SceneDetector
+from processor.video_processor.impl.adaptive_scene_detector import (
+    AdaptiveSceneDetector,
+)
+from processor.video_processor.impl.histogram_scene_detector import (
+    HistogramSceneDetector,
+)
+
+SCENE_DETECTORS = ("mean_diff", "adaptive", "histogram")
+
+
+def create_scene_detector(video_config):
+    """
+    Creates a scene detector from the video processing configuration.
+
+    Args:
+        video_config (VideoProcessingConfig): The video processing settings.
+
+    Returns:
+        SceneDetectorAbstract: A new detector instance.
+
+    Raises:
+        ValueError: If the configured detector is not supported.
+    """
+    name = video_config.scene_detector
+    if name == "mean_diff":
+        return SceneDetector(
+            num_diffs=video_config.num_diffs,
+            fast=video_config.fast_scene_detection,
+            thumbnail_width=video_config.thumbnail_width,
+        )
+    if name == "adaptive":
+        return AdaptiveSceneDetector(
+            num_diffs=video_config.num_diffs,
+            k=video_config.adaptive_k,
+            min_diff=video_config.adaptive_min_diff,
+            fast=video_config.fast_scene_detection,
+            thumbnail_width=video_config.thumbnail_width,
+        )
+    if name == "histogram":
+        return HistogramSceneDetector(
+            threshold=video_config.histogram_threshold,
+            thumbnail_width=video_config.thumbnail_width,
+        )
+    raise ValueError(
+        f"Scene detector {name} not supported, expected one of {SCENE_DETECTORS}"
+    )
@@ -0,0 +1,88 @@
+"""
+Overlaps scene detection with the work done on the detected scenes
+"""
+
+import queue
+import threading
+
+_END = object()
+
+
+def iter_scene_batches(scenes, batch_size, max_queue_size=16):
+    """
+    Reads scenes in a background thread and yields them in batches.
+
+    A producer thread pulls scenes from `scenes`, typically
+    `VideoProcessor.iter_scenes()`, into a bounded queue while the caller
+    works on the previous batch, so video decoding and model inference run
+    at the same time. Every batch holds the scenes that are already waiting,
+    up to `batch_size`, so the first scene is never held back to fill a
+    batch. The bounded queue stops detection from running ahead of the
+    consumer by more than `max_queue_size` scenes.
+
+    Args:
+        scenes (iterator): The scenes to read, in order.
+        batch_size (int): Maximum number of scenes per batch.
+        max_queue_size (int): Scenes that can wait before the producer blocks.
+
+    Yields:
+        list: The next scenes, in order.
+
+    Raises:
+        Exception: Whatever the scene iterator raised, once the scenes read
+        before the error have been yielded.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer.")
+
+    scene_queue = queue.Queue(maxsize=max_queue_size)
+    stop = threading.Event()
+    errors = []
+
+    def put(item):
+        """Queues an item, giving up once the consumer has stopped."""
+        while not stop.is_set():
+            try:
+                scene_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for scene in scenes:
+                if not put(scene):
+                    break
+        except Exception as e:
+            errors.append(e)
+        finally:
+            if hasattr(scenes, "close"):
+                scenes.close()
+            put(_END)
+
+    producer = threading.Thread(target=produce, name="scene-producer", daemon=True)
+    producer.start()
+    try:
+        finished = False
+        while not finished:
+            scene = scene_queue.get()
+            if scene is _END:
+                break
+            batch = [scene]
+            while len(batch) < batch_size:
+                try:
+                    scene = scene_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if scene is _END:
+                    finished = True
+                    break
+                batch.append(scene)
+            yield batch
+    finally:
+        stop.set()
+        producer.join()
+
+    if errors:
+        raise errors[0]
@@ -1,11 +1,28 @@
 import os
 import cv2
+from PIL import Image
+
+
+def scene_to_image(scene):
+    """
+    Converts a BGR scene frame to an image the captioning model accepts.
+
+    Args:
+        scene (numpy.ndarray): The BGR scene frame.
+
+    Returns:
+        PIL.Image.Image: The scene as an RGB image.
+    """
+    return Image.fromarray(cv2.cvtColor(scene, cv2.COLOR_BGR2RGB))
 
 
 class SceneSaver:
     """
     A class that saves extracted scenes as JPEG images.
 
+    Captioning works on the scenes in memory, so saving them to disk is only
+    needed to inspect what the scene detector picked.
+
     Args:
         scenes_dir (str, optional): Directory where the extracted
         scenes will be saved. Defaults to 'extracted_images'.
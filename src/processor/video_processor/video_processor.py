@@ -2,7 +2,79 @@
 Detect and saves video frames to the specified directory
 """
 
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 import cv2
+from utils.logger import log
+from .frame_source import create_frame_source
+
+
+def iter_scene_changes(
+    cap, scene_detector, sampler, skip_rate, start_frame=0, end_frame=None
+):
+    """
+    Runs a scene detector over the sampled frames of a video.
+
+    Args:
+        cap (cv2.VideoCapture): An opened video capture.
+        scene_detector (SceneDetector): The scene detector to feed.
+        sampler (str): The frame sampler, "grab" or "seek".
+        skip_rate (int): Distance between two sampled frames.
+        start_frame (int): Index of the first frame to read.
+        end_frame (int): Index one past the last frame to read.
+
+    Yields:
+        int: The index of every frame at which the detector saw a scene
+        change. The scene itself is available from `scene_detector.get_scene()`
+        until the next frame is requested.
+    """
+    frame_source = create_frame_source(sampler, cap, skip_rate, start_frame, end_frame)
+    for frame_index, frame in frame_source:
+        scene_detector.process_frame(frame)
+        if scene_detector.scene_changed():
+            yield frame_index
+
+
+def detect_scene_changes_in_range(
+    video_path, scene_detector, sampler, skip_rate, start_frame, end_frame, warmup
+):
+    """
+    Detects the scene changes of one frame range in a worker process.
+
+    The detector is first fed the `warmup` frames before `start_frame`, so
+    its moving statistics at `start_frame` are the same as if the video had
+    been read from the beginning. Changes within the warmup are discarded.
+
+    Args:
+        video_path (str): Path to the video file.
+        scene_detector (SceneDetector): A copy of the scene detector to run.
+        sampler (str): The frame sampler, "grab" or "seek".
+        skip_rate (int): Distance between two sampled frames.
+        start_frame (int): Index of the first frame of the range.
+        end_frame (int): Index one past the last frame of the range.
+        warmup (int): Number of frames read before the range.
+
+    Returns:
+        list: (frame_index, scene) tuples of every scene change in the range.
+    """
+    cap = cv2.VideoCapture(video_path)
+    scene_detector.reset_state()
+    scene_changes = []
+    try:
+        for frame_index in iter_scene_changes(
+            cap,
+            scene_detector,
+            sampler,
+            skip_rate,
+            max(0, start_frame - warmup),
+            end_frame,
+        ):
+            if frame_index >= start_frame:
+                scene_changes.append((frame_index, scene_detector.get_scene()))
+    finally:
+        cap.release()
+    return scene_changes
 
 
 class VideoProcessor:
@@ -13,13 +85,30 @@ class VideoProcessor:
     -----------
     video_path : str
         Path to the video file.
-    scene_detector : SceneDetector
-        An instance of SceneDetector class that detects scene changes.
+    scene_detector : SceneDetectorAbstract
+        A scene detector, see `create_scene_detector`.
     scene_saver : SceneSaver
         An instance of SceneSaver class that saves detected scenes.
+    sampler : str
+        How sampled frames are read, "grab" or "seek" (see frame_source).
+    num_workers : int
+        Number of processes used for long videos, 0 for one per CPU core and
+        1 to always read the video sequentially.
+    parallel_min_duration : float
+        Videos shorter than this many seconds are always read sequentially.
     """
 
-    def __init__(self, video_path, scene_detector, scene_saver):
+    MIN_FRAMES_BETWEEN_SAVES = 30
+
+    def __init__(
+        self,
+        video_path,
+        scene_detector,
+        scene_saver,
+        sampler="grab",
+        num_workers=1,
+        parallel_min_duration=60,
+    ):
         """
         Initializes the VideoProcessor with the provided video_path, scene_detector, and scene_saver.
 
@@ -27,57 +116,195 @@ class VideoProcessor:
             video_path (str): Path to the video file.
             scene_detector (SceneDetector): An instance of SceneDetector class that detects scene changes.
             scene_saver (SceneSaver): An instance of SceneSaver class that saves detected scenes.
+            sampler (str): "grab" decodes the video sequentially and only
+                retrieves sampled frames, "seek" jumps to every sampled frame
+                and suits long videos.
+            num_workers (int): Number of processes used for long videos, 0
+                for one per CPU core. Defaults to 1 (sequential).
+            parallel_min_duration (float): Minimum duration in seconds for a
+                video to be split across processes.
         """
         self.video_path = video_path
         self.scene_detector = scene_detector
         self.scene_saver = scene_saver
+        self.sampler = sampler
+        self.num_workers = num_workers
+        self.parallel_min_duration = parallel_min_duration
+        self.fps = None
+
+    def get_frame_count(self):
+        """
+        Returns the number of frames of the video without decoding it.
+
+        Returns:
+            int: The frame count reported by the container, 0 if unknown.
+        """
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            return max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 0)
+        finally:
+            cap.release()
+
+    @staticmethod
+    def get_skip_rate(duration):
+        """
+        Returns the distance between two sampled frames for a video.
+
+        Args:
+            duration (float): Duration of the video in seconds.
+
+        Returns:
+            int: Every `skip_rate`-th frame is passed to the scene detector.
+        """
+        if duration <= 10:
+            return 3
+        if duration <= 15:
+            return 5
+        if duration <= 30:
+            return 10
+        if duration <= 45:
+            return 15
+        if duration <= 60:
+            return 20
+        return 30
+
+    def get_num_workers(self, duration):
+        """
+        Returns the number of processes used for a video.
+
+        Videos are read sequentially if they are short or if the scene
+        detector cannot be split into ranges (see `supports_parallel`).
+
+        Args:
+            duration (float): Duration of the video in seconds.
+
+        Returns:
+            int: 1 if the video is read sequentially.
+        """
+        if duration < self.parallel_min_duration:
+            return 1
+        if not self.scene_detector.supports_parallel:
+            log.info(
+                f"{type(self.scene_detector).__name__} cannot be split across "
+                "processes, reading the video sequentially."
+            )
+            return 1
+        return self.num_workers or os.cpu_count() or 1
 
     def detect_scenes(self):
         """
         Detects and saves different scenes in a video file.
 
-        This method reads each frame of the video and checks if there is any
-        scene change. If there is a scene change, then it saves the current
-        frame as a new scene. It uses SceneDetector and SceneSaver classes
-        to detect and save scenes respectively.
+        Every scene yielded by `iter_scenes` is passed to the scene saver.
+        """
+        for _, scene in self.iter_scenes():
+            self.scene_saver.save_scene(scene)
+
+    def iter_scenes(self):
+        """
+        Detects the different scenes of a video file as it is read.
+
+        This method reads every `skip_rate`-th frame of the video and checks
+        if there is any scene change. If there is a scene change, then it
+        yields the current frame as a new scene, so the caller can work on
+        it while the rest of the video is decoded. Frames in between are
+        never converted to images. Long videos are split into frame ranges
+        that are processed in parallel (see `iter_scenes_parallel`).
+
+        The frame rate of the video is stored in `fps`, so frame indices can
+        be turned into timestamps.
+
+        Yields:
+            tuple: (frame_index, frame) of the first frame of every scene, in
+            video order.
         """
         cap = cv2.VideoCapture(self.video_path)
         fps = cap.get(cv2.CAP_PROP_FPS)
+        self.fps = fps
         frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         duration = frame_count / fps
-        frame_index = 0
         last_saved_frame_index = 0
-        min_frames_between_saves = 30
+        skip_rate = self.get_skip_rate(duration)
+        num_workers = self.get_num_workers(duration)
 
-        if duration <= 10:
-            skip_rate = 3
-        elif duration <= 15:
-            skip_rate = 5
-        elif duration <= 30:
-            skip_rate = 10
-        elif duration <= 45:
-            skip_rate = 15
-        elif duration <= 60:
-            skip_rate = 20
-        else:
-            skip_rate = 30
-
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            if frame_index % skip_rate != 0:
-                frame_index += 1
-                continue
-
-            self.scene_detector.process_frame(frame)
-            if self.scene_detector.scene_changed():
-                if frame_index - last_saved_frame_index >= min_frames_between_saves:
-                    scene = self.scene_detector.get_scene()
-                    self.scene_saver.save_scene(scene)
+        if num_workers > 1:
+            cap.release()
+            yield from self.iter_scenes_parallel(frame_count, skip_rate, num_workers)
+            return
+
+        try:
+            for frame_index in iter_scene_changes(
+                cap, self.scene_detector, self.sampler, skip_rate
+            ):
+                if (
+                    frame_index - last_saved_frame_index
+                    >= self.MIN_FRAMES_BETWEEN_SAVES
+                ):
+                    yield frame_index, self.scene_detector.get_scene()
                     last_saved_frame_index = frame_index
+        finally:
+            cap.release()
+            self.scene_detector.reset_state()
+
+    def iter_scenes_parallel(self, frame_count, skip_rate, num_workers):
+        """
+        Detects scenes with one process per frame range.
 
-            frame_index += 1
+        The video is split into `num_workers` ranges aligned to `skip_rate`.
+        Every worker opens its own capture, seeks to its range and runs a
+        copy of the scene detector, warmed up on the frames just before the
+        range. The scene changes of the ranges are merged in frame order and
+        `MIN_FRAMES_BETWEEN_SAVES` is applied across range boundaries, so the
+        scenes match a sequential pass; detectors whose state is not bounded
+        by `warmup_frames` are never run here (see `get_num_workers`). The
+        scenes of a range are yielded as soon as it and every range before
+        it are done.
 
-        cap.release()
-        self.scene_detector.reset_state()
+        Args:
+            frame_count (int): Number of frames of the video.
+            skip_rate (int): Distance between two sampled frames.
+            num_workers (int): Number of processes to use.
+
+        Yields:
+            tuple: (frame_index, frame) of the first frame of every scene, in
+            video order.
+        """
+        chunk_size = -(-frame_count // (num_workers * skip_rate)) * skip_rate
+        warmup = self.scene_detector.warmup_frames * skip_rate
+        ranges = [
+            (start_frame, min(start_frame + chunk_size, frame_count))
+            for start_frame in range(0, frame_count, chunk_size)
+        ]
+        log.info(
+            f"Detecting scenes of {frame_count} frames in {len(ranges)} processes."
+        )
+
+        executor = ProcessPoolExecutor(
+            max_workers=len(ranges), mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            futures = [
+                executor.submit(
+                    detect_scene_changes_in_range,
+                    self.video_path,
+                    self.scene_detector,
+                    self.sampler,
+                    skip_rate,
+                    start_frame,
+                    end_frame,
+                    warmup,
+                )
+                for start_frame, end_frame in ranges
+            ]
+            last_saved_frame_index = 0
+            for future in futures:
+                for frame_index, scene in future.result():
+                    if (
+                        frame_index - last_saved_frame_index
+                        >= self.MIN_FRAMES_BETWEEN_SAVES
+                    ):
+                        yield frame_index, scene
+                        last_saved_frame_index = frame_index
+        finally:
+            executor.shutdown(cancel_futures=True)
+            self.scene_detector.reset_state()
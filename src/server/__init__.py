@@ -0,0 +1,15 @@
+"""
+HTTP captioning service with dynamic batching
+"""
+
+from .dynamic_batcher import DynamicBatcher, QueueFullError
+from .fake_models import FakeChatbot, FakeInference
+from .caption_server import create_app
+
+__all__ = [
+    "DynamicBatcher",
+    "QueueFullError",
+    "FakeChatbot",
+    "FakeInference",
+    "create_app",
+]
@@ -0,0 +1,210 @@
+"""
+Asynchronous HTTP captioning service.
+
+Usage (from the src directory):
+    python -m server.caption_server
+    python -m server.caption_server --fake --port 8081
+
+POST an image as the multipart field "file" to /caption, optionally with
+the caption parameters as form fields; the response is a JSON object with
+the visual description and the caption, and with num_variants above 1 the
+separated alternative captions. Uploads from all clients share one
+request queue, from which the vision model is fed in dynamic batches, while
+the LLM calls of different requests run in parallel. GET /health returns
+the batcher counters. With --fake the server runs without model weights or
+Ollama, for load tests.
+"""
+
+import argparse
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from PIL import Image
+from captioning.impl.image_caption_generator import ImageCaptionGenerator
+from configuration_manager.config_manager import ConfigManager
+from server.dynamic_batcher import DynamicBatcher, QueueFullError
+from server.fake_models import FakeChatbot, FakeInference
+from utils.caption_variants import MAX_VARIANTS, parse_variants
+from utils.hashtag_index import create_hashtag_index
+from utils.logger import log
+
+CAPTION_DEFAULTS = {
+    "caption_size": "small",
+    "context": "",
+    "caption_style": "informative",
+    "content_type": "image",
+    "influencer_persona": "general",
+    "num_hashtags": 0,
+    "tone": "casual",
+    "social_media": "Instagram",
+    "num_variants": 1,
+}
+
+BATCHER = web.AppKey("batcher", DynamicBatcher)
+GENERATOR = web.AppKey("generator", ImageCaptionGenerator)
+LLM_EXECUTOR = web.AppKey("llm_executor", ThreadPoolExecutor)
+
+
+def parse_caption_params(form):
+    """
+    Reads the caption parameters of a request, falling back to defaults.
+
+    Args:
+        form (MultiDictProxy): The posted form fields.
+
+    Returns:
+        dict: The caption parameters.
+
+    Raises:
+        ValueError: If `num_hashtags` is not a non-negative integer or
+            `num_variants` is out of range.
+    """
+    params = {key: form.get(key, default) for key, default in CAPTION_DEFAULTS.items()}
+    params["num_hashtags"] = int(params["num_hashtags"])
+    if params["num_hashtags"] < 0:
+        raise ValueError("num_hashtags must not be negative")
+    params["num_variants"] = int(params["num_variants"])
+    if not 1 <= params["num_variants"] <= MAX_VARIANTS:
+        raise ValueError(f"num_variants must be between 1 and {MAX_VARIANTS}")
+    return params
+
+
+def read_image(file):
+    """Decodes an uploaded image into an RGB PIL image."""
+    with Image.open(file) as image:
+        return image.convert("RGB")
+
+
+def json_error(status, message, headers=None):
+    """Returns a JSON error response."""
+    return web.json_response({"error": message}, status=status, headers=headers)
+
+
+async def handle_caption(request):
+    """Captions one uploaded image."""
+    form = await request.post()
+    upload = form.get("file")
+    if not isinstance(upload, web.FileField):
+        return json_error(400, "Upload the image as the multipart field 'file'.")
+    try:
+        params = parse_caption_params(form)
+    except ValueError as e:
+        return json_error(400, f"Invalid caption parameters: {e}")
+
+    loop = asyncio.get_running_loop()
+    try:
+        image = await loop.run_in_executor(None, read_image, upload.file)
+    except Image.DecompressionBombError:
+        return json_error(400, "The image has too many pixels.")
+    except OSError:
+        return json_error(415, "The upload is not a supported image.")
+
+    try:
+        description = await request.app[BATCHER].submit(image)
+    except QueueFullError:
+        return json_error(503, "The server is busy.", {"Retry-After": "1"})
+
+    write_caption = functools.partial(
+        request.app[GENERATOR].write_caption,
+        description,
+        params["caption_size"],
+        params["context"],
+        params["caption_style"],
+        params["content_type"],
+        params["influencer_persona"],
+        params["num_hashtags"],
+        params["tone"],
+        params["social_media"],
+        stream=False,
+        num_variants=params["num_variants"],
+    )
+    response = await loop.run_in_executor(request.app[LLM_EXECUTOR], write_caption)
+    caption = response["message"]["content"]
+    body = {"description": description, "caption": caption}
+    if params["num_variants"] > 1:
+        body["variants"] = parse_variants(caption)
+    return web.json_response(body)
+
+
+async def handle_health(request):
+    """Returns the batcher counters."""
+    return web.json_response(request.app[BATCHER].get_stats())
+
+
+def create_app(inference, chatbot, server_config, hashtag_index=None):
+    """
+    Creates the captioning application.
+
+    Args:
+        inference (InferenceAbstract): The vision model, or a `FakeInference`.
+        chatbot (LLMChatbot): The chatbot, or a `FakeChatbot`.
+        server_config (ServerConfig): Batching, queue and upload limits.
+        hashtag_index (HashtagIndex): Hashtags of earlier captions. Optional.
+
+    Returns:
+        web.Application: The application, ready to be run.
+    """
+    app = web.Application(client_max_size=server_config.max_upload_mb * 1024 * 1024)
+    app[BATCHER] = DynamicBatcher(
+        functools.partial(
+            inference.caption_batch, batch_size=server_config.max_batch_size
+        ),
+        max_batch_size=server_config.max_batch_size,
+        max_latency=server_config.max_latency_ms / 1000,
+        max_queue_size=server_config.max_queue_size,
+    )
+    app[GENERATOR] = ImageCaptionGenerator(chatbot, hashtag_index=hashtag_index)
+    app[LLM_EXECUTOR] = ThreadPoolExecutor(
+        max_workers=server_config.llm_workers, thread_name_prefix="caption-llm"
+    )
+
+    async def start_batcher(app):
+        await app[BATCHER].start()
+
+    async def stop_workers(app):
+        await app[BATCHER].stop()
+        app[LLM_EXECUTOR].shutdown(wait=False)
+
+    app.on_startup.append(start_batcher)
+    app.on_cleanup.append(stop_workers)
+    app.router.add_post("/caption", handle_caption)
+    app.router.add_get("/health", handle_health)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve image captions over HTTP.")
+    parser.add_argument("--host", help="Overrides the configured host.")
+    parser.add_argument("--port", type=int, help="Overrides the configured port.")
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="Use stand-in models, for load tests without weights or Ollama.",
+    )
+    args = parser.parse_args(argv)
+
+    app_config = ConfigManager.get_config_manager().get_app_config()
+    server_config = app_config.server
+    if args.fake:
+        inference, chatbot = FakeInference(), FakeChatbot()
+    else:
+        # Imported here so that --fake works without the model dependencies
+        from inference.model_factory import create_inference
+        from llm_chatbot import LLMChatbot
+
+        inference, chatbot = create_inference(app_config), LLMChatbot()
+    hashtag_index = None if args.fake else create_hashtag_index(app_config.hashtags)
+
+    host = args.host or server_config.host
+    port = args.port or server_config.port
+    log.info(f"Serving captions on http://{host}:{port}")
+    web.run_app(
+        create_app(inference, chatbot, server_config, hashtag_index),
+        host=host,
+        port=port,
+    )
+
+
+if __name__ == "__main__":
+    main()
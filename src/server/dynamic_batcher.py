@@ -0,0 +1,181 @@
+"""Collects concurrent requests into batches for the vision model."""
+
+import asyncio
+import threading
+import time
+from utils.logger import log
+
+
+class QueueFullError(Exception):
+    """Raised when a request arrives while the request queue is full."""
+
+
+class DynamicBatcher:
+    """
+    An asyncio request queue that feeds the vision model in batches.
+
+    Requests wait in a bounded queue. The worker takes the oldest request
+    and keeps adding queued ones until the batch is full or the oldest
+    request has waited `max_latency` seconds, then captions the whole batch
+    with one call in a worker thread. Requests arriving while a batch runs
+    form the next batch, so the batch size grows with the load while a lone
+    request waits at most `max_latency` for company.
+
+    Attributes:
+        caption_batch (callable): Captions a list of PIL images, in order.
+        max_batch_size (int): Maximum number of images per call.
+        max_latency (float): Seconds the oldest request may wait for a batch.
+        max_queue_size (int): Requests that can wait before new ones are
+            rejected.
+
+    Methods:
+        start(): Starts the worker on the running event loop.
+        stop(): Stops the worker and fails the requests still waiting.
+        submit(image): Queues an image and returns its caption.
+        get_stats(): Returns the queue and batch counters.
+    """
+
+    def __init__(
+        self, caption_batch, max_batch_size=8, max_latency=0.025, max_queue_size=256
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be a positive integer.")
+        self.caption_batch = caption_batch
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.max_queue_size = max_queue_size
+        self._queue = None
+        self._worker = None
+        # The requests the worker has taken off the queue
+        self._batch = []
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "rejected": 0,
+            "failed": 0,
+            "batches": 0,
+            "images": 0,
+            "max_batch_size": 0,
+        }
+
+    async def start(self):
+        """Starts the worker task on the running event loop."""
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """
+        Stops the worker and fails the requests that are still waiting.
+
+        This includes the batch that is being collected or captioned; a
+        running model call finishes in its thread, but its captions are
+        dropped.
+        """
+        worker, self._worker = self._worker, None
+        if worker is None:
+            return
+        worker.cancel()
+        try:
+            await worker
+        except asyncio.CancelledError:
+            pass
+        waiting, self._batch = self._batch, []
+        while not self._queue.empty():
+            waiting.append(self._queue.get_nowait())
+        for _, future, _ in waiting:
+            if not future.done():
+                future.set_exception(RuntimeError("The batcher was stopped."))
+
+    async def submit(self, image):
+        """
+        Queues an image and waits for its caption.
+
+        Args:
+            image (PIL.Image.Image): The image to caption.
+
+        Returns:
+            str: The caption of the image.
+
+        Raises:
+            QueueFullError: If `max_queue_size` requests are already waiting.
+        """
+        if self._worker is None:
+            raise RuntimeError("The batcher has not been started.")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((image, future, time.monotonic()))
+        except asyncio.QueueFull:
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise QueueFullError("The request queue is full.") from None
+        with self._lock:
+            self._stats["requests"] += 1
+        return await future
+
+    def get_stats(self):
+        """
+        Returns the batcher counters.
+
+        Returns:
+            dict: Requests accepted, rejected and failed, the number of
+            batches and images captioned, the largest and mean batch size and
+            the current queue depth.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["mean_batch_size"] = (
+            stats["images"] / stats["batches"] if stats["batches"] else 0.0
+        )
+        stats["depth"] = self._queue.qsize() if self._queue else 0
+        return stats
+
+    async def _next_batch(self):
+        """Waits for the oldest request and collects a batch behind it."""
+        batch = self._batch = [await self._queue.get()]
+        deadline = batch[0][2] + self.max_latency
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        """Captions batches until the worker is cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            # Requests whose client went away are not worth captioning
+            batch = self._batch = [
+                request for request in batch if not request[1].done()
+            ]
+            if not batch:
+                continue
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["images"] += len(batch)
+                self._stats["max_batch_size"] = max(
+                    self._stats["max_batch_size"], len(batch)
+                )
+            images = [image for image, _, _ in batch]
+            try:
+                captions = await loop.run_in_executor(None, self.caption_batch, images)
+            except Exception as e:
+                log.error(f"Failed to caption a batch of {len(batch)} images: {e}")
+                with self._lock:
+                    self._stats["failed"] += len(batch)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future, _), caption in zip(batch, captions):
+                    if not future.done():
+                        future.set_result(caption)
+            self._batch = []
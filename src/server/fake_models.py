@@ -0,0 +1,49 @@
+"""Stand-ins for the vision model and the chatbot, for load tests without weights."""
+
+import time
+
+
+class FakeInference:
+    """
+    Pretends to be a vision model with a fixed cost per call and per image.
+
+    Attributes:
+        call_latency (float): Seconds every `caption_batch` call takes.
+        image_latency (float): Additional seconds per image of the batch.
+        batch_sizes (list): The size of every batch captioned so far.
+    """
+
+    DEFAULT_BATCH_SIZE = 8
+
+    def __init__(self, call_latency=0.05, image_latency=0.005):
+        self.call_latency = call_latency
+        self.image_latency = image_latency
+        self.batch_sizes = []
+
+    def caption_batch(self, image_paths, batch_size=DEFAULT_BATCH_SIZE):
+        """Returns a caption naming the size of every image."""
+        for start in range(0, len(image_paths), batch_size):
+            images = image_paths[start : start + batch_size]
+            time.sleep(self.call_latency + self.image_latency * len(images))
+            self.batch_sizes.append(len(images))
+        return [f"a {image.width}x{image.height} picture" for image in image_paths]
+
+    def get_image_caption_pipeline(self, image_path):
+        return self.caption_batch([image_path], batch_size=1)[0]
+
+
+class FakeChatbot:
+    """
+    Pretends to be the LLM chatbot, echoing the end of the prompt.
+
+    Attributes:
+        latency (float): Seconds every response takes.
+    """
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+
+    def get_response(self, content, stream=False):
+        time.sleep(self.latency)
+        response = {"message": {"content": f"Caption for: {content[-80:]}"}}
+        return iter([response]) if stream else response
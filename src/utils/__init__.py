@@ -1,19 +1,36 @@
 from .generate_directory_structure import generate_directory_structure
 from .generate_gif_placeholder import generate_interim_gif
 from .hashtag import Hashtag
+from .hashtag_table import HashtagTable
+from .hashtag_index import HashtagIndex, create_hashtag_index
 from .prompt import Prompt
 from .logger import log
 from .stream import stream_text
 from .timer import timer_decorator, advanced_timer_decorator
-
+from .caption_compactor import compact_captions, estimate_tokens
+from .caption_variants import MAX_VARIANTS, parse_variants, variant_instructions
+from .file_hash import compute_file_hash
+from .video_cache import VideoCaptionCache
+from .description_cache import VisualDescriptionCache
 
 __all__ = [
     "generate_directory_structure",
     "generate_interim_gif",
     "Hashtag",
+    "HashtagTable",
+    "HashtagIndex",
+    "create_hashtag_index",
     "Prompt",
     "log",
     "stream_text",
     "timer_decorator",
     "advanced_timer_decorator",
+    "compact_captions",
+    "estimate_tokens",
+    "MAX_VARIANTS",
+    "parse_variants",
+    "variant_instructions",
+    "compute_file_hash",
+    "VideoCaptionCache",
+    "VisualDescriptionCache",
 ]
@@ -0,0 +1,104 @@
+"""
+Compacts the per-scene captions of a video into a short visual description
+"""
+
+import math
+import re
+
+TOKENS_PER_WORD = 4 / 3
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"[a-z0-9']+")
+_STOPWORDS = frozenset(
+    "a an the and or of in on at to with for from by is are was were be "
+    "this that these there it its as into over under near some".split()
+)
+
+
+def estimate_tokens(text):
+    """
+    Estimates the number of LLM tokens of a text.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: Roughly 4 tokens per 3 words, the usual ratio for English.
+    """
+    return math.ceil(len(text.split()) * TOKENS_PER_WORD)
+
+
+def _content_words(phrase):
+    """Returns the lower-cased words of a phrase that carry meaning."""
+    return frozenset(_WORD.findall(phrase.lower())) - _STOPWORDS
+
+
+def _split_phrases(caption):
+    """Splits a caption into stripped sentences."""
+    return [
+        phrase.strip() for phrase in _SENTENCE_SPLIT.split(caption) if phrase.strip()
+    ]
+
+
+def compact_captions(captions, token_budget=300, similarity=0.8):
+    """
+    Builds a visual description of at most `token_budget` tokens.
+
+    The captions are split into phrases, and phrases whose content words
+    overlap by at least `similarity` (Jaccard) are merged, keeping the first
+    wording. Every merged phrase is ranked by how many scenes show it, then
+    by how much it describes. The best phrases are picked until the budget
+    is used up and joined in the order they first appear in the video.
+
+    Args:
+        captions (list): The caption of every scene, in video order.
+        token_budget (int): Maximum estimated tokens of the description, 0
+            for no limit.
+        similarity (float): Word overlap from which two phrases are the same.
+
+    Returns:
+        str: The compacted visual description.
+    """
+    phrases = []
+    for caption in captions:
+        for text in _split_phrases(caption):
+            words = _content_words(text)
+            for phrase in phrases:
+                union = words | phrase["words"]
+                if union and len(words & phrase["words"]) / len(union) >= similarity:
+                    phrase["support"] += 1
+                    break
+            else:
+                phrases.append(
+                    {
+                        "text": text,
+                        "words": words,
+                        "support": 1,
+                        "position": len(phrases),
+                    }
+                )
+
+    ranked = sorted(
+        phrases,
+        key=lambda phrase: (
+            -phrase["support"],
+            -len(phrase["words"]),
+            phrase["position"],
+        ),
+    )
+    selected = []
+    used_tokens = 0
+    for phrase in ranked:
+        tokens = estimate_tokens(phrase["text"])
+        if token_budget and used_tokens + tokens > token_budget:
+            continue
+        selected.append(phrase)
+        used_tokens += tokens
+
+    if not selected and ranked:
+        # Even the best phrase is over budget, keep as many of its words as fit
+        max_words = int(token_budget / TOKENS_PER_WORD)
+        return " ".join(ranked[0]["text"].split()[:max_words])
+
+    selected.sort(key=lambda phrase: phrase["position"])
+    return " ".join(phrase["text"] for phrase in selected)
@@ -0,0 +1,58 @@
+"""
+Several alternative captions from a single chat request
+"""
+
+import re
+
+MAX_VARIANTS = 5
+
+_VARIANT_MARKER = re.compile(r"^\s*#{1,6}\s*variant\s+(\d+)\s*:?\s*$", re.I | re.M)
+
+
+def variant_instructions(num_variants):
+    """
+    Returns the prompt suffix asking for several labelled captions.
+
+    Args:
+        num_variants (int): Number of alternative captions, 1 to
+            `MAX_VARIANTS`.
+
+    Returns:
+        str: The instructions, empty for a single caption.
+
+    Raises:
+        ValueError: If `num_variants` is out of range.
+    """
+    if not 1 <= num_variants <= MAX_VARIANTS:
+        raise ValueError(f"num_variants must be between 1 and {MAX_VARIANTS}.")
+    if num_variants == 1:
+        return ""
+    return (
+        f"\n\nWrite {num_variants} clearly different versions of the caption, "
+        f"each with its own hashtags. Start every version on a new line with "
+        f"a heading line '### Variant N', numbering them from 1 to "
+        f"{num_variants}, and add nothing before the first heading."
+    )
+
+
+def parse_variants(text):
+    """
+    Splits a response with several labelled captions.
+
+    Args:
+        text (str): The complete response.
+
+    Returns:
+        list: The captions in the order of their labels. A response without
+        labels is returned as a single caption.
+    """
+    markers = list(_VARIANT_MARKER.finditer(text))
+    if not markers:
+        return [text.strip()] if text.strip() else []
+    variants = []
+    for marker, next_marker in zip(markers, markers[1:] + [None]):
+        end = next_marker.start() if next_marker else len(text)
+        variant = text[marker.end() : end].strip()
+        if variant:
+            variants.append(variant)
+    return variants
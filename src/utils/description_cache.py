@@ -0,0 +1,69 @@
+"""
+In-memory cache of visual descriptions, independent of the prompt settings
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class VisualDescriptionCache:
+    """
+    A thread-safe least recently used cache of visual descriptions.
+
+    The description of an image only depends on its content and on the
+    captioning model, so it is cached apart from tone, style, platform and
+    hashtag settings; regenerating a caption with other settings then only
+    pays for prompt building and the LLM call.
+
+    Attributes:
+        max_entries (int): Descriptions kept before the least recently used
+            one is dropped.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that missed.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Returns the description stored under a key.
+
+        Args:
+            key (tuple): The content hash of the image and the model name.
+
+        Returns:
+            str or None: The description, or None on a miss.
+        """
+        with self._lock:
+            description = self._entries.get(key)
+            if description is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return description
+
+    def set(self, key, description):
+        """
+        Stores a description, dropping the least recently used one if full.
+
+        Args:
+            key (tuple): The content hash of the image and the model name.
+            description (str): The visual description.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._entries[key] = description
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
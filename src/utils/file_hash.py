@@ -0,0 +1,21 @@
+import hashlib
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def compute_file_hash(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Computes the SHA-256 of a file without reading it into memory at once.
+
+    Args:
+        file_path (str): Path of the file to hash.
+        chunk_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: The hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,10 +1,34 @@
+import re
+from utils.hashtag_table import HashtagTable
+from utils.logger import log
+
+_NON_HASHTAG_CHARACTERS = re.compile(r"[^\w]")
+MAX_HASHTAGS = 30
+
+
 class Hashtag:
-    def __init__(self, caption, chatbot):
+    def __init__(
+        self, caption, chatbot, hashtag_table=None, hashtag_index=None, topic=None
+    ):
         """
         Initializes a new Hashtag instance.
+
+        Args:
+        caption (str): The caption to add hashtags to.
+        chatbot (LLMChatbot): The chatbot asked for hashtags, or None to only
+            use the offline table.
+        hashtag_table (HashtagTable): The offline fallback table.
+        hashtag_index (HashtagIndex): Hashtags of earlier captions, consulted
+            before the chatbot.
+        topic (str): What the post shows, such as the visual description and
+            the user's context. The index and the table are looked up with
+            it; defaults to the caption.
         """
         self.caption = caption
+        self.topic = caption if topic is None else topic
         self.chatbot = chatbot
+        self.hashtag_table = hashtag_table or HashtagTable()
+        self.hashtag_index = hashtag_index
 
     def parse_hashtags(self):
         """
@@ -24,24 +48,53 @@ class Hashtag:
         cleaned_caption = " ".join(word for word in words if not word.startswith("#"))
         return cleaned_caption, hashtags
 
-    def _find_synonyms(self, word):
+    @staticmethod
+    def normalize_hashtag(text):
         """
-        Find synonyms for a given word using Ollama.
+        Turns a suggested tag into a hashtag, or None if nothing is left.
 
         Args:
-        word (str): The word to find synonyms for.
+        text (str): A tag with or without the leading '#'.
 
         Returns:
-        list: A list of synonyms for the given word.
+        str: The tag without spaces and punctuation, prefixed with '#'.
+        """
+        tag = _NON_HASHTAG_CHARACTERS.sub("", str(text))
+        return f"#{tag}" if tag else None
+
+    def _suggest_with_llm(self, cleaned_caption, existing_hashtags, num_needed):
         """
-        response = self.chatbot.get_response(f"Find synonyms for the word '{word}'.")
-        synonyms = response["choices"][0]["text"].strip().split(", ")
-        return synonyms
+        Asks the chatbot for all the missing hashtags in one JSON request.
+
+        Args:
+        cleaned_caption (str): The caption without hashtags.
+        existing_hashtags (list): Hashtags the caption already has.
+        num_needed (int): Number of hashtags to ask for.
+
+        Returns:
+        list: The suggested hashtags, in the order of the answer.
+        """
+        prompt = (
+            f"Suggest {num_needed} relevant hashtags for the following social "
+            f"media post. Do not repeat these hashtags: "
+            f"{', '.join(existing_hashtags) or 'none'}. Answer only with JSON "
+            f'of the form {{"hashtags": ["#example"]}}.\n\nPost: {cleaned_caption}'
+        )
+        answer = self.chatbot.get_json_response(prompt)
+        hashtags = answer.get("hashtags", []) if isinstance(answer, dict) else answer
+        if not isinstance(hashtags, list):
+            raise ValueError(f"Unexpected hashtag answer: {answer!r}")
+        return [self.normalize_hashtag(hashtag) for hashtag in hashtags]
 
     def generate_additional_hashtags(self, existing_hashtags, num_needed):
         """
         Generate additional hashtags if needed.
 
+        The hashtags of earlier captions are looked up first. Only the
+        slots they cannot fill are requested from the chatbot, in a single
+        call; if the chatbot is unavailable, fails or answers with too few
+        new hashtags, the rest come from the offline keyword table.
+
         Args:
         existing_hashtags (list): List of existing hashtags.
         num_needed (int): Number of additional hashtags needed.
@@ -49,23 +102,60 @@ class Hashtag:
         Returns:
         list: List of additional hashtags.
         """
+        taken = {hashtag.lower() for hashtag in existing_hashtags}
         additional_hashtags = []
-        # Extract words from existing hashtags (remove the '#')
-        words = {hashtag[1:] for hashtag in existing_hashtags}
-
-        for word in words:
-            # Find synonyms for each word
-            synonyms = self._find_synonyms(word)
-            for synonym in synonyms:
-                # Stop if the required number of additional hashtags is reached
+
+        def add(suggestions):
+            for hashtag in suggestions:
                 if len(additional_hashtags) >= num_needed:
                     break
-                # Add the synonym as a hashtag if it's not already in the existing hashtags
-                if f"#{synonym}" not in existing_hashtags:
-                    additional_hashtags.append(f"#{synonym}")
-
+                if hashtag and hashtag.lower() not in taken:
+                    taken.add(hashtag.lower())
+                    additional_hashtags.append(hashtag)
+
+        if self.hashtag_index is not None:
+            query = " ".join([self.topic, *existing_hashtags])
+            add(self.hashtag_index.suggest(query, num_needed, exclude=taken))
+
+        if len(additional_hashtags) < num_needed and self.chatbot is not None:
+            cleaned_caption, _ = self.parse_hashtags()
+            try:
+                add(
+                    self._suggest_with_llm(
+                        cleaned_caption,
+                        existing_hashtags + additional_hashtags,
+                        num_needed - len(additional_hashtags),
+                    )
+                )
+            except Exception as e:
+                log.warning(f"Falling back to offline hashtags: {e}")
+
+        if len(additional_hashtags) < num_needed:
+            add(
+                self.hashtag_table.suggest(
+                    self.topic,
+                    num_needed - len(additional_hashtags),
+                    exclude=taken,
+                )
+            )
         return additional_hashtags
 
+    def generate_missing_hashtags(self, num_tags):
+        """
+        Generate the hashtags a caption lacks to reach `num_tags`.
+
+        Parameters:
+        num_tags (int): The desired number of hashtags of the caption.
+
+        Returns:
+        list: The hashtags to append, empty if the caption has enough.
+        """
+        _, hashtags = self.parse_hashtags()
+        num_needed = min(num_tags, MAX_HASHTAGS) - len(hashtags)
+        if num_needed <= 0:
+            return []
+        return self.generate_additional_hashtags(hashtags, num_needed)
+
     def generate_hashtagged_caption(self, num_tags):
         """
         Generate a string of hashtags from a caption.
@@ -77,20 +167,11 @@ class Hashtag:
         Returns:
         str: A string containing the original caption and the generated hashtags.
         """
-        MAX_HASHTAGS = 30
-        if num_tags > MAX_HASHTAGS:
-            num_tags = MAX_HASHTAGS
+        num_tags = min(num_tags, MAX_HASHTAGS)
 
-        # Parse hashtags from the caption
+        # Parse hashtags from the caption and add the missing ones
         cleaned_caption, hashtags = self.parse_hashtags()
-        num_existing_tags = len(hashtags)
-
-        # Generate additional hashtags if needed
-        if num_existing_tags < num_tags:
-            additional_hashtags = self.generate_additional_hashtags(
-                hashtags, num_tags - num_existing_tags
-            )
-            hashtags.extend(additional_hashtags)
+        hashtags.extend(self.generate_missing_hashtags(num_tags))
 
         # Ensure the number of hashtags does not exceed the maximum limit
         hashtags = hashtags[:num_tags]
@@ -0,0 +1,237 @@
+"""
+Hashtag suggestions mined from previously generated captions
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict, deque
+from utils.logger import log
+
+_HASHTAG = re.compile(r"#(\w+)")
+_WORD = re.compile(r"[a-z]+")
+_STOPWORDS = frozenset(
+    "a an the and or of in on at to with for from by is are was were be been "
+    "this that these those there it its as into over under near some your our "
+    "you we they he she his her their my me i not no so but if then than too "
+    "very can will just all any each about up out down".split()
+)
+
+
+def extract_keywords(text):
+    """
+    Returns the distinct content words of a text, ignoring its hashtags.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        list: Lower-cased words of at least three letters, in order.
+    """
+    words = _WORD.findall(_HASHTAG.sub(" ", text).lower())
+    return list(
+        dict.fromkeys(
+            word for word in words if len(word) > 2 and word not in _STOPWORDS
+        )
+    )
+
+
+def extract_hashtags(text):
+    """Returns the distinct hashtags of a text, lower-cased, in order."""
+    return list(dict.fromkeys(f"#{tag.lower()}" for tag in _HASHTAG.findall(text)))
+
+
+class HashtagIndex:
+    """
+    A thread-safe index of the hashtags of earlier captions.
+
+    Every caption added to the index updates an inverted index from its
+    keywords to its hashtags and a co-occurrence graph between its
+    hashtags. A new caption is scored against both: hashtags that appeared
+    with its keywords, weighted by how specific the keyword is, and
+    hashtags that appeared together with the hashtags it already has.
+    Lookups only touch the entries of the caption's own keywords and
+    hashtags.
+
+    A single shared word is weak evidence, so a hashtag found through the
+    keywords is only suggested if it appeared with at least `min_matches`
+    of them, or if the hashtag is one of the keywords itself.
+
+    Attributes:
+        path (str): JSON lines file the added captions are appended to, so
+            the index can be rebuilt on the next start. None keeps the
+            index in memory only.
+        min_matches (int): Keywords a hashtag must share with the text.
+    """
+
+    def __init__(self, path=None, min_matches=2):
+        self.path = path
+        self.min_matches = min_matches
+        self._keyword_hashtags = defaultdict(Counter)
+        self._cooccurrence = defaultdict(Counter)
+        self._keyword_counts = Counter()
+        self._num_captions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._num_captions
+
+    def add_caption(self, caption, persist=True):
+        """
+        Adds the hashtags of a caption to the index.
+
+        Captions without hashtags teach the index nothing and are skipped.
+
+        Args:
+            caption (str): A generated caption.
+            persist (bool): Whether to append the caption to `path`.
+
+        Returns:
+            bool: Whether the caption had hashtags and was added.
+        """
+        hashtags = extract_hashtags(caption)
+        if not hashtags:
+            return False
+        keywords = extract_keywords(caption)
+        with self._lock:
+            self._num_captions += 1
+            for keyword in keywords:
+                self._keyword_counts[keyword] += 1
+                self._keyword_hashtags[keyword].update(hashtags)
+            for hashtag in hashtags:
+                self._cooccurrence[hashtag].update(
+                    other for other in hashtags if other != hashtag
+                )
+            if persist and self.path:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as file:
+                        file.write(json.dumps({"caption": caption}) + "\n")
+                except OSError as e:
+                    log.warning(f"Could not persist the hashtag index: {e}")
+        return True
+
+    def suggest(self, text, num_needed, exclude=()):
+        """
+        Suggests hashtags for a text.
+
+        Args:
+            text (str): What the post is about, such as its visual
+                description and context, with any hashtags it already has.
+            num_needed (int): Maximum number of hashtags to return.
+            exclude (iterable): Hashtags that must not be suggested.
+
+        Returns:
+            list: Up to `num_needed` hashtags, best first.
+        """
+        if num_needed <= 0:
+            return []
+        existing = extract_hashtags(text)
+        excluded = {hashtag.lower() for hashtag in exclude} | set(existing)
+        keywords = extract_keywords(text)
+        scores = Counter()
+        matches = Counter()
+        related = set()
+        with self._lock:
+            for keyword in keywords:
+                hashtags = self._keyword_hashtags.get(keyword)
+                if not hashtags:
+                    continue
+                # Keywords that appear in every caption say little about it
+                weight = math.log(
+                    1 + self._num_captions / self._keyword_counts[keyword]
+                )
+                total = sum(hashtags.values())
+                for hashtag, count in hashtags.items():
+                    scores[hashtag] += weight * count / total
+                    matches[hashtag] += 1
+            for hashtag in existing:
+                neighbours = self._cooccurrence.get(hashtag)
+                if not neighbours:
+                    continue
+                total = sum(neighbours.values())
+                for other, count in neighbours.items():
+                    scores[other] += count / total
+                    related.add(other)
+        named = {f"#{keyword}" for keyword in keywords}
+        for hashtag in list(scores):
+            if hashtag in excluded or (
+                matches[hashtag] < self.min_matches
+                and hashtag not in named
+                and hashtag not in related
+            ):
+                del scores[hashtag]
+        return [
+            hashtag
+            for hashtag, _ in heapq.nlargest(
+                num_needed, scores.items(), key=lambda item: item[1]
+            )
+        ]
+
+    @classmethod
+    def load(cls, path, max_captions=None):
+        """
+        Rebuilds an index from the captions appended to `path`.
+
+        Only the newest `max_captions` captions are kept. If the file holds
+        older captions or unreadable lines, it is rewritten with the kept
+        captions, so it does not grow without bound across restarts.
+
+        Args:
+            path (str): The JSON lines file; missing files give an empty index.
+            max_captions (int): Captions to keep, None keeps all of them.
+
+        Returns:
+            HashtagIndex: The index, appending new captions to `path`.
+        """
+        index = cls(path)
+        captions = deque(maxlen=max_captions)
+        num_lines = 0
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    num_lines += 1
+                    try:
+                        caption = json.loads(line)["caption"]
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if extract_hashtags(caption):
+                        captions.append(caption)
+        for caption in captions:
+            index.add_caption(caption, persist=False)
+        if num_lines > len(captions):
+            index._compact(captions)
+        log.info(f"Loaded {len(index)} captions into the hashtag index.")
+        return index
+
+    def _compact(self, captions):
+        """Rewrites `path` with only the given captions."""
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                for caption in captions:
+                    file.write(json.dumps({"caption": caption}) + "\n")
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            log.warning(f"Could not compact the hashtag index: {e}")
+
+
+def create_hashtag_index(hashtag_config):
+    """
+    Loads the hashtag index configured in the `hashtags` section.
+
+    Captions are only indexed once they were generated with hashtags, which
+    the vision model captions stored in chroma never have, so the index is
+    rebuilt from its own file alone.
+
+    Args:
+        hashtag_config (HashtagConfig): The hashtag settings.
+
+    Returns:
+        HashtagIndex or None: The index, or None if it is disabled.
+    """
+    if not hashtag_config.index_enabled:
+        return None
+    return HashtagIndex.load(hashtag_config.index_path, hashtag_config.max_captions)
@@ -0,0 +1,121 @@
+"""
+Offline hashtag suggestions from a keyword/co-occurrence table
+"""
+
+import re
+
+_WORD = re.compile(r"[a-z]+")
+
+# Hashtags that commonly appear together with posts mentioning a keyword
+DEFAULT_HASHTAG_TABLE = {
+    "beach": ["#beach", "#beachlife", "#ocean", "#summer", "#sea"],
+    "ocean": ["#ocean", "#sea", "#waves", "#beach"],
+    "sea": ["#sea", "#ocean", "#seaside"],
+    "sunset": ["#sunset", "#goldenhour", "#sky", "#sunsetlovers"],
+    "sunrise": ["#sunrise", "#morning", "#goldenhour", "#sky"],
+    "sky": ["#sky", "#clouds", "#skyporn"],
+    "mountain": ["#mountains", "#hiking", "#nature", "#adventure"],
+    "hike": ["#hiking", "#outdoors", "#adventure", "#trail"],
+    "forest": ["#forest", "#trees", "#nature", "#woods"],
+    "tree": ["#trees", "#nature", "#green"],
+    "flower": ["#flowers", "#floral", "#bloom", "#garden"],
+    "garden": ["#garden", "#gardening", "#plants", "#flowers"],
+    "snow": ["#snow", "#winter", "#cold"],
+    "city": ["#city", "#urban", "#cityscape", "#streetphotography"],
+    "street": ["#street", "#streetphotography", "#urban"],
+    "building": ["#architecture", "#building", "#design"],
+    "travel": ["#travel", "#wanderlust", "#explore", "#travelgram"],
+    "car": ["#car", "#cars", "#carsofinstagram", "#drive"],
+    "food": ["#food", "#foodie", "#yummy", "#instafood"],
+    "pizza": ["#pizza", "#foodie", "#italianfood"],
+    "cake": ["#cake", "#dessert", "#baking", "#sweet"],
+    "coffee": ["#coffee", "#coffeetime", "#cafe", "#latte"],
+    "dog": ["#dog", "#dogsofinstagram", "#puppy", "#pets"],
+    "puppy": ["#puppy", "#dog", "#cute", "#pets"],
+    "cat": ["#cat", "#catsofinstagram", "#kitten", "#pets"],
+    "bird": ["#birds", "#wildlife", "#birdwatching", "#nature"],
+    "baby": ["#baby", "#family", "#cute", "#love"],
+    "family": ["#family", "#love", "#memories"],
+    "friend": ["#friends", "#friendship", "#goodtimes"],
+    "wedding": ["#wedding", "#love", "#bride", "#weddingday"],
+    "party": ["#party", "#celebration", "#fun"],
+    "fitness": ["#fitness", "#workout", "#gym", "#health"],
+    "gym": ["#gym", "#fitness", "#workout", "#fitfam"],
+    "yoga": ["#yoga", "#mindfulness", "#wellness"],
+    "run": ["#running", "#run", "#fitness"],
+    "fashion": ["#fashion", "#style", "#ootd", "#outfit"],
+    "dress": ["#dress", "#fashion", "#style"],
+    "selfie": ["#selfie", "#me", "#smile"],
+    "music": ["#music", "#musician", "#livemusic"],
+    "guitar": ["#guitar", "#music", "#guitarist"],
+    "concert": ["#concert", "#livemusic", "#music"],
+    "art": ["#art", "#artist", "#artwork", "#creative"],
+    "painting": ["#painting", "#art", "#artist"],
+    "book": ["#books", "#reading", "#bookstagram"],
+    "laptop": ["#tech", "#workfromhome", "#productivity"],
+    "computer": ["#tech", "#technology", "#setup"],
+    "office": ["#office", "#work", "#business"],
+    "team": ["#teamwork", "#team", "#business"],
+    "soccer": ["#soccer", "#football", "#sports"],
+    "football": ["#football", "#sports", "#game"],
+    "basketball": ["#basketball", "#sports", "#hoops"],
+    "night": ["#night", "#nightphotography", "#nightlife"],
+    "lake": ["#lake", "#nature", "#water", "#reflection"],
+    "river": ["#river", "#nature", "#water"],
+    "rain": ["#rain", "#rainyday", "#moody"],
+    "christmas": ["#christmas", "#holidays", "#festive"],
+    "halloween": ["#halloween", "#spooky", "#costume"],
+}
+
+
+class HashtagTable:
+    """
+    Suggests hashtags for a text without calling a language model.
+
+    Every keyword of the table maps to the hashtags that commonly appear
+    with it. The suggestions for a text are the hashtags of the keywords it
+    mentions, ranked by how many of its keywords suggest them and then by
+    the position of the first keyword that does.
+
+    Attributes:
+        table (dict): Maps lower-case keywords to lists of hashtags.
+    """
+
+    def __init__(self, table=None):
+        self.table = DEFAULT_HASHTAG_TABLE if table is None else table
+
+    def _keywords(self, text):
+        """Returns the table keywords of a text, in order of appearance."""
+        keywords = []
+        for word in _WORD.findall(text.lower()):
+            if word not in self.table and word.endswith("s"):
+                word = word[:-1]
+            if word in self.table and word not in keywords:
+                keywords.append(word)
+        return keywords
+
+    def suggest(self, text, num_needed, exclude=()):
+        """
+        Suggests hashtags for a text.
+
+        Args:
+            text (str): The text, including any existing hashtags.
+            num_needed (int): Maximum number of hashtags to return.
+            exclude (iterable): Hashtags that must not be suggested.
+
+        Returns:
+            list: Up to `num_needed` hashtags; fewer if the text mentions
+            too few keywords of the table.
+        """
+        excluded = {hashtag.lower() for hashtag in exclude}
+        scores = {}
+        for position, keyword in enumerate(self._keywords(text)):
+            for hashtag in self.table[keyword]:
+                if hashtag.lower() in excluded:
+                    continue
+                count, first = scores.get(hashtag, (0, position))
+                scores[hashtag] = (count + 1, first)
+        ranked = sorted(
+            scores, key=lambda hashtag: (-scores[hashtag][0], scores[hashtag][1])
+        )
+        return ranked[:num_needed]
@@ -1,35 +1,43 @@
 from io import StringIO
+import time
 import streamlit as st
 import asyncio
 from utils.timer import timer_decorator
 
 
+async def _iterate(stream):
+    """Iterates over a synchronous or an asynchronous stream."""
+    if hasattr(stream, "__aiter__"):
+        async for chunk in stream:
+            yield chunk
+    else:
+        for chunk in stream:
+            yield chunk
+            # Let other tasks run between chunks of a blocking stream
+            await asyncio.sleep(0)
+
+
 @timer_decorator
-async def stream_text(stream, batch_size=1, sleep_time=0.001):
+async def stream_text(stream, flush_interval=0.05):
     """Generate and display stream text
 
+    The first chunk is displayed as soon as it arrives; after that the
+    display is refreshed at most every `flush_interval` seconds, so fast
+    token streams do not spend their time redrawing the page.
+
     Args:
-        stream: an iterable streaming API response
-        batch_size: number of chunks to batch before updating the display
-        sleep_time: time to sleep between batches
+        stream: a streaming API response, either iterable or async iterable
+        flush_interval: minimum time in seconds between display updates
     """
     success_stream = st.empty()
     full_text_io = StringIO()
-    batch = []
+    last_flush = None
 
-    for chunk in stream:
-        message_content = chunk["message"]["content"]
-        batch.append(message_content)
-
-        if len(batch) >= batch_size:
-            full_text_io.write("".join(batch))
+    async for chunk in _iterate(stream):
+        full_text_io.write(chunk["message"]["content"])
+        now = time.monotonic()
+        if last_flush is None or now - last_flush >= flush_interval:
             success_stream.markdown(full_text_io.getvalue(), unsafe_allow_html=True)
-            batch = []
-            await asyncio.sleep(sleep_time)
-
-    # Write any remaining chunks
-    if batch:
-        full_text_io.write("".join(batch))
-        success_stream.markdown(full_text_io.getvalue(), unsafe_allow_html=True)
+            last_flush = now
 
     success_stream.success(full_text_io.getvalue())
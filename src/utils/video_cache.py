@@ -0,0 +1,116 @@
+"""
+Disk cache of the scenes and scene captions of processed videos
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from utils.logger import log
+
+
+class VideoCaptionCache:
+    """
+    Stores the detected scenes of a video and their captions as JSON files.
+
+    Entries are keyed by the content hash of the video together with every
+    setting that changes the scenes or captions, so a repeated upload skips
+    decoding and captioning while a changed detector or model does not
+    reuse stale results. Files are written atomically, so concurrent
+    requests never read a partial entry.
+
+    Attributes:
+        cache_dir (str): Directory holding one JSON file per entry.
+        max_entries (int): Entries kept before the oldest are removed, 0 for
+            no limit.
+    """
+
+    def __init__(self, cache_dir="video_cache", max_entries=512):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    @staticmethod
+    def make_key(video_hash, settings):
+        """
+        Derives the cache key of a video.
+
+        Args:
+            video_hash (str): The content hash of the video file.
+            settings (dict): JSON serialisable settings the result depends on.
+
+        Returns:
+            str: The cache key.
+        """
+        payload = json.dumps(
+            {"video": video_hash, "settings": settings}, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """
+        Returns the scenes stored under a key.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            list or None: The stored scenes, or None if there is no entry or
+            it cannot be read.
+        """
+        path = self._get_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                entry = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.error(f"Could not read video cache entry {path}: {e}")
+            return None
+        os.utime(path)
+        return entry["scenes"]
+
+    def set(self, key, scenes):
+        """
+        Stores the scenes of a video.
+
+        Args:
+            key (str): The cache key.
+            scenes (list): One dict per scene with its `timestamp` in seconds
+                and its `caption`.
+
+        Returns:
+            None
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                json.dump({"scenes": scenes}, file)
+            os.replace(temp_path, self._get_path(key))
+        except OSError as e:
+            log.error(f"Could not write video cache entry: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self._evict()
+
+    def _evict(self):
+        """Removes the least recently used entries above `max_entries`."""
+        if not self.max_entries:
+            return
+        paths = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.endswith(".json")
+        ]
+        if len(paths) <= self.max_entries:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[: len(paths) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -5,13 +5,39 @@ Chroma db vector store module
 from .vector_store import initialize_chroma_client
 from .vector_store import get_chroma_collection
 from .vector_store import add_image_to_chroma
+from .vector_store import add_images_to_chroma
+from .vector_store import get_max_batch_size
+from .vector_store import DEFAULT_MAX_BATCH_SIZE
+from .vector_store import get_captions_from_chroma
 from .vector_store import get_unique_image_id
 from .vector_store import get_reconstructed_flattened_input_tensor
+from .vector_store import get_embedding
+from .vector_store import get_compact_embedding
+from .vector_store import migrate_collection_embeddings
+from .vector_store import get_image_metadata
+from .write_behind import ChromaWriteBehindQueue
+from .phash_index import PerceptualHashIndex
+from .phash_index import compute_dhash
+from .phash_index import hamming_distance
+from .phash_index import is_informative_hash
 
 __all__ = [
     "initialize_chroma_client",
     "get_chroma_collection",
     "add_image_to_chroma",
+    "add_images_to_chroma",
+    "get_max_batch_size",
+    "DEFAULT_MAX_BATCH_SIZE",
+    "get_captions_from_chroma",
     "get_unique_image_id",
     "get_reconstructed_flattened_input_tensor",
+    "get_embedding",
+    "get_compact_embedding",
+    "migrate_collection_embeddings",
+    "get_image_metadata",
+    "ChromaWriteBehindQueue",
+    "PerceptualHashIndex",
+    "compute_dhash",
+    "hamming_distance",
+    "is_informative_hash",
 ]
@@ -0,0 +1,95 @@
+"""
+Copies the captions of the legacy raw pixel collections into the compact ones.
+
+Usage (from the src directory):
+    python -m vector_store.migrate
+    python -m vector_store.migrate --model blip2 --source my_old_collection
+
+Before compact embeddings, captions were stored in the `image_vectors_blip2`
+and `image_vectors_llava` collections with one dimension per pixel value.
+The configured collections now hold compact embeddings, so without this
+migration every image is captioned again after an upgrade. The migration
+can be interrupted and rerun; entries that were already copied are skipped.
+"""
+
+import argparse
+from configuration_manager.config_manager import ConfigManager
+from utils.logger import log
+from vector_store.vector_store import (
+    initialize_chroma_client,
+    migrate_collection_embeddings,
+)
+
+# Model name -> (legacy collection, ChromaDBConfig field of the new collection)
+LEGACY_COLLECTIONS = {
+    "blip2": ("image_vectors_blip2", "blip"),
+    "llava": ("image_vectors_llava", "llava"),
+}
+
+
+def migrate_legacy_collections(
+    chroma_client, chroma_db_config, models=None, source=None, target=None
+):
+    """
+    Migrates the legacy collection of every model that still has one.
+
+    Args:
+        chroma_client (chromadb): The initiated chroma client.
+        chroma_db_config (ChromaDBConfig): The chroma settings.
+        models (list): Model names to migrate, all of them by default.
+        source (str): Overrides the legacy collection name.
+        target (str): Overrides the configured collection name.
+
+    Returns:
+        dict: The number of migrated entries per model. Models without a
+        legacy collection are left out.
+    """
+    migrated = {}
+    for model in models or LEGACY_COLLECTIONS:
+        legacy_name, config_field = LEGACY_COLLECTIONS[model]
+        source_name = source or legacy_name
+        target_name = target or getattr(chroma_db_config, config_field)
+        try:
+            chroma_client.get_collection(source_name)
+        except Exception:
+            log.info(f"No collection {source_name} to migrate for {model}.")
+            continue
+        migrated[model] = migrate_collection_embeddings(
+            chroma_client,
+            source_name,
+            target_name,
+            embedding_size=chroma_db_config.embedding_size,
+        )
+    return migrated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Copy cached captions from the legacy raw pixel collections."
+    )
+    parser.add_argument(
+        "--model",
+        choices=sorted(LEGACY_COLLECTIONS),
+        help="Only migrate the collection of this model.",
+    )
+    parser.add_argument("--source", help="Overrides the legacy collection name.")
+    parser.add_argument("--target", help="Overrides the configured collection name.")
+    args = parser.parse_args(argv)
+    if (args.source or args.target) and not args.model:
+        parser.error("--source and --target need --model.")
+
+    app_config = ConfigManager.get_config_manager().get_app_config()
+    migrated = migrate_legacy_collections(
+        initialize_chroma_client(),
+        app_config.chroma_db,
+        [args.model] if args.model else None,
+        args.source,
+        args.target,
+    )
+    for model, count in migrated.items():
+        print(f"{model}: migrated {count} entries.")
+    return migrated
+
+
+if __name__ == "__main__":
+    main()
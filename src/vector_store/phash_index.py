@@ -0,0 +1,199 @@
+"""Perceptual hash index for near-duplicate image lookup.
+
+A 64-bit difference hash (dHash) is computed per image and kept in a
+BK-tree, so captions can be reused for resized, recompressed or lightly
+filtered copies of an image whose exact pixel values differ.
+"""
+
+import threading
+from PIL import Image
+from utils.logger import log
+
+DEFAULT_HASH_SIZE = 8
+DEFAULT_MIN_HASH_BITS = 8
+
+
+def compute_dhash(image, hash_size=DEFAULT_HASH_SIZE):
+    """
+    Computes the difference hash of an image
+
+    The image is converted to grayscale and shrunk to (hash_size + 1) x
+    hash_size pixels. Every bit of the hash tells whether a pixel is
+    brighter than its right neighbour, which survives resizing,
+    recompression and most colour filters.
+
+    Args:
+    image (PIL.Image.Image): The image to hash.
+    hash_size (int): Number of rows of the hash grid; 8 gives a 64-bit hash.
+
+    Returns:
+    image_hash (int): The hash as an unsigned integer.
+    """
+    grayscale = image.convert("L").resize(
+        (hash_size + 1, hash_size), Image.Resampling.BOX
+    )
+    pixels = grayscale.tobytes()
+    image_hash = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for column in range(hash_size):
+            image_hash = (image_hash << 1) | (
+                pixels[offset + column] > pixels[offset + column + 1]
+            )
+    return image_hash
+
+
+def hamming_distance(first_hash, second_hash):
+    """
+    Counts the bits that differ between two hashes
+
+    Args:
+    first_hash (int): The first hash.
+    second_hash (int): The second hash.
+
+    Returns:
+    distance (int): The number of differing bits.
+    """
+    return bin(first_hash ^ second_hash).count("1")
+
+
+def is_informative_hash(
+    image_hash, min_bits=DEFAULT_MIN_HASH_BITS, hash_size=DEFAULT_HASH_SIZE
+):
+    """
+    Tells whether a hash carries enough structure to identify an image
+
+    Flat images such as black, white or single-colour frames have no
+    brighter neighbours and all hash to 0, and smooth gradients to almost
+    all ones, so such hashes match unrelated images of the same kind.
+
+    Args:
+    image_hash (int): The hash to check.
+    min_bits (int): Minimum number of both set and unset bits.
+    hash_size (int): The hash size the hash was computed with.
+
+    Returns:
+    informative (bool): Whether the hash can be used for lookups.
+    """
+    set_bits = bin(image_hash).count("1")
+    return min(set_bits, hash_size * hash_size - set_bits) >= min_bits
+
+
+class _BKTreeNode:
+    """A node of the BK-tree holding one hash and its caption."""
+
+    __slots__ = ("image_hash", "caption", "children")
+
+    def __init__(self, image_hash, caption):
+        self.image_hash = image_hash
+        self.caption = caption
+        self.children = {}
+
+
+class PerceptualHashIndex:
+    """
+    A thread-safe BK-tree of perceptual hashes and their captions.
+
+    A BK-tree only descends into children whose edge distance lies within
+    `max_distance` of the query distance (triangle inequality), so lookups
+    visit a small fraction of the stored hashes.
+
+    Methods:
+        add(image_hash, caption): Adds or updates a hash.
+        find(image_hash, max_distance): Returns the closest stored caption.
+        from_collection(collection): Builds an index from chroma metadata.
+    """
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def add(self, image_hash, caption):
+        """
+        Adds a hash to the index, replacing the caption of an identical hash.
+
+        Args:
+            image_hash (int): The perceptual hash of the image.
+            caption (str): The caption generated for the image.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._root is None:
+                self._root = _BKTreeNode(image_hash, caption)
+                self._size = 1
+                return
+
+            node = self._root
+            while True:
+                distance = hamming_distance(image_hash, node.image_hash)
+                if distance == 0:
+                    node.caption = caption
+                    return
+                child = node.children.get(distance)
+                if child is None:
+                    node.children[distance] = _BKTreeNode(image_hash, caption)
+                    self._size += 1
+                    return
+                node = child
+
+    def find(self, image_hash, max_distance):
+        """
+        Finds the stored hash closest to `image_hash`.
+
+        Args:
+            image_hash (int): The perceptual hash of the query image.
+            max_distance (int): Largest Hamming distance accepted as a match.
+
+        Returns:
+            tuple or None: (caption, distance) of the closest match, or None
+            if no stored hash is within `max_distance`.
+        """
+        with self._lock:
+            if self._root is None:
+                return None
+
+            best = None
+            stack = [self._root]
+            while stack:
+                node = stack.pop()
+                distance = hamming_distance(image_hash, node.image_hash)
+                if distance <= max_distance and (best is None or distance < best[1]):
+                    best = (node.caption, distance)
+                    if distance == 0:
+                        break
+                for edge, child in node.children.items():
+                    if distance - max_distance <= edge <= distance + max_distance:
+                        stack.append(child)
+            return best
+
+    @classmethod
+    def from_collection(cls, collection, page_size=1000):
+        """
+        Builds an index from the `dhash` metadata stored in a chroma collection.
+
+        Args:
+            collection (chromadb.collection): The collection to read.
+            page_size (int): Number of entries read per request.
+
+        Returns:
+            PerceptualHashIndex: The populated index. Entries written before
+            hashes were stored are skipped.
+        """
+        index = cls()
+        offset = 0
+        while True:
+            page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            if not page["ids"]:
+                break
+            offset += len(page["ids"])
+            for metadata in page["metadatas"]:
+                if metadata and metadata.get("dhash") and metadata.get("caption"):
+                    index.add(int(metadata["dhash"], 16), metadata["caption"])
+        log.info(f"Loaded {len(index)} perceptual hashes from the collection.")
+        return index
@@ -1,5 +1,6 @@
 """Initialise the chroma db
-store image tensor pixel values as embedding
+store a compact embedding of the image tensor
+(or the raw pixel values in legacy mode),
 unique_id generated from image tensor and
 generated basic caption.
 
@@ -9,10 +10,17 @@ Returns:
 import uuid
 import hashlib
 import torch
+import torch.nn.functional as F
 import chromadb
 from chromadb.config import Settings
 from utils.logger import log
 
+EMBEDDING_MODE_RAW = "raw"
+EMBEDDING_MODE_COMPACT = "compact"
+EMBEDDING_MODES = (EMBEDDING_MODE_RAW, EMBEDDING_MODE_COMPACT)
+DEFAULT_EMBEDDING_SIZE = 16
+DEFAULT_MAX_BATCH_SIZE = 5461
+
 
 def initialize_chroma_client():
     """
@@ -47,9 +55,17 @@ def get_chroma_collection(chroma_client, collection_name):
     return collection
 
 
-def add_image_to_chroma(collection, unique_id, input_tensor, caption):
+def add_image_to_chroma(
+    collection,
+    unique_id,
+    input_tensor,
+    caption,
+    embedding_mode=EMBEDDING_MODE_COMPACT,
+    embedding_size=DEFAULT_EMBEDDING_SIZE,
+    image_hash=None,
+):
     """
-    Add an image tensor pixel values as embedding to the chromadb
+    Add an image tensor as embedding to the chromadb
 
     Args:
     collection (chromadb.collection): The initiated chroma client's collection.
@@ -57,25 +73,279 @@ def add_image_to_chroma(collection, unique_id, input_tensor, caption):
     generated using the image tensor
     input_tensor (torch.tensor): The image tensor pixel values
     caption (str): BLIP2 model generated basic caption.
+    embedding_mode (str): "compact" stores the fixed-size vector returned by
+    `get_compact_embedding`, "raw" stores every pixel value.
+    embedding_size (int): Side length of the pooled grid in compact mode.
+    image_hash (int): Optional perceptual hash of the image, stored as hex
+    so that a `PerceptualHashIndex` can be rebuilt from the collection.
 
     Returns:
-    None: Adds the image tensor pixel values as embedding to the chromadb
+    None: Adds the image tensor embedding to the chromadb
     """
     existing_ids = collection.get(ids=[unique_id])
     if existing_ids["ids"] == [unique_id]:
         log.warn(f"Entry with unique_id {unique_id} already exists. Skipping addition.")
         return
 
-    input_tensor_flatten = input_tensor.flatten().tolist()
-    input_tesnor_shape = str(input_tensor.shape)
     collection.add(
-        embeddings=input_tensor_flatten,
+        embeddings=[get_embedding(input_tensor, embedding_mode, embedding_size)],
         ids=[unique_id],
-        metadatas=[{"caption": caption, "image_tensor_shape": input_tesnor_shape}],
+        metadatas=[
+            get_image_metadata(input_tensor, caption, embedding_mode, image_hash)
+        ],
     )
     log.info(f"Added entry with unique_id {unique_id}.")
 
 
+def add_images_to_chroma(
+    collection,
+    entries,
+    embedding_mode=EMBEDDING_MODE_COMPACT,
+    embedding_size=DEFAULT_EMBEDDING_SIZE,
+    max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+):
+    """
+    Add many images to the chromadb with a handful of round trips
+
+    Duplicate ids are dropped in memory (the first entry wins), ids already
+    in the collection are found with one batched `get` per chunk, and the
+    new rows are written with chunked `upsert` calls of at most
+    `max_batch_size` rows.
+
+    Args:
+    collection (chromadb.collection): The initiated chroma client's collection.
+    entries (iterable): (unique_id, input_tensor, caption) or
+    (unique_id, input_tensor, caption, image_hash) tuples.
+    embedding_mode (str): Either "compact" or "raw".
+    embedding_size (int): Side length of the pooled grid in compact mode.
+    max_batch_size (int): Rows per request, see `get_max_batch_size`.
+
+    Returns:
+    written (int): Number of rows written to the collection.
+    """
+    unique_entries = {}
+    for unique_id, input_tensor, caption, *image_hash in entries:
+        if unique_id not in unique_entries:
+            unique_entries[unique_id] = (
+                input_tensor,
+                caption,
+                image_hash[0] if image_hash else None,
+            )
+    if not unique_entries:
+        return 0
+
+    unique_ids = list(unique_entries)
+    written = 0
+    for start in range(0, len(unique_ids), max_batch_size):
+        chunk_ids = unique_ids[start : start + max_batch_size]
+        existing_ids = set(collection.get(ids=chunk_ids, include=[])["ids"])
+        ids, embeddings, metadatas = [], [], []
+        for unique_id in chunk_ids:
+            if unique_id in existing_ids:
+                continue
+            input_tensor, caption, image_hash = unique_entries[unique_id]
+            ids.append(unique_id)
+            embeddings.append(
+                get_embedding(input_tensor, embedding_mode, embedding_size)
+            )
+            metadatas.append(
+                get_image_metadata(input_tensor, caption, embedding_mode, image_hash)
+            )
+        if ids:
+            collection.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas)
+            written += len(ids)
+
+    log.info(
+        f"Added {written} entries to the chroma collection, "
+        f"skipped {len(unique_ids) - written} existing."
+    )
+    return written
+
+
+def get_max_batch_size(chroma_client, default=DEFAULT_MAX_BATCH_SIZE):
+    """
+    Returns the maximum number of rows the chroma client accepts per request
+
+    Args:
+    chroma_client (chromadb): The initiated chroma client.
+    default (int): Value used when the client does not report a limit.
+
+    Returns:
+    max_batch_size (int): The maximum batch size.
+    """
+    try:
+        return int(chroma_client.get_max_batch_size())
+    except Exception:
+        return default
+
+
+def get_image_metadata(input_tensor, caption, embedding_mode, image_hash=None):
+    """
+    Creates the metadata stored next to an image embedding
+
+    Args:
+    input_tensor (torch.tensor): The image tensor pixel values
+    caption (str): The generated caption.
+    embedding_mode (str): The mode the embedding was created with.
+    image_hash (int): Optional perceptual hash of the image.
+
+    Returns:
+    metadata (dict): The caption, tensor shape, embedding mode and, if
+    given, the hex encoded perceptual hash.
+    """
+    metadata = {
+        "caption": caption,
+        "image_tensor_shape": str(tuple(input_tensor.shape)),
+        "embedding_mode": embedding_mode,
+    }
+    if image_hash is not None:
+        metadata["dhash"] = f"{image_hash:016x}"
+    return metadata
+
+
+def get_embedding(
+    input_tensor,
+    embedding_mode=EMBEDDING_MODE_COMPACT,
+    embedding_size=DEFAULT_EMBEDDING_SIZE,
+):
+    """
+    Creates the embedding stored for an image tensor
+
+    Args:
+    input_tensor (torch.tensor): The image tensor pixel values
+    embedding_mode (str): Either "compact" or "raw".
+    embedding_size (int): Side length of the pooled grid in compact mode.
+
+    Returns:
+    embedding (list): The embedding as a flat list of floats.
+    """
+    if embedding_mode == EMBEDDING_MODE_COMPACT:
+        return get_compact_embedding(input_tensor, embedding_size)
+    if embedding_mode == EMBEDDING_MODE_RAW:
+        return input_tensor.flatten().tolist()
+    raise ValueError(
+        f"Unknown embedding mode {embedding_mode}, expected one of {EMBEDDING_MODES}"
+    )
+
+
+def get_compact_embedding(input_tensor, embedding_size=DEFAULT_EMBEDDING_SIZE):
+    """
+    Creates a fixed-size perceptual embedding from the image tensor
+
+    The pixel values are average pooled to an `embedding_size` x
+    `embedding_size` grid per channel and L2 normalised, so a 3x224x224
+    tensor becomes 768 floats instead of ~150k. Visually similar images end
+    up close to each other, which keeps nearest neighbour queries meaningful.
+
+    Args:
+    input_tensor (torch.tensor): The image tensor pixel values, shaped
+    (channels, height, width) or (1, channels, height, width).
+    embedding_size (int): Side length of the pooled grid.
+
+    Returns:
+    embedding (list): channels * embedding_size**2 floats.
+    """
+    input_tensor = input_tensor.detach().float().cpu()
+    if input_tensor.dim() == 3:
+        input_tensor = input_tensor.unsqueeze(0)
+    pooled = F.adaptive_avg_pool2d(input_tensor, embedding_size).flatten()
+    return F.normalize(pooled, dim=0).tolist()
+
+
+def migrate_collection_embeddings(
+    chroma_client,
+    source_collection_name,
+    target_collection_name,
+    embedding_size=DEFAULT_EMBEDDING_SIZE,
+    page_size=100,
+):
+    """
+    Copies a collection of raw pixel embeddings into a compact collection
+
+    Chroma fixes the embedding dimension of a collection with its first
+    entry, so compact embeddings cannot be mixed into an existing raw
+    collection. The raw tensors are rebuilt from their stored shape, pooled
+    with `get_compact_embedding` and written to the target collection, which
+    is created if it does not exist. Entries already present in the target
+    collection are skipped, so an interrupted migration can be rerun.
+
+    Args:
+    chroma_client (chromadb): The initiated chroma client.
+    source_collection_name (str): Name of the legacy raw collection.
+    target_collection_name (str): Name of the compact collection.
+    embedding_size (int): Side length of the pooled grid.
+    page_size (int): Number of entries read from the source per request.
+
+    Returns:
+    migrated (int): Number of entries written to the target collection.
+    """
+    source = chroma_client.get_collection(source_collection_name)
+    target = get_chroma_collection(chroma_client, target_collection_name)
+    migrated = 0
+    offset = 0
+    while True:
+        page = source.get(
+            include=["embeddings", "metadatas"], limit=page_size, offset=offset
+        )
+        if not page["ids"]:
+            break
+        offset += len(page["ids"])
+
+        existing_ids = set(target.get(ids=page["ids"], include=[])["ids"])
+        ids, embeddings, metadatas = [], [], []
+        for unique_id, embedding, metadata in zip(
+            page["ids"], page["embeddings"], page["metadatas"]
+        ):
+            if unique_id in existing_ids:
+                continue
+            metadata = dict(metadata or {})
+            if metadata.get("embedding_mode") != EMBEDDING_MODE_COMPACT:
+                input_tensor = get_reconstructed_flattened_input_tensor(
+                    list(embedding), metadata["image_tensor_shape"]
+                )
+                embedding = get_compact_embedding(input_tensor, embedding_size)
+                metadata["embedding_mode"] = EMBEDDING_MODE_COMPACT
+            ids.append(unique_id)
+            embeddings.append(list(embedding))
+            metadatas.append(metadata)
+
+        if ids:
+            target.add(ids=ids, embeddings=embeddings, metadatas=metadatas)
+            migrated += len(ids)
+        log.info(
+            f"Migrated {migrated} entries from {source_collection_name} "
+            f"to {target_collection_name}."
+        )
+    return migrated
+
+
+def get_captions_from_chroma(collection, unique_ids):
+    """
+    Look up previously generated captions by unique_id
+
+    Args:
+    collection (chromadb.collection): The initiated chroma client's collection.
+    unique_ids (list): unique_ids of the image tensors' pixel values
+
+    Returns:
+    captions (dict): Maps every unique_id found in the collection to its
+    stored caption. Unknown ids are left out.
+    """
+    if not unique_ids:
+        return {}
+    try:
+        results = collection.get(ids=list(unique_ids), include=["metadatas"])
+    except Exception as e:
+        log.error(f"Caption lookup failed, falling back to inference: {e}")
+        return {}
+
+    captions = {}
+    for unique_id, metadata in zip(results["ids"], results["metadatas"]):
+        if metadata and metadata.get("caption"):
+            captions[unique_id] = metadata["caption"]
+    return captions
+
+
 def get_unique_image_id(input_tensor):
     """
     Creates an unique id from the image tensor's pixel value
@@ -106,6 +376,10 @@ def get_reconstructed_flattened_input_tensor(input_tensor_flatten, image_tensor_
     Returns:
     tensor (torch.tensor): Reconstructed original image tensor.
     """
-    shape_tuple = tuple(map(int, image_tensor_shape.strip("()").split(",")))
+    shape_tuple = tuple(
+        int(dim)
+        for dim in image_tensor_shape.replace("torch.Size", "").strip("()[]").split(",")
+        if dim.strip()
+    )
     tensor = torch.tensor(input_tensor_flatten).view(shape_tuple)
     return tensor
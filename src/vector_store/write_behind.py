@@ -0,0 +1,252 @@
+"""Write-behind queue for chroma db inserts.
+
+Captions are handed to a long-lived worker thread through a bounded queue,
+so the caller never waits for hashing, embedding or database round trips.
+The worker writes queued entries in batches through
+`add_images_to_chroma`.
+"""
+
+import atexit
+import queue
+import threading
+import time
+import weakref
+from utils.logger import log
+from vector_store.vector_store import (
+    DEFAULT_EMBEDDING_SIZE,
+    DEFAULT_MAX_BATCH_SIZE,
+    EMBEDDING_MODE_COMPACT,
+    add_images_to_chroma,
+)
+
+_STOP = object()
+
+# Queues that may still hold entries at exit. A weak set, so the exit hook
+# does not keep every queue and its collection alive.
+_OPEN_QUEUES = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_queues():
+    """Writes the remaining entries of every open queue at exit."""
+    for write_queue in list(_OPEN_QUEUES):
+        write_queue.close()
+
+
+class ChromaWriteBehindQueue:
+    """
+    A bounded write-behind queue in front of a chroma collection.
+
+    Attributes:
+        collection (chromadb.collection): The collection written to.
+        batch_size (int): Maximum number of entries written per batch.
+        flush_interval (float): Seconds the worker waits to fill a batch.
+
+    Methods:
+        submit(unique_id, input_tensor, caption, image_hash): Queues an entry.
+        flush(): Blocks until every queued entry has been written.
+        close(): Flushes the queue and stops the worker.
+        get_stats(): Returns the queue and backpressure counters.
+    """
+
+    def __init__(
+        self,
+        collection,
+        max_queue_size=1024,
+        batch_size=64,
+        flush_interval=0.5,
+        embedding_mode=EMBEDDING_MODE_COMPACT,
+        embedding_size=DEFAULT_EMBEDDING_SIZE,
+        max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+    ):
+        """
+        Initializes the queue. The worker thread starts with the first entry.
+
+        Args:
+            collection (chromadb.collection): The collection written to.
+            max_queue_size (int): Entries that can wait before `submit` blocks.
+            batch_size (int): Maximum number of entries written per batch.
+            flush_interval (float): Seconds the worker waits to fill a batch.
+            embedding_mode (str): Embedding mode passed to `get_embedding`.
+            embedding_size (int): Embedding size passed to `get_embedding`.
+            max_batch_size (int): Rows the chroma client accepts per request.
+        """
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.embedding_mode = embedding_mode
+        self.embedding_size = embedding_size
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._worker = None
+        self._closed = False
+        self._submitting = 0
+        self._lock = threading.Lock()
+        self._submits_done = threading.Condition(self._lock)
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "skipped": 0,
+            "failed": 0,
+            "batches": 0,
+            "blocked_submits": 0,
+            "max_depth": 0,
+        }
+        _OPEN_QUEUES.add(self)
+
+    def submit(self, unique_id, input_tensor, caption, image_hash=None):
+        """
+        Queues an image for insertion and returns immediately.
+
+        The tensor is copied to the CPU so that accelerator memory is not
+        held while the entry waits. If the queue is full the call blocks
+        until the worker has made room, which is counted as backpressure.
+        Once the queue is closed, entries are written synchronously.
+
+        Args:
+            unique_id (str): unique_id of the image tensor's pixel values.
+            input_tensor (torch.tensor): The image tensor pixel values.
+            caption (str): The generated caption.
+            image_hash (int): Optional perceptual hash of the image.
+
+        Returns:
+            None
+        """
+        entry = (unique_id, input_tensor.detach().cpu(), caption, image_hash)
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                # `close` waits for this submit before it stops the worker
+                self._submitting += 1
+                self._ensure_worker()
+        if closed:
+            self._write_batch([entry])
+            return
+
+        try:
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                with self._lock:
+                    self._stats["blocked_submits"] += 1
+                log.warning("Chroma write queue is full, waiting for the writer.")
+                self._queue.put(entry)
+        finally:
+            with self._lock:
+                self._submitting -= 1
+                self._stats["enqueued"] += 1
+                self._stats["max_depth"] = max(
+                    self._stats["max_depth"], self._queue.qsize()
+                )
+                self._submits_done.notify_all()
+
+    def flush(self):
+        """Blocks until every queued entry has been written."""
+        if self._worker is not None:
+            self._queue.join()
+
+    def close(self):
+        """
+        Writes the remaining entries and stops the worker thread.
+
+        Submits that are already enqueueing are waited for, so their entries
+        reach the worker or the leftovers written here.
+        """
+        with self._lock:
+            self._closed = True
+            self._submits_done.wait_for(lambda: not self._submitting)
+            worker, self._worker = self._worker, None
+        if worker is not None and worker.is_alive():
+            self._queue.put(_STOP)
+            worker.join()
+
+        leftover = []
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+            if entry is not _STOP:
+                leftover.append(entry)
+        if leftover:
+            self._write_batch(leftover)
+        _OPEN_QUEUES.discard(self)
+
+    def get_stats(self):
+        """
+        Returns the queue counters.
+
+        Returns:
+            dict: Entries enqueued, written, skipped as already present and
+            failed, the number of batches, how often `submit` had to block,
+            and the current and maximum queue depth.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["depth"] = self._queue.qsize()
+        return stats
+
+    def _ensure_worker(self):
+        """Starts the worker thread if it is not running. Needs the lock."""
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run, name="chroma-write-behind", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self):
+        """Collects queued entries into batches and writes them."""
+        stopping = False
+        while not stopping:
+            entry = self._queue.get()
+            if entry is _STOP:
+                self._queue.task_done()
+                break
+
+            batch = [entry]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    self._queue.task_done()
+                    break
+                batch.append(entry)
+
+            self._write_batch(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write_batch(self, batch):
+        """
+        Writes one batch through `add_images_to_chroma`.
+
+        Args:
+            batch (list): Queued (unique_id, tensor, caption, image_hash) entries.
+
+        Returns:
+            None
+        """
+        try:
+            written = add_images_to_chroma(
+                self.collection,
+                batch,
+                embedding_mode=self.embedding_mode,
+                embedding_size=self.embedding_size,
+                max_batch_size=self.max_batch_size,
+            )
+            with self._lock:
+                self._stats["written"] += written
+                self._stats["skipped"] += len(batch) - written
+                self._stats["batches"] += 1
+        except Exception as e:
+            with self._lock:
+                self._stats["failed"] += len(batch)
+            log.error(f"Failed to write {len(batch)} entries to chroma: {e}")
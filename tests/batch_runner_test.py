@@ -0,0 +1,148 @@
+import json
+from batch_runner import BatchRunner, find_media, load_completed, collect_stream
+
+PARAMS = {
+    "caption_size": "small",
+    "context": "",
+    "caption_style": "informative",
+    "content_type": "image",
+    "influencer_persona": "general",
+    "num_hashtags": 0,
+    "tone": "casual",
+    "social_media": "Instagram",
+    "num_variants": 1,
+}
+
+
+class FakeGenerator:
+    """Streams a caption naming the file and tone, failing on demand."""
+
+    def __init__(self, failing=(), returns_path=False):
+        self.failing = set(failing)
+        self.returns_path = returns_path
+        self.calls = []
+
+    def generate_caption(self, path, *args, num_variants=1):
+        self.calls.append(path)
+        if path in self.failing:
+            raise RuntimeError("model crashed")
+        tone = args[6]
+        if num_variants > 1:
+            text = "".join(
+                f"### Variant {number}\ncaption {number} of {tone}\n"
+                for number in range(1, num_variants + 1)
+            )
+            stream = iter([{"message": {"content": text}}])
+        else:
+            stream = iter(
+                [
+                    {"message": {"content": "caption of "}},
+                    {"message": {"content": tone}},
+                ]
+            )
+        return (stream, path) if self.returns_path else stream
+
+
+def read_records(output_path):
+    with open(output_path, encoding="utf-8") as output:
+        return [json.loads(line) for line in output]
+
+
+def test_find_media_walks_directory(tmp_path):
+    """Test that a directory is searched recursively for media files."""
+    (tmp_path / "nested").mkdir()
+    for name in ["b.jpg", "nested/a.MP4", "notes.txt"]:
+        (tmp_path / name).write_bytes(b"")
+
+    paths = [item["path"] for item in find_media(str(tmp_path))]
+
+    assert paths == [str(tmp_path / "b.jpg"), str(tmp_path / "nested" / "a.MP4")]
+
+
+def test_find_media_reads_manifest(tmp_path):
+    """Test that manifests may mix plain paths and JSON objects."""
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text('a.jpg\n\n{"path": "b.mp4", "tone": "formal"}\n')
+
+    items = find_media(str(manifest))
+
+    assert items == [
+        {"path": str(tmp_path / "a.jpg")},
+        {"path": str(tmp_path / "b.mp4"), "tone": "formal"},
+    ]
+
+
+def test_collect_stream():
+    """Test that streamed and complete responses give the same text."""
+    chunks = [{"message": {"content": "a"}}, {"message": {"content": "b"}}]
+    assert collect_stream(iter(chunks)) == "ab"
+    assert collect_stream({"message": {"content": "ab"}}) == "ab"
+
+
+def test_run_captions_images_and_videos(tmp_path):
+    """Test that every file is captioned by the matching generator."""
+    image_generator = FakeGenerator(returns_path=True)
+    video_generator = FakeGenerator()
+    output_path = str(tmp_path / "out" / "captions.jsonl")
+    runner = BatchRunner(image_generator, video_generator, None, output_path, 2)
+    items = [{"path": "a.jpg"}, {"path": "b.mov"}, {"path": "c.png", "tone": "formal"}]
+
+    summary = runner.run(items, PARAMS)
+
+    assert summary == {"skipped": 0, "captioned": 3, "failed": 0}
+    assert sorted(image_generator.calls) == ["a.jpg", "c.png"]
+    assert video_generator.calls == ["b.mov"]
+    records = {record["path"]: record for record in read_records(output_path)}
+    assert records["a.jpg"]["caption"] == "caption of casual"
+    assert records["c.png"]["caption"] == "caption of formal"
+
+
+def test_run_resumes_and_retries_failures(tmp_path):
+    """
+    Test that a second run skips captioned files and retries failed and
+    unsupported ones.
+    """
+    output_path = str(tmp_path / "captions.jsonl")
+    items = [{"path": "a.jpg"}, {"path": "b.jpg"}, {"path": "c.gif"}]
+    first = BatchRunner(FakeGenerator(failing=["b.jpg"]), None, None, output_path)
+
+    assert first.run(items, PARAMS) == {"skipped": 0, "captioned": 1, "failed": 2}
+    assert load_completed(output_path) == {"a.jpg"}
+
+    image_generator = FakeGenerator()
+    second = BatchRunner(image_generator, None, None, output_path)
+
+    assert second.run(items, PARAMS) == {"skipped": 1, "captioned": 1, "failed": 1}
+    assert image_generator.calls == ["b.jpg"]
+    assert load_completed(output_path) == {"a.jpg", "b.jpg"}
+
+
+def test_load_completed_ignores_truncated_line(tmp_path):
+    """Test that a line cut off by an interrupted run is ignored."""
+    output_path = tmp_path / "captions.jsonl"
+    output_path.write_text('{"path": "a.jpg", "caption": "x"}\n{"path": "b.j')
+
+    assert load_completed(str(output_path)) == {"a.jpg"}
+
+
+def test_run_appends_after_truncated_line(tmp_path):
+    """Test that new records do not get glued to a truncated line."""
+    output_path = tmp_path / "captions.jsonl"
+    output_path.write_text('{"path": "b.j')
+    runner = BatchRunner(FakeGenerator(), None, None, str(output_path))
+
+    runner.run([{"path": "a.jpg"}], PARAMS)
+
+    assert load_completed(str(output_path)) == {"a.jpg"}
+
+
+def test_run_records_variants(tmp_path):
+    """Test that several variants are stored next to the full caption."""
+    output_path = tmp_path / "captions.jsonl"
+    runner = BatchRunner(FakeGenerator(), FakeGenerator(), None, str(output_path))
+
+    runner.run([{"path": "a.jpg"}], {**PARAMS, "num_variants": 2})
+
+    [record] = read_records(output_path)
+    assert record["variants"] == ["caption 1 of casual", "caption 2 of casual"]
+    assert record["caption"].startswith("### Variant 1")
@@ -0,0 +1,277 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from captioning.impl.image_caption_generator import ImageCaptionGenerator
+from utils.hashtag_index import HashtagIndex
+
+
+def generate(generator, image_path, inference, tone):
+    """Generates a caption with fixed settings apart from the tone."""
+    return generator.generate_caption(
+        image_path,
+        "small",
+        "",
+        "informative",
+        "image",
+        "general",
+        3,
+        tone,
+        "Instagram",
+        inference,
+    )
+
+
+@patch.object(ImageCaptionGenerator, "_generate_caption_with_hashtags")
+@patch.object(ImageCaptionGenerator, "generate_content_new", return_value="prompt")
+def test_regenerating_reuses_visual_description(
+    mock_generate_content, mock_hashtags, tmp_path
+):
+    """
+    Test that changing only the caption settings does not run the model
+    again, while another image does.
+    """
+    first_image, second_image = tmp_path / "first.jpg", tmp_path / "second.jpg"
+    first_image.write_bytes(b"first image")
+    second_image.write_bytes(b"second image")
+    inference = MagicMock()
+    inference.get_image_caption_pipeline.return_value = "a beach at sunset"
+    generator = ImageCaptionGenerator(MagicMock())
+
+    generate(generator, str(first_image), inference, "casual")
+    generate(generator, str(first_image), inference, "professional")
+
+    assert inference.get_image_caption_pipeline.call_count == 1
+    assert [call.args[0] for call in mock_generate_content.call_args_list] == [
+        "a beach at sunset",
+        "a beach at sunset",
+    ]
+
+    generate(generator, str(second_image), inference, "casual")
+    assert inference.get_image_caption_pipeline.call_count == 2
+
+
+class StreamingChatbot:
+    """Streams a canned answer and records the prompt it was given."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def get_response_async(self, content):
+        self.prompts.append(content)
+        for text in ["A ", "sunny ", "beach"]:
+            yield {"message": {"content": text}}
+
+
+@patch.object(ImageCaptionGenerator, "generate_content_new", return_value="prompt")
+def test_generate_caption_stream_yields_chunks(mock_generate_content, tmp_path):
+    """
+    Test that the streamed caption is built from the visual description and
+    yields the chatbot chunks one by one.
+    """
+    image_path = tmp_path / "image.jpg"
+    image_path.write_bytes(b"image")
+    inference = MagicMock()
+    inference.get_image_caption_pipeline.return_value = "a beach"
+    chatbot = StreamingChatbot()
+    generator = ImageCaptionGenerator(chatbot)
+
+    async def collect():
+        stream = generator.generate_caption_stream(
+            str(image_path),
+            "small",
+            "",
+            "informative",
+            "image",
+            "general",
+            0,
+            "casual",
+            "Instagram",
+            inference,
+        )
+        return [chunk["message"]["content"] async for chunk in stream]
+
+    assert asyncio.run(collect()) == ["A ", "sunny ", "beach"]
+    assert mock_generate_content.call_args.args[0] == "a beach"
+    assert chatbot.prompts == ["prompt"]
+
+
+class HashtaggingChatbot(StreamingChatbot):
+    """Also suggests hashtags, noting when it was asked."""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks_sent = 0
+        self.hashtags_requested_after = None
+
+    async def get_response_async(self, content):
+        async for chunk in super().get_response_async(content):
+            self.chunks_sent += 1
+            yield chunk
+
+    def get_json_response(self, content):
+        self.hashtags_requested_after = self.chunks_sent
+        return {"hashtags": ["#sand", "#sea"]}
+
+
+@patch.object(
+    ImageCaptionGenerator, "generate_content_new", return_value="Line one\nLine two"
+)
+def test_generate_caption_stream_tops_up_hashtags_last(mock_generate_content):
+    """
+    Test that the streamed prompt is untouched and missing hashtags follow
+    the caption as a last chunk.
+    """
+    generator = ImageCaptionGenerator(HashtaggingChatbot())
+    generator.get_visual_description = MagicMock(return_value="a beach")
+
+    async def collect():
+        stream = generator.generate_caption_stream(
+            "image.jpg",
+            "small",
+            "",
+            "informative",
+            "image",
+            "general",
+            2,
+            "casual",
+            "Instagram",
+        )
+        return [chunk["message"]["content"] async for chunk in stream]
+
+    assert asyncio.run(collect()) == ["A ", "sunny ", "beach", "\n\n#sand #sea"]
+    assert generator.chatbot.prompts == ["Line one\nLine two"]
+    assert generator.chatbot.hashtags_requested_after == 3
+
+
+def test_finished_captions_feed_the_hashtag_index():
+    """Test that streamed captions are added to the hashtag index once read."""
+    chatbot = MagicMock()
+    chatbot.get_response.return_value = iter(
+        [{"message": {"content": "Beach day "}}, {"message": {"content": "#sun"}}]
+    )
+    hashtag_index = MagicMock()
+    hashtag_index.suggest.return_value = []
+    generator = ImageCaptionGenerator(chatbot, hashtag_index=hashtag_index)
+
+    stream = generator._generate_caption_with_hashtags("prompt", 0)
+    hashtag_index.add_caption.assert_not_called()
+
+    assert [chunk["message"]["content"] for chunk in stream] == ["Beach day ", "#sun"]
+    hashtag_index.add_caption.assert_called_once_with("Beach day #sun")
+
+
+@patch.object(ImageCaptionGenerator, "generate_content_new", return_value="prompt")
+def test_caption_variants_share_one_request(mock_generate_content):
+    """Test that several variants are asked for in a single chatbot call."""
+    chatbot = MagicMock()
+    chatbot.get_response.return_value = {
+        "message": {"content": "### Variant 1\nOne\n### Variant 2\nTwo"}
+    }
+    hashtag_index = MagicMock()
+    generator = ImageCaptionGenerator(chatbot, hashtag_index=hashtag_index)
+
+    generator.write_caption(
+        "a beach",
+        "small",
+        "",
+        "informative",
+        "image",
+        "general",
+        0,
+        "casual",
+        "Instagram",
+        stream=False,
+        num_variants=2,
+    )
+
+    chatbot.get_response.assert_called_once()
+    assert chatbot.get_response.call_args.args[0].startswith("prompt\n\n")
+    assert (
+        "Write 2 clearly different versions" in chatbot.get_response.call_args.args[0]
+    )
+    assert [call.args[0] for call in hashtag_index.add_caption.call_args_list] == [
+        "One",
+        "Two",
+    ]
+
+
+def test_prompt_is_sent_unchanged_and_hashtags_topped_up_afterwards():
+    """
+    Test that the prompt reaches the chatbot untouched and that missing
+    hashtags are only requested once the caption has been streamed.
+    """
+    events = []
+    chatbot = MagicMock()
+
+    def stream_caption():
+        events.append("first token")
+        yield {"message": {"content": "Sushi night\nwith friends "}}
+        yield {"message": {"content": "#sushi"}}
+
+    def suggest(prompt):
+        events.append("hashtags")
+        return {"hashtags": ["#dinner", "#japanesefood"]}
+
+    chatbot.get_response.return_value = stream_caption()
+    chatbot.get_json_response.side_effect = suggest
+    generator = ImageCaptionGenerator(chatbot)
+
+    stream = generator._generate_caption_with_hashtags("Line one\nLine two", 3)
+    chunks = [chunk["message"]["content"] for chunk in stream]
+
+    assert chatbot.get_response.call_args.args[0] == "Line one\nLine two"
+    assert events == ["first token", "hashtags"]
+    assert chatbot.get_json_response.call_args.args[0].endswith(
+        "Post: Sushi night with friends"
+    )
+    assert chunks == [
+        "Sushi night\nwith friends ",
+        "#sushi",
+        " #dinner #japanesefood",
+    ]
+
+
+def test_captions_with_enough_hashtags_need_no_extra_call():
+    """Test that no hashtag request is made when the caption is complete."""
+    chatbot = MagicMock()
+    chatbot.get_response.return_value = {"message": {"content": "Sushi #a #b"}}
+    generator = ImageCaptionGenerator(chatbot)
+
+    response = generator._generate_caption_with_hashtags("prompt", 2, stream=False)
+
+    assert response["message"]["content"] == "Sushi #a #b"
+    chatbot.get_json_response.assert_not_called()
+
+
+def test_hashtag_index_is_queried_with_the_description(monkeypatch):
+    """
+    Test that a real platform prompt does not pull unrelated hashtags from
+    the index through its template words.
+    """
+    monkeypatch.chdir(Path(__file__).parents[2] / "src")
+    index = HashtagIndex()
+    index.add_caption(
+        "Best content for my followers: beach day with my dog "
+        "#dog #beach #sunset #puppylove"
+    )
+    chatbot = MagicMock()
+    chatbot.get_response.return_value = {"message": {"content": "Fresh tonight"}}
+    chatbot.get_json_response.return_value = {"hashtags": ["#sushi", "#dinner"]}
+    generator = ImageCaptionGenerator(chatbot, hashtag_index=index)
+
+    response = generator.write_caption(
+        "a plate of sushi",
+        "small",
+        "",
+        "informative",
+        "image",
+        "general",
+        2,
+        "casual",
+        "Instagram",
+        stream=False,
+    )
+
+    prompt = chatbot.get_response.call_args.args[0]
+    assert "followers" in prompt and "content" in prompt
+    assert response["message"]["content"] == "Fresh tonight\n\n#sushi #dinner"
@@ -0,0 +1,160 @@
+import os
+import threading
+from unittest.mock import MagicMock, patch
+import numpy as np
+from configuration_manager.config_models import VideoProcessingConfig
+from captioning.impl.video_caption_generator import VideoCaptionGenerator
+
+
+class FakeInference:
+    """Captions a scene with the value of its first pixel."""
+
+    DEFAULT_BATCH_SIZE = 2
+
+    def caption_batch(self, images):
+        return [str(image.getpixel((0, 0))[0]) for image in images]
+
+
+class FakeVideoProcessor:
+    """
+    Yields one scene per value listed in the video path and records the
+    detector it was given.
+    """
+
+    detectors = []
+    barrier = None
+
+    def __init__(self, video_path, scene_detector, scene_saver, **kwargs):
+        self.video_path = video_path
+        self.scene_detector = scene_detector
+        self.scene_saver = scene_saver
+        self.fps = 10
+        FakeVideoProcessor.detectors.append(scene_detector)
+
+    def get_frame_count(self):
+        return len(os.path.basename(self.video_path).split(",")) * 20
+
+    def iter_scenes(self):
+        values = os.path.basename(self.video_path).split(",")
+        for frame_index, value in enumerate(values):
+            if FakeVideoProcessor.barrier is not None:
+                FakeVideoProcessor.barrier.wait(timeout=5)
+            scene = np.zeros((4, 4, 3), dtype=np.uint8)
+            scene[:] = int(value)
+            yield frame_index * 20, scene
+
+
+def get_captions(scenes):
+    """Returns the captions of described scenes."""
+    return [scene["caption"] for scene in scenes]
+
+
+@patch("captioning.impl.video_caption_generator.VideoProcessor", new=FakeVideoProcessor)
+def test_concurrent_videos_do_not_share_state():
+    """
+    Test that two videos captioned at the same time get their own detector
+    and their own captions.
+    """
+    FakeVideoProcessor.detectors = []
+    FakeVideoProcessor.barrier = threading.Barrier(2)
+    generator = VideoCaptionGenerator(
+        MagicMock(), VideoProcessingConfig(scene_dedup_distance=0, cache_enabled=False)
+    )
+    results = {}
+
+    def describe(video_path):
+        results[video_path] = get_captions(
+            generator.describe_video(video_path, FakeInference())
+        )
+
+    threads = [
+        threading.Thread(target=describe, args=(video_path,))
+        for video_path in ("1,2,3", "7,8,9")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {"1,2,3": ["1", "2", "3"], "7,8,9": ["7", "8", "9"]}
+    assert FakeVideoProcessor.detectors[0] is not FakeVideoProcessor.detectors[1]
+
+
+@patch("captioning.impl.video_caption_generator.VideoProcessor", new=FakeVideoProcessor)
+def test_duplicate_scenes_are_captioned_once():
+    """
+    Test that look-alike scenes only reach the model once.
+    """
+    FakeVideoProcessor.barrier = None
+    inference = FakeInference()
+    inference.caption_batch = MagicMock(side_effect=inference.caption_batch)
+    generator = VideoCaptionGenerator(
+        MagicMock(), VideoProcessingConfig(cache_enabled=False)
+    )
+
+    scenes = generator.describe_video("5,5,5", inference)
+
+    assert scenes == [{"timestamp": 0.0, "caption": "5"}]
+    assert inference.caption_batch.call_count == 1
+
+
+@patch("captioning.impl.video_caption_generator.VideoProcessor")
+def test_repeated_video_is_served_from_cache(mock_video_processor, tmp_path):
+    """
+    Test that the same file is only decoded and captioned once, and that a
+    different model does not reuse the cached captions.
+    """
+    FakeVideoProcessor.barrier = None
+    mock_video_processor.side_effect = FakeVideoProcessor
+    video_path = tmp_path / "1,2"
+    video_path.write_bytes(b"video content")
+    generator = VideoCaptionGenerator(
+        MagicMock(),
+        VideoProcessingConfig(
+            scene_dedup_distance=0, cache_dir=str(tmp_path / "cache")
+        ),
+    )
+
+    first = generator.describe_video(str(video_path), FakeInference())
+    second = generator.describe_video(str(video_path), FakeInference())
+
+    assert (
+        first
+        == second
+        == [
+            {"timestamp": 0.0, "caption": "1"},
+            {"timestamp": 2.0, "caption": "2"},
+        ]
+    )
+    assert mock_video_processor.call_count == 1
+
+    class OtherInference(FakeInference):
+        pass
+
+    generator.describe_video(str(video_path), OtherInference())
+    assert mock_video_processor.call_count == 2
+
+
+def test_scene_saver_per_request(tmp_path):
+    """
+    Test that the disk debug mode writes every request to its own directory.
+    """
+    video_config = VideoProcessingConfig(
+        save_scenes_to_disk=True, scenes_dir=str(tmp_path)
+    )
+    generator = VideoCaptionGenerator(MagicMock(), video_config)
+
+    first, second = generator.create_scene_saver(), generator.create_scene_saver()
+
+    assert first.scenes_dir != second.scenes_dir
+    assert all(saver.scenes_dir.startswith(str(tmp_path)) for saver in (first, second))
+
+
+def test_no_scene_saver_by_default():
+    """
+    Test that scenes are not written to disk unless asked to.
+    """
+    generator = VideoCaptionGenerator(
+        MagicMock(), VideoProcessingConfig(cache_enabled=False)
+    )
+    assert generator.create_scene_saver() is None
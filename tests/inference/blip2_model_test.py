@@ -30,8 +30,19 @@ class TestBlip2Model(unittest.TestCase):
             patch("gc.collect"),
             patch("torch.cuda.empty_cache"),
             patch("torch.cuda.synchronize"),
-            patch("vector_store.get_unique_image_id", return_value="unique123"),
-            patch("vector_store.add_image_to_chroma"),
+            patch(
+                "inference.abstract.inference_abstract.get_unique_image_id",
+                return_value="unique123",
+            ),
+            patch("inference.abstract.inference_abstract.ChromaWriteBehindQueue"),
+            patch(
+                "inference.abstract.inference_abstract.get_captions_from_chroma",
+                return_value={},
+            ),
+            patch(
+                "inference.abstract.inference_abstract.compute_dhash",
+                return_value=0xF0F0F0F0F0F0F0F0,
+            ),
         ]
         for patcher in patches:
             patcher.start()
@@ -73,6 +84,126 @@ class TestBlip2Model(unittest.TestCase):
         mock_load_image.assert_called_once_with("dummy_path")
         self.assertEqual(caption, "This is a test caption.")
 
+    @patch(
+        "inference.abstract.inference_abstract.compute_dhash",
+        side_effect=[0x0, 0xFFFF, 0xFFFF0000],
+    )
+    @patch("inference.abstract.inference_abstract.InferenceAbstract.store_captions")
+    @patch(
+        "inference.abstract.inference_abstract.InferenceAbstract.load_image",
+        side_effect=lambda image_path: image_path,
+    )
+    @patch("inference.impl.blip2_model.Blip2Model.BLIP2_PROCESSOR", create=True)
+    @patch("inference.impl.blip2_model.Blip2Model.BLIP2_MODEL", create=True)
+    def test_caption_batch(
+        self,
+        mock_model,
+        mock_processor,
+        mock_load_image,
+        mock_store_captions,
+        mock_compute_dhash,
+    ):
+        """Test that caption_batch runs one generate call per batch and keeps the order."""
+        mock_model.generate.return_value = torch.tensor([[101, 102, 103]])
+        mock_processor.batch_decode.side_effect = [
+            [" caption 1", "caption 2 "],
+            ["caption 3"],
+        ]
+
+        captions = self.blip2_model.caption_batch(
+            ["image_1", "image_2", "image_3"], batch_size=2
+        )
+
+        self.assertEqual(captions, ["caption 1", "caption 2", "caption 3"])
+        self.assertEqual(mock_model.generate.call_count, 2)
+        self.assertEqual(mock_store_captions.call_count, 2)
+        self.assertEqual(mock_load_image.call_count, 3)
+
+    def test_load_image_in_memory(self):
+        """Test that in-memory images, such as video scenes, are not read from disk."""
+        from PIL import Image
+
+        image = Image.new("L", (4, 4))
+        with patch("inference.abstract.inference_abstract.Image.open") as mock_open:
+            loaded = self.blip2_model.load_image(image)
+
+        mock_open.assert_not_called()
+        self.assertEqual(loaded.mode, "RGB")
+
+    def test_caption_batch_invalid_batch_size(self):
+        """Test that a non-positive batch size is rejected."""
+        with self.assertRaises(ValueError):
+            self.blip2_model.caption_batch(["image_1"], batch_size=0)
+
+    @patch(
+        "inference.abstract.inference_abstract.get_captions_from_chroma",
+        return_value={"unique123": "cached caption"},
+    )
+    @patch(
+        "inference.abstract.inference_abstract.InferenceAbstract.load_image",
+        return_value="image",
+    )
+    @patch("inference.impl.blip2_model.Blip2Model.BLIP2_PROCESSOR", create=True)
+    @patch("inference.impl.blip2_model.Blip2Model.BLIP2_MODEL", create=True)
+    def test_get_image_caption_pipeline_cache_hit(
+        self, mock_model, mock_processor, mock_load_image, mock_get_captions
+    ):
+        """Test that a cached caption is returned without running the model."""
+        caption = self.blip2_model.get_image_caption_pipeline("dummy_path")
+
+        self.assertEqual(caption, "cached caption")
+        mock_get_captions.assert_called_once_with(self.collection, ["unique123"])
+        mock_model.generate.assert_not_called()
+        self.assertEqual(
+            self.blip2_model.get_cache_stats(),
+            {"near_duplicate_hits": 0, "hits": 1, "misses": 0, "hit_rate": 1.0},
+        )
+
+    @patch(
+        "inference.abstract.inference_abstract.InferenceAbstract.load_image",
+        return_value="image",
+    )
+    @patch("inference.impl.blip2_model.Blip2Model.BLIP2_PROCESSOR", create=True)
+    @patch("inference.impl.blip2_model.Blip2Model.BLIP2_MODEL", create=True)
+    def test_get_image_caption_pipeline_near_duplicate(
+        self, mock_model, mock_processor, mock_load_image
+    ):
+        """Test that a near-duplicate hash reuses the indexed caption without preprocessing."""
+        self.blip2_model.phash_index.add(0xF0F0F0F0F0F0F0F1, "near duplicate caption")
+
+        caption = self.blip2_model.get_image_caption_pipeline("dummy_path")
+
+        self.assertEqual(caption, "near duplicate caption")
+        mock_processor.assert_not_called()
+        mock_model.generate.assert_not_called()
+        self.assertEqual(self.blip2_model.get_cache_stats()["near_duplicate_hits"], 1)
+
+    @patch("inference.abstract.inference_abstract.InferenceAbstract.store_captions")
+    @patch("inference.impl.blip2_model.Blip2Model.BLIP2_PROCESSOR", create=True)
+    @patch("inference.impl.blip2_model.Blip2Model.BLIP2_MODEL", create=True)
+    def test_flat_images_are_not_near_duplicates(
+        self, mock_model, mock_processor, mock_store_captions
+    ):
+        """Test that two different flat images, which share a hash, are both captioned."""
+        from PIL import Image
+        from vector_store.phash_index import compute_dhash
+
+        black = Image.new("RGB", (64, 64), "black")
+        blue = Image.new("RGB", (64, 64), "blue")
+        self.assertEqual(compute_dhash(black), compute_dhash(blue))
+        mock_model.generate.return_value = torch.tensor([[101, 102]])
+        mock_processor.batch_decode.side_effect = [["a dark night"], ["a blue wall"]]
+
+        with patch(
+            "inference.abstract.inference_abstract.compute_dhash",
+            side_effect=compute_dhash,
+        ):
+            captions = self.blip2_model.caption_batch([black, blue], batch_size=1)
+
+        self.assertEqual(captions, ["a dark night", "a blue wall"])
+        self.assertEqual(len(self.blip2_model.phash_index), 0)
+        self.assertEqual(self.blip2_model.get_cache_stats()["near_duplicate_hits"], 0)
+
 
 if __name__ == "__main__":
     unittest.main()
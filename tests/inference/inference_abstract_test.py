@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import patch
+
+
+class TestInferenceAbstract(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            patch("inference.abstract.inference_abstract.ChromaWriteBehindQueue"),
+            patch("gc.collect"),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        from inference.abstract.inference_abstract import InferenceAbstract
+
+        class PerImageModel(InferenceAbstract):
+            def get_image_caption_pipeline(self, image_path):
+                return f"caption of {image_path}"
+
+            def load_model(self):
+                pass
+
+        self.model = PerImageModel(None)
+
+    def test_models_without_batching_are_captioned_per_image(self):
+        """Models without `generate_captions` fall back to the per-image pipeline."""
+        self.assertFalse(self.model.supports_batching)
+
+        captions = self.model.caption_batch(["a.jpg", "b.jpg", "c.jpg"], batch_size=2)
+
+        self.assertEqual(
+            captions, ["caption of a.jpg", "caption of b.jpg", "caption of c.jpg"]
+        )
+
+    def test_models_without_a_collection_have_no_write_queue(self):
+        """Nothing is queued for chroma when there is no collection."""
+        self.assertIsNone(self.model.write_queue)
+        self.model.store_captions(["a"], None, ["caption"])
+
+    def test_batching_models_support_batching(self):
+        """Blip2 and LLaVA implement batched captioning."""
+        from inference.impl.blip2_model import Blip2Model
+        from inference.impl.llava_model import LlavaModel
+
+        for model_class in (Blip2Model, LlavaModel):
+            self.assertTrue(model_class.__new__(model_class).supports_batching)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,14 @@
+import asyncio
 import unittest
 from unittest.mock import patch, MagicMock
 from llm_chatbot import LLMChatbot
+from llm_chatbot.response_cache import ResponseCache
 
 
 class TestLLMChatbot(unittest.TestCase):
+    @patch("llm_chatbot.llm_chatbot.get_shared_client")
     @patch("configuration_manager.config_manager.ConfigManager.get_config_manager")
-    def test_initialization(self, mock_get_config_manager):
+    def test_initialization(self, mock_get_config_manager, mock_get_shared_client):
         """
         Test the initialization of the LLMChatbot class by mocking the configuration manager and app_config.
 
@@ -26,6 +29,7 @@ class TestLLMChatbot(unittest.TestCase):
         mock_app_config.ollama.variants.phi3 = "phi-3-model"
         mock_app_config.ollama.temperature = 0.5
         mock_app_config.ollama.top_p = 0.9
+        mock_app_config.ollama.cache_enabled = False
 
         mock_config_manager.get_app_config.return_value = mock_app_config
         mock_get_config_manager.return_value = mock_config_manager
@@ -37,53 +41,138 @@ class TestLLMChatbot(unittest.TestCase):
         self.assertEqual(chatbot.model, "phi-3-model")
         self.assertEqual(chatbot.temperature, 0.5)
         self.assertEqual(chatbot.top_p, 0.9)
+        mock_get_shared_client.assert_called_once_with(mock_app_config.ollama)
+        self.assertIs(chatbot.client, mock_get_shared_client.return_value)
+        self.assertIsNone(chatbot.response_cache)
 
-    @patch("ollama.chat")
     @patch("configuration_manager.config_manager.ConfigManager.get_config_manager")
-    def test_get_response(self, mock_get_config_manager, mock_ollama_chat):
+    def test_get_response(self, mock_get_config_manager):
         """
-        Test the get_response method by mocking the configuration manager and ollama chat.
+        Test the get_response method by mocking the configuration manager and the Ollama client.
 
-        This test case sets up the configuration and return values for ollama chat, initializes the chatbot,
-        tests the get_response method with a message 'Hello' and stream set to True,
-        verifies the correct call to ollama chat, and checks the response.
+        This test case sets up the configuration and the return values of the client, initializes the chatbot,
+        tests the get_response method with a message 'Hello' with and without streaming,
+        verifies the correct calls to the client, and checks the responses.
 
         Parameters:
             mock_get_config_manager (MagicMock): A mock object representing the get_config_manager method of the ConfigManager class.
-            mock_ollama_chat (MagicMock): A mock object for the ollama chat function.
 
         Returns:
             None
         """
-        # Setup configuration as in the previous test
-        mock_config_manager = MagicMock()
-        mock_app_config = MagicMock()
-        mock_app_config.ollama.variants.phi3 = "phi-3-model"
-        mock_app_config.ollama.temperature = 0.5
-        mock_app_config.ollama.top_p = 0.9
+        self._mock_config(mock_get_config_manager)
+        client = MagicMock()
+        client.chat_stream.return_value = iter([{"message": {"content": "test"}}])
+        client.chat.return_value = {"response": "test response"}
+
+        chatbot = LLMChatbot(client)
+
+        stream = chatbot.get_response("Hello", stream=True)
+        self.assertEqual(list(stream), [{"message": {"content": "test"}}])
+        client.chat_stream.assert_called_once_with(
+            "phi-3-model",
+            [{"role": "user", "content": "Hello"}],
+            {"temperature": 0.5, "top_p": 0.9},
+        )
 
-        mock_config_manager.get_app_config.return_value = mock_app_config
-        mock_get_config_manager.return_value = mock_config_manager
+        response = chatbot.get_response("Hello")
+        client.chat.assert_called_once_with(
+            "phi-3-model",
+            [{"role": "user", "content": "Hello"}],
+            {"temperature": 0.5, "top_p": 0.9},
+            format=None,
+        )
+        self.assertEqual(response, {"response": "test response"})
 
-        # Setup return value for ollama.chat
-        mock_ollama_chat.return_value = {"response": "test response"}
+    @patch("configuration_manager.config_manager.ConfigManager.get_config_manager")
+    def test_get_json_response(self, mock_get_config_manager):
+        """
+        Test that get_json_response asks for JSON output and parses the answer.
+        """
+        self._mock_config(mock_get_config_manager)
+        client = MagicMock()
+        client.chat.return_value = {"message": {"content": '{"hashtags": ["#sun"]}'}}
 
-        # Initialize chatbot
-        chatbot = LLMChatbot()
+        response = LLMChatbot(client).get_json_response("Hashtags please")
+
+        self.assertEqual(client.chat.call_args.kwargs["format"], "json")
+        self.assertEqual(response, {"hashtags": ["#sun"]})
 
-        # Test get_response
-        response = chatbot.get_response("Hello", stream=True)
+        client.chat.return_value = {"message": {"content": "no json"}}
+        with self.assertRaises(ValueError):
+            LLMChatbot(client).get_json_response("Hashtags please")
 
-        # Verify ollama.chat was called correctly
-        mock_ollama_chat.assert_called_once_with(
-            model="phi-3-model",
-            messages=[{"role": "user", "content": "Hello"}],
-            stream=True,
-            options={"temperature": 0.5, "top_p": 0.9},
+    @patch("configuration_manager.config_manager.ConfigManager.get_config_manager")
+    def test_get_response_async(self, mock_get_config_manager):
+        """
+        Test that get_response_async streams the chunks of the async client
+        with the configured model and options.
+        """
+        self._mock_config(mock_get_config_manager)
+        client = MagicMock()
+
+        async def chat_stream_async(model, messages, options):
+            for text in ["Hel", "lo"]:
+                yield {"message": {"content": text}}
+
+        client.chat_stream_async = MagicMock(side_effect=chat_stream_async)
+
+        async def collect():
+            chatbot = LLMChatbot(client)
+            return [chunk async for chunk in chatbot.get_response_async("Hello")]
+
+        chunks = asyncio.run(collect())
+
+        client.chat_stream_async.assert_called_once_with(
+            "phi-3-model",
+            [{"role": "user", "content": "Hello"}],
+            {"temperature": 0.5, "top_p": 0.9},
+        )
+        self.assertEqual(
+            [chunk["message"]["content"] for chunk in chunks], ["Hel", "lo"]
         )
 
-        # Check the response
-        self.assertEqual(response, {"response": "test response"})
+    @patch("configuration_manager.config_manager.ConfigManager.get_config_manager")
+    def test_deterministic_responses_are_cached(self, mock_get_config_manager):
+        """
+        Test that repeated JSON requests and zero-temperature streams are
+        answered from the cache, while sampled responses are not cached.
+        """
+        self._mock_config(mock_get_config_manager)
+        client = MagicMock()
+        client.chat.return_value = {"message": {"content": '["#sun"]'}}
+        client.chat_stream.side_effect = lambda *args: iter(
+            [{"message": {"content": "Hel"}}, {"message": {"content": "lo"}}]
+        )
+        chatbot = LLMChatbot(client, ResponseCache())
+
+        self.assertEqual(chatbot.get_json_response("Hashtags"), ["#sun"])
+        self.assertEqual(chatbot.get_json_response("Hashtags"), ["#sun"])
+        self.assertEqual(client.chat.call_count, 1)
+
+        # Sampled with temperature 0.5, so every request reaches the model
+        list(chatbot.get_response("Hello", stream=True))
+        list(chatbot.get_response("Hello", stream=True))
+        self.assertEqual(client.chat_stream.call_count, 2)
+
+        chatbot.temperature = 0
+        first = list(chatbot.get_response("Hello", stream=True))
+        second = list(chatbot.get_response("Hello", stream=True))
+        self.assertEqual(client.chat_stream.call_count, 3)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(second[0]["message"]["content"], "Hello")
+
+    @staticmethod
+    def _mock_config(mock_get_config_manager):
+        """Configures the mocked configuration manager."""
+        mock_app_config = MagicMock()
+        mock_app_config.ollama.variants.phi3 = "phi-3-model"
+        mock_app_config.ollama.temperature = 0.5
+        mock_app_config.ollama.top_p = 0.9
+        mock_app_config.ollama.cache_enabled = False
+        mock_get_config_manager.return_value.get_app_config.return_value = (
+            mock_app_config
+        )
 
 
 if __name__ == "__main__":
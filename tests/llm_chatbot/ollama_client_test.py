@@ -0,0 +1,231 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import ollama
+from llm_chatbot.ollama_client import PooledOllamaClient
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    """A local stand-in for the Ollama chat endpoint."""
+
+    daemon_threads = True
+
+    def __init__(self, delay=0.0, failures=0):
+        super().__init__(("127.0.0.1", 0), FakeOllamaHandler)
+        self.delay = delay
+        self.failures = failures
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests.append(body)
+            fail = server.failures > 0
+            server.failures -= fail
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            time.sleep(server.delay)
+            if fail:
+                self._send(503, b'{"error": "overloaded"}')
+                return
+            content = body["messages"][-1]["content"]
+            if body.get("stream"):
+                lines = [
+                    {
+                        "model": body["model"],
+                        "message": {"role": "assistant", "content": word},
+                        "done": False,
+                    }
+                    for word in ["echo:", f" {content}"]
+                ]
+                lines.append(
+                    {
+                        "model": body["model"],
+                        "message": {"role": "assistant", "content": ""},
+                        "done": True,
+                    }
+                )
+                payload = b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+            else:
+                payload = json.dumps(
+                    {
+                        "model": body["model"],
+                        "message": {"role": "assistant", "content": f"echo: {content}"},
+                        "done": True,
+                    }
+                ).encode()
+            self._send(200, payload)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send(self, status, payload):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def fake_server():
+    servers = []
+
+    def start(**kwargs):
+        server = FakeOllamaServer(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def message(content):
+    return [{"role": "user", "content": content}]
+
+
+def test_chat_and_stream(fake_server):
+    """Test that full and streamed responses come back from the server."""
+    server = fake_server()
+    client = PooledOllamaClient(server.url)
+
+    response = client.chat("phi3", message("hi"), {"temperature": 0})
+    chunks = list(client.chat_stream("phi3", message("there")))
+
+    assert response["message"]["content"] == "echo: hi"
+    assert "".join(chunk["message"]["content"] for chunk in chunks) == "echo: there"
+    assert server.requests[0]["options"] == {"temperature": 0}
+    assert client.get_stats()["in_flight"] == 0
+
+
+def test_identical_concurrent_requests_are_coalesced(fake_server):
+    """Test that identical in-flight prompts share one upstream call."""
+    server = fake_server(delay=0.3)
+    client = PooledOllamaClient(server.url)
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        responses = list(
+            executor.map(lambda _: client.chat("phi3", message("same")), range(5))
+        )
+
+    assert len(server.requests) == 1
+    assert all(r["message"]["content"] == "echo: same" for r in responses)
+    assert client.get_stats()["coalesced"] == 4
+
+
+def test_in_flight_requests_are_capped_per_model(fake_server):
+    """Test that no more than max_concurrent_requests reach the server."""
+    server = fake_server(delay=0.1)
+    client = PooledOllamaClient(server.url, max_concurrent_requests=2)
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(lambda i: client.chat("phi3", message(str(i))), range(6)))
+
+    assert len(server.requests) == 6
+    assert server.max_active == 2
+    assert client.get_stats()["waited_for_slot"] > 0
+
+
+def test_overloaded_server_is_retried(fake_server):
+    """Test that overload responses are retried and permanent errors raised."""
+    server = fake_server(failures=2)
+    client = PooledOllamaClient(server.url, max_retries=2, retry_backoff=0.01)
+
+    response = client.chat("phi3", message("hi"))
+
+    assert response["message"]["content"] == "echo: hi"
+    assert client.get_stats()["retries"] == 2
+
+    server.failures = 5
+    with pytest.raises(ollama.ResponseError):
+        client.chat("phi3", message("again"))
+    assert client.get_stats()["failed"] == 1
+
+
+def test_async_variants_share_coalescing_and_limits(fake_server):
+    """Test the async chat and stream methods."""
+    server = fake_server(delay=0.2)
+    client = PooledOllamaClient(server.url, max_concurrent_requests=1)
+
+    async def scenario():
+        responses = await asyncio.gather(
+            *(client.chat_async("phi3", message("same")) for _ in range(3))
+        )
+        chunks = [c async for c in client.chat_stream_async("phi3", message("s"))]
+        return responses, chunks
+
+    responses, chunks = asyncio.run(scenario())
+
+    assert [r["message"]["content"] for r in responses] == ["echo: same"] * 3
+    assert "".join(c["message"]["content"] for c in chunks) == "echo: s"
+    assert len(server.requests) == 2
+    assert server.max_active == 1
+
+
+def test_cancelled_leader_does_not_cancel_coalesced_callers(fake_server):
+    """Test that the shared request survives the cancellation of its sender."""
+    server = fake_server(delay=0.3)
+    client = PooledOllamaClient(server.url)
+
+    async def scenario():
+        leader = asyncio.ensure_future(client.chat_async("phi3", message("same")))
+        await asyncio.sleep(0.05)
+        follower = asyncio.ensure_future(client.chat_async("phi3", message("same")))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        response = await follower
+        return leader.cancelled(), response
+
+    leader_cancelled, response = asyncio.run(scenario())
+
+    assert leader_cancelled
+    assert response["message"]["content"] == "echo: same"
+    assert len(server.requests) == 1
+
+
+def test_async_callers_wait_for_slots_held_by_threads(fake_server):
+    """Test that async callers share the slots with threads and never leak one."""
+    server = fake_server(delay=0.3)
+    client = PooledOllamaClient(server.url, max_concurrent_requests=1)
+
+    async def scenario():
+        holder = asyncio.ensure_future(
+            asyncio.to_thread(client.chat, "phi3", message("a"))
+        )
+        await asyncio.sleep(0.05)
+        abandoned = asyncio.ensure_future(client.chat_async("phi3", message("b")))
+        await asyncio.sleep(0.05)
+        abandoned.cancel()
+        await holder
+        return await client.chat_async("phi3", message("c"))
+
+    response = asyncio.run(scenario())
+
+    assert response["message"]["content"] == "echo: c"
+    assert server.max_active == 1
+    assert client.get_stats()["waited_for_slot"] >= 1
+    assert client.get_stats()["in_flight"] == 0
+    assert client._semaphore("phi3").acquire(timeout=1)
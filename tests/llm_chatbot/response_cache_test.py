@@ -0,0 +1,65 @@
+from unittest.mock import patch
+from llm_chatbot.response_cache import ResponseCache
+
+MESSAGES = [{"role": "user", "content": "Caption this"}]
+
+
+def test_key_depends_on_model_options_format_and_messages():
+    """Test that any change of the request changes the key."""
+    key = ResponseCache.make_key("phi3", MESSAGES, {"temperature": 0})
+
+    assert key == ResponseCache.make_key("phi3", MESSAGES, {"temperature": 0})
+    assert key != ResponseCache.make_key("llama3", MESSAGES, {"temperature": 0})
+    assert key != ResponseCache.make_key("phi3", MESSAGES, {"temperature": 0.2})
+    assert key != ResponseCache.make_key(
+        "phi3", MESSAGES, {"temperature": 0}, format="json"
+    )
+    assert key != ResponseCache.make_key(
+        "phi3", [{"role": "user", "content": "Other"}], {"temperature": 0}
+    )
+
+
+def test_nonzero_temperature_bypasses_the_cache_unless_allowed():
+    """Test that only deterministic requests are cached by default."""
+    assert ResponseCache().is_cacheable({"temperature": 0})
+    assert not ResponseCache().is_cacheable({"temperature": 1})
+    assert ResponseCache(cache_nonzero_temperature=True).is_cacheable(
+        {"temperature": 1}
+    )
+
+
+def test_least_recently_used_entries_are_evicted():
+    """Test that the memory tier keeps the most recently used entries."""
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+
+
+def test_entries_expire_after_ttl():
+    """Test that expired entries are not returned."""
+    cache = ResponseCache(ttl=10)
+    with patch("llm_chatbot.response_cache.time.time", return_value=1000):
+        cache.set("a", "1")
+    with patch("llm_chatbot.response_cache.time.time", return_value=1005):
+        assert cache.get("a") == "1"
+    with patch("llm_chatbot.response_cache.time.time", return_value=1011):
+        assert cache.get("a") is None
+
+
+def test_entries_survive_a_restart(tmp_path):
+    """Test that the disk tier answers after the memory tier is gone."""
+    db_path = str(tmp_path / "cache" / "responses.sqlite3")
+    ResponseCache(db_path=db_path).set("a", "stored")
+
+    cache = ResponseCache(db_path=db_path)
+
+    assert cache.get("a") == "stored"
+    assert (cache.hits, cache.misses) == (1, 0)
+    cache.clear()
+    assert ResponseCache(db_path=db_path).get("a") is None
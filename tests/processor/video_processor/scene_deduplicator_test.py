@@ -0,0 +1,108 @@
+import numpy as np
+from processor.video_processor.scene_deduplicator import (
+    SceneDeduplicator,
+    compute_frame_dhash,
+)
+from processor.video_processor.scene_saver import scene_to_image
+from vector_store.phash_index import compute_dhash
+
+
+def create_shot(seed, width=64, height=48):
+    """
+    Creates a textured BGR frame that stands for one camera shot.
+
+    Args:
+        seed (int): Seed of the texture.
+
+    Returns:
+        numpy.ndarray: The created frame.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def test_dhash_survives_small_changes():
+    """
+    Test that a slightly brighter copy of a frame keeps a close hash.
+    """
+    shot = create_shot(0)
+    brighter = np.clip(shot.astype(np.int16) + 10, 0, 255).astype(np.uint8)
+
+    distance = bin(compute_frame_dhash(shot) ^ compute_frame_dhash(brighter)).count("1")
+    assert distance <= 6
+
+
+def test_cut_back_to_earlier_shot_is_dropped():
+    """
+    Test that returning to an earlier shot is recognised as a duplicate.
+    """
+    deduplicator = SceneDeduplicator(max_distance=6)
+    scenes = [create_shot(0), create_shot(1), create_shot(0), create_shot(2)]
+
+    kept = list(deduplicator.filter(enumerate(scenes)))
+
+    assert [frame_index for frame_index, _ in kept] == [0, 1, 3]
+    assert deduplicator.duplicates == 1
+    assert kept[2][1] is scenes[3]
+
+
+def test_max_scenes_are_spread_over_the_video():
+    """
+    Test that the cap keeps scenes from the whole video, yields them while
+    the video is read and closes the scene iterator.
+    """
+    closed = []
+    read = []
+
+    def scenes():
+        try:
+            for seed in range(100):
+                read.append(seed)
+                yield seed, create_shot(seed)
+        finally:
+            closed.append(True)
+
+    deduplicator = SceneDeduplicator(max_scenes=4)
+    kept = []
+    for frame_index, _ in deduplicator.filter(scenes(), num_frames=100):
+        kept.append(frame_index)
+        if len(kept) == 1:
+            assert read == [0]
+
+    assert kept == [0, 25, 50, 75]
+    assert deduplicator.over_quota == 72
+    assert closed == [True]
+
+
+def test_max_scenes_without_frame_count_stops_reading():
+    """
+    Test that without a frame count the first scenes are kept and reading stops.
+    """
+    read = []
+
+    def scenes():
+        for seed in range(100):
+            read.append(seed)
+            yield seed, create_shot(seed)
+
+    kept = list(SceneDeduplicator(max_scenes=3).filter(scenes()))
+
+    assert [frame_index for frame_index, _ in kept] == [0, 1, 2]
+    assert read == [0, 1, 2, 3]
+
+
+def test_scene_hash_matches_the_image_hash():
+    """
+    Test that a scene gets the same hash as the image the model is given.
+    """
+    shot = create_shot(3, width=640, height=480)
+
+    assert compute_frame_dhash(shot) == compute_dhash(scene_to_image(shot))
+
+
+def test_zero_distance_keeps_every_scene():
+    """
+    Test that a distance of 0 disables deduplication.
+    """
+    scenes = [create_shot(0)] * 3
+    assert len(list(SceneDeduplicator(max_distance=0).filter(enumerate(scenes)))) == 3
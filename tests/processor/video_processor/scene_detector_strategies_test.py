@@ -0,0 +1,120 @@
+import pytest
+import numpy as np
+from configuration_manager.config_models import VideoProcessingConfig
+from processor.video_processor import (
+    AdaptiveSceneDetector,
+    HistogramSceneDetector,
+    SceneDetector,
+    create_scene_detector,
+)
+
+
+def create_color_frame(width=64, height=48, color=(0, 0, 255)):
+    """
+    Creates a frame filled with a single color.
+
+    Returns:
+        numpy.ndarray: The created frame.
+    """
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[:] = color
+    return frame
+
+
+def run_detector(detector, frames):
+    """
+    Feeds frames to a detector and returns the scene_changed result per frame.
+    """
+    changes = []
+    for frame in frames:
+        detector.process_frame(frame)
+        changes.append(detector.scene_changed())
+    return changes
+
+
+def test_adaptive_detector_ignores_steady_motion():
+    """
+    Test that evenly changing frames, like a pan, do not fire while a cut does.
+    """
+    detector = AdaptiveSceneDetector(num_diffs=10, k=2.5, min_diff=2.0)
+    frames = [create_color_frame(color=(i * 4, i * 4, i * 4)) for i in range(20)]
+    frames.append(create_color_frame(color=(255, 255, 255)))
+
+    changes = run_detector(detector, frames)
+
+    assert not any(changes[:-1])
+    assert changes[-1]
+
+
+def test_adaptive_detector_running_statistics():
+    """
+    Test that the running sum of squares follows the ring buffer.
+    """
+    detector = AdaptiveSceneDetector(num_diffs=5)
+    run_detector(
+        detector, [create_color_frame(color=(i * i % 256, 0, 0)) for i in range(30)]
+    )
+
+    assert detector._square_sum == pytest.approx(
+        sum(diff**2 for diff in detector.mean_diffs)
+    )
+    detector.reset_state()
+    assert detector._square_sum == 0.0
+    assert len(detector.mean_diffs) == 0
+
+
+def test_histogram_detector_detects_cut_and_fade():
+    """
+    Test that a cut fires once and a gradual fade fires once it has drifted
+    far enough from the first frame of the scene.
+    """
+    detector = HistogramSceneDetector(threshold=0.35)
+    red, blue = create_color_frame(color=(0, 0, 255)), create_color_frame(
+        color=(255, 0, 0)
+    )
+    frames = [red] * 3 + [blue] * 3
+    frames += [
+        (blue * (1 - alpha) + red * alpha).astype(np.uint8)
+        for alpha in np.linspace(0.1, 1.0, 10)
+    ]
+
+    changes = run_detector(detector, frames)
+
+    assert changes[:6] == [False, False, False, True, False, False]
+    assert sum(changes[6:]) >= 1
+    assert detector.get_scene() is not frames[-1]
+
+
+def test_histogram_detector_reset_state():
+    """
+    Test that reset_state forgets the reference histogram.
+    """
+    detector = HistogramSceneDetector()
+    run_detector(detector, [create_color_frame(color=(0, 0, 255))])
+    detector.reset_state()
+
+    assert run_detector(detector, [create_color_frame(color=(255, 0, 0))]) == [False]
+
+
+@pytest.mark.parametrize(
+    "name, detector_class",
+    [
+        ("mean_diff", SceneDetector),
+        ("adaptive", AdaptiveSceneDetector),
+        ("histogram", HistogramSceneDetector),
+    ],
+)
+def test_create_scene_detector(name, detector_class):
+    """
+    Test that the factory builds the configured detector.
+    """
+    detector = create_scene_detector(VideoProcessingConfig(scene_detector=name))
+    assert type(detector) is detector_class
+
+
+def test_create_scene_detector_unknown():
+    """
+    Test that an unknown detector is rejected.
+    """
+    with pytest.raises(ValueError):
+        create_scene_detector(VideoProcessingConfig(scene_detector="foo"))
@@ -81,3 +81,69 @@ def test_reset_and_different_sizes(scene_detector):
     assert (
         scene_detector.mean_diffs[0] > 0
     ), f"Mean diff was not positive: {scene_detector.mean_diffs[0]}"
+
+
+def test_running_sum_matches_window(scene_detector):
+    """
+    Test that the running sum follows the ring buffer once old differences
+    are dropped.
+
+    Parameters:
+        scene_detector (SceneDetector): An instance of the SceneDetector class.
+
+    Returns:
+        None
+    """
+    for i in range(100):
+        scene_detector.process_frame(
+            create_color_frame(width=64, height=48, color=(i * 7 % 256, 0, 0))
+        )
+
+    assert len(scene_detector.mean_diffs) == scene_detector.num_diffs
+    assert scene_detector._diff_sum == pytest.approx(sum(scene_detector.mean_diffs))
+
+
+def test_fast_mode_uses_thumbnails():
+    """
+    Test that fast mode compares grayscale thumbnails and only copies the
+    full-resolution frame when a scene is requested.
+
+    Returns:
+        None
+    """
+    scene_detector = SceneDetector(num_diffs=2, fast=True, thumbnail_width=32)
+    frame1 = create_color_frame(color=(255, 0, 0))
+    frame2 = create_color_frame(width=320, height=240, color=(0, 0, 255))
+
+    scene_detector.process_frame(frame1)
+    scene_detector.process_frame(frame2)
+
+    assert scene_detector.curr_gray.shape == (24, 32)
+    assert scene_detector.mean_diffs[0] > 0
+    assert scene_detector.curr_frame is frame2
+    assert scene_detector.prev_frame is None
+    assert scene_detector.prev_gray is scene_detector.curr_gray
+    scene = scene_detector.get_scene()
+    assert scene is not frame2
+    assert np.array_equal(scene, frame2)
+
+
+def test_fast_mode_detects_same_change_as_full_resolution():
+    """
+    Test that fast mode fires on the same frame as the full-resolution mode.
+
+    Returns:
+        None
+    """
+    detectors = [SceneDetector(num_diffs=5), SceneDetector(num_diffs=5, fast=True)]
+    colors = [(10 * i, 10 * i, 10 * i) for i in range(8)] + [(255, 255, 255)]
+    changes = []
+    for detector in detectors:
+        changed = []
+        for color in colors:
+            detector.process_frame(create_color_frame(color=color))
+            changed.append(detector.scene_changed())
+        changes.append(changed)
+
+    assert changes[0] == changes[1]
+    assert changes[0][-1]
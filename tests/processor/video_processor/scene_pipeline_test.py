@@ -0,0 +1,77 @@
+import threading
+import pytest
+from processor.video_processor.scene_pipeline import iter_scene_batches
+
+
+def test_batches_keep_scene_order():
+    """
+    Test that every scene is yielded once, in order, in batches of at most
+    batch_size.
+    """
+    batches = list(iter_scene_batches(iter(range(20)), batch_size=3))
+
+    assert [scene for batch in batches for scene in batch] == list(range(20))
+    assert all(1 <= len(batch) <= 3 for batch in batches)
+
+
+def test_detection_overlaps_consumer():
+    """
+    Test that the producer keeps detecting while a batch is being consumed.
+    """
+    second_scene_read = threading.Event()
+
+    def scenes():
+        yield "scene 1"
+        second_scene_read.set()
+        yield "scene 2"
+
+    batches = iter_scene_batches(scenes(), batch_size=1)
+    assert next(batches) == ["scene 1"]
+    # The consumer is still working on the first batch here
+    assert second_scene_read.wait(timeout=5)
+    assert list(batches) == [["scene 2"]]
+
+
+def test_producer_error_is_raised_after_scenes():
+    """
+    Test that an error of the scene iterator reaches the consumer after the
+    scenes read before it.
+    """
+
+    def scenes():
+        yield "scene 1"
+        raise RuntimeError("decode failed")
+
+    received = []
+    with pytest.raises(RuntimeError, match="decode failed"):
+        for batch in iter_scene_batches(scenes(), batch_size=4):
+            received.extend(batch)
+    assert received == ["scene 1"]
+
+
+def test_closing_stops_producer():
+    """
+    Test that closing the batches closes the scene iterator.
+    """
+    closed = threading.Event()
+
+    def scenes():
+        try:
+            for index in range(1000):
+                yield index
+        finally:
+            closed.set()
+
+    batches = iter_scene_batches(scenes(), batch_size=1, max_queue_size=2)
+    next(batches)
+    batches.close()
+
+    assert closed.is_set()
+
+
+def test_invalid_batch_size():
+    """
+    Test that a non-positive batch size is rejected.
+    """
+    with pytest.raises(ValueError):
+        next(iter_scene_batches(iter([]), batch_size=0))
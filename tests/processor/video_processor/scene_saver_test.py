@@ -0,0 +1,37 @@
+import os
+import numpy as np
+from processor.video_processor.scene_saver import SceneSaver, scene_to_image
+
+
+def create_bgr_frame(color=(255, 0, 0)):
+    """
+    Creates a small BGR frame filled with a single color.
+
+    Returns:
+        numpy.ndarray: The created frame.
+    """
+    frame = np.zeros((24, 32, 3), dtype=np.uint8)
+    frame[:] = color
+    return frame
+
+
+def test_scene_to_image_converts_to_rgb():
+    """
+    Test that BGR scene frames are handed to the model as RGB images.
+    """
+    image = scene_to_image(create_bgr_frame(color=(255, 0, 0)))
+
+    assert image.mode == "RGB"
+    assert image.getpixel((0, 0)) == (0, 0, 255)
+
+
+def test_scene_saver_writes_jpegs(tmp_path):
+    """
+    Test that SceneSaver writes the scenes to disk.
+    """
+    scenes_dir = tmp_path / "scenes"
+    saver = SceneSaver(str(scenes_dir))
+    saver.save_scene(create_bgr_frame())
+
+    assert sorted(os.listdir(scenes_dir)) == ["scene_0001.jpg"]
+    assert len(saver.scene_list) == 1
@@ -1,9 +1,18 @@
 import pytest
 from unittest.mock import patch, MagicMock
 import cv2
+import numpy as np
 from processor.video_processor import VideoProcessor
 from processor.video_processor.scene_detector import SceneDetector
 from processor.video_processor.scene_saver import SceneSaver
+from processor.video_processor.scene_detector_factory import (
+    SCENE_DETECTORS,
+    create_scene_detector,
+)
+from processor.video_processor.impl.histogram_scene_detector import (
+    HistogramSceneDetector,
+)
+from configuration_manager.config_models import VideoProcessingConfig
 
 
 @pytest.fixture
@@ -15,10 +24,9 @@ def mock_video_capture():
         MagicMock: A mock object that simulates the behavior of VideoCapture.
     """
     mock_cap = MagicMock()
-    # Simulate reading 150 frames followed by an end-of-file signal
-    mock_cap.read.side_effect = [
-        (True, f"frame{i}".encode()) for i in range(1, 151)
-    ] + [(False, None)]
+    # Simulate grabbing 150 frames followed by an end-of-file signal
+    mock_cap.grab.side_effect = [True] * 150 + [False]
+    mock_cap.retrieve.return_value = (True, b"frame")
     mock_cap.get.side_effect = lambda x: 30 if x == cv2.CAP_PROP_FPS else 150
     return mock_cap
 
@@ -67,15 +75,18 @@ def test_detect_scenes(
     processor = VideoProcessor(video_path, mock_scene_detector, mock_scene_saver)
     processor.detect_scenes()
 
-    print(f"Read call count: {mock_video_capture.read.call_count}")
+    print(f"Grab call count: {mock_video_capture.grab.call_count}")
     print(f"Process frame call count: {mock_scene_detector.process_frame.call_count}")
     print(f"Scene changed call count: {mock_scene_detector.scene_changed.call_count}")
     print(f"Save scene call count: {mock_scene_saver.save_scene.call_count}")
 
-    assert mock_video_capture.read.call_count == 151  # 150 frames + 1 stop frame
+    assert mock_video_capture.grab.call_count == 151  # 150 frames + 1 stop frame
+    mock_video_capture.read.assert_not_called()
 
     # Calculate the expected number of processed frames based on skip rate logic
     expected_processed_frames = sum(1 for i in range(150) if i % 3 == 0)
+    # Only the sampled frames are decoded into images
+    assert mock_video_capture.retrieve.call_count == expected_processed_frames
     assert mock_scene_detector.process_frame.call_count == expected_processed_frames
     assert mock_scene_detector.scene_changed.call_count == expected_processed_frames
     assert (
@@ -111,9 +122,7 @@ def test_detect_scenes_with_different_durations(
         mock_video_capture.get.side_effect = lambda x: (
             30 if x == cv2.CAP_PROP_FPS else frame_count
         )
-        mock_video_capture.read.side_effect = [
-            (True, f"frame{i}".encode()) for i in range(1, frame_count + 1)
-        ] + [(False, None)]
+        mock_video_capture.grab.side_effect = [True] * frame_count + [False]
 
         mock_cv2_VideoCapture.return_value = mock_video_capture
         video_path = "test_video.mp4"
@@ -158,9 +167,7 @@ def test_no_scene_change(
     mock_scene_detector.scene_changed.side_effect = [False] * 300
 
     mock_video_capture.get.side_effect = lambda x: 30 if x == cv2.CAP_PROP_FPS else 150
-    mock_video_capture.read.side_effect = [
-        (True, f"frame{i}".encode()) for i in range(1, 151)
-    ] + [(False, None)]
+    mock_video_capture.grab.side_effect = [True] * 150 + [False]
 
     mock_cv2_VideoCapture.return_value = mock_video_capture
     video_path = "test_video.mp4"
@@ -175,3 +182,141 @@ def test_no_scene_change(
     assert (
         mock_scene_saver.save_scene.call_count == 0
     )  # No scenes saved since no scene changes
+
+
+@patch("cv2.VideoCapture")
+def test_detect_scenes_seek_sampler(
+    mock_cv2_VideoCapture, mock_video_capture, mock_scene_detector, mock_scene_saver
+):
+    """
+    Test that the seek sampler jumps to every sampled frame instead of
+    decoding the frames in between.
+    """
+    mock_video_capture.read.return_value = (True, b"frame")
+    mock_cv2_VideoCapture.return_value = mock_video_capture
+
+    processor = VideoProcessor(
+        "test_video.mp4", mock_scene_detector, mock_scene_saver, sampler="seek"
+    )
+    processor.detect_scenes()
+
+    expected_frames = list(range(0, 150, 3))
+    mock_video_capture.grab.assert_not_called()
+    assert mock_video_capture.read.call_count == len(expected_frames)
+    seeks = [
+        call.args[1]
+        for call in mock_video_capture.set.call_args_list
+        if call.args[0] == cv2.CAP_PROP_POS_FRAMES
+    ]
+    assert seeks == expected_frames
+    assert mock_scene_detector.process_frame.call_count == len(expected_frames)
+
+
+def test_unknown_sampler(mock_scene_detector, mock_scene_saver):
+    """
+    Test that an unknown sampler is rejected.
+    """
+    processor = VideoProcessor(
+        "test_video.mp4", mock_scene_detector, mock_scene_saver, sampler="foo"
+    )
+    with patch("cv2.VideoCapture") as mock_cv2_VideoCapture:
+        mock_cv2_VideoCapture.return_value.get.side_effect = lambda x: (
+            30 if x == cv2.CAP_PROP_FPS else 150
+        )
+        with pytest.raises(ValueError):
+            processor.detect_scenes()
+
+
+def write_test_video(path, frame_count=300, fps=30):
+    """
+    Writes a small video whose colour changes every 40 frames.
+
+    Args:
+        path (str): Path of the video file to write.
+        frame_count (int): Number of frames to write.
+        fps (int): Frame rate of the video.
+
+    Returns:
+        str: The path of the video file.
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (64, 48))
+    for i in range(frame_count):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        frame[:] = ((i // 40) * 50 % 256, (i * 3) % 256, 255 - (i // 40) * 30)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def write_wipe_video(path, frame_count=300, fps=30):
+    """
+    Writes a small video in which red slowly wipes over blue, so the
+    colour distribution drifts without a cut.
+
+    Args:
+        path (str): Path of the video file to write.
+        frame_count (int): Number of frames to write.
+        fps (int): Frame rate of the video.
+
+    Returns:
+        str: The path of the video file.
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (64, 48))
+    for i in range(frame_count):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        frame[:] = (255, 0, 0)
+        frame[:, : 64 * i // frame_count] = (0, 0, 255)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+@pytest.mark.parametrize("write_video", [write_test_video, write_wipe_video])
+@pytest.mark.parametrize("name", SCENE_DETECTORS)
+def test_detect_scenes_parallel_matches_sequential(tmp_path, name, write_video):
+    """
+    Test that splitting a video across processes saves the same scenes as a
+    sequential pass, for every detector the factory can build.
+    """
+    video_path = write_video(str(tmp_path / "test_video.avi"))
+    video_config = VideoProcessingConfig(scene_detector=name, num_diffs=5)
+
+    sequential_saver = MagicMock(spec=SceneSaver)
+    VideoProcessor(
+        video_path, create_scene_detector(video_config), sequential_saver
+    ).detect_scenes()
+
+    parallel_saver = MagicMock(spec=SceneSaver)
+    VideoProcessor(
+        video_path,
+        create_scene_detector(video_config),
+        parallel_saver,
+        num_workers=3,
+        parallel_min_duration=0,
+    ).detect_scenes()
+
+    sequential_scenes = [
+        call.args[0] for call in sequential_saver.save_scene.call_args_list
+    ]
+    parallel_scenes = [
+        call.args[0] for call in parallel_saver.save_scene.call_args_list
+    ]
+    if write_video is write_test_video:
+        assert len(sequential_scenes) > 0
+    assert len(parallel_scenes) == len(sequential_scenes)
+    for parallel_scene, sequential_scene in zip(parallel_scenes, sequential_scenes):
+        assert np.array_equal(parallel_scene, sequential_scene)
+
+
+def test_get_num_workers():
+    """
+    Test that short videos are always processed sequentially.
+    """
+    processor = VideoProcessor(
+        "test_video.mp4", MagicMock(), MagicMock(), num_workers=4
+    )
+    assert processor.get_num_workers(30) == 1
+    assert processor.get_num_workers(90) == 4
+
+    processor.scene_detector = HistogramSceneDetector()
+    assert processor.get_num_workers(90) == 1
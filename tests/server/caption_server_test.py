@@ -0,0 +1,112 @@
+import asyncio
+import io
+from aiohttp import FormData
+from aiohttp.test_utils import TestClient, TestServer
+from PIL import Image
+from configuration_manager.config_models import ServerConfig
+from server.caption_server import create_app
+from server.fake_models import FakeChatbot, FakeInference
+
+
+def image_form(width=32, height=16, **fields):
+    """Returns a multipart form with a PNG upload and the given fields."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, format="PNG")
+    form = FormData()
+    form.add_field("file", buffer.getvalue(), filename="image.png")
+    for key, value in fields.items():
+        form.add_field(key, str(value))
+    return form
+
+
+async def with_client(inference, scenario, **config):
+    app = create_app(inference, FakeChatbot(latency=0), ServerConfig(**config))
+    async with TestClient(TestServer(app)) as client:
+        return await scenario(client)
+
+
+def test_caption_returns_description_and_caption():
+    """Test that an upload is described and captioned."""
+
+    async def scenario(client):
+        response = await client.post("/caption", data=image_form(tone="formal"))
+        return response.status, await response.json()
+
+    status, body = asyncio.run(with_client(FakeInference(0, 0), scenario))
+
+    assert status == 200
+    assert body["description"] == "a 32x16 picture"
+    assert body["caption"].startswith("Caption for:")
+
+
+def test_concurrent_uploads_are_batched():
+    """Test that concurrent uploads reach the model as one batch."""
+    inference = FakeInference(call_latency=0, image_latency=0)
+
+    async def scenario(client):
+        responses = await asyncio.gather(
+            *(client.post("/caption", data=image_form(width=w)) for w in (8, 9, 10))
+        )
+        bodies = [await response.json() for response in responses]
+        health = await (await client.get("/health")).json()
+        return bodies, health
+
+    bodies, health = asyncio.run(
+        with_client(inference, scenario, max_batch_size=8, max_latency_ms=200.0)
+    )
+
+    assert [body["description"] for body in bodies] == [
+        "a 8x16 picture",
+        "a 9x16 picture",
+        "a 10x16 picture",
+    ]
+    assert inference.batch_sizes == [3]
+    assert health["batches"] == 1
+
+
+def test_invalid_requests_are_rejected():
+    """Test the errors for missing, undecodable and badly parameterised uploads."""
+
+    async def scenario(client):
+        missing = await client.post("/caption", data={"tone": "casual"})
+        form = FormData()
+        form.add_field("file", b"not an image", filename="image.png")
+        undecodable = await client.post("/caption", data=form)
+        bad_param = await client.post("/caption", data=image_form(num_hashtags="x"))
+        bad_variants = await client.post("/caption", data=image_form(num_variants=9))
+        return missing.status, undecodable.status, bad_param.status, bad_variants.status
+
+    statuses = asyncio.run(with_client(FakeInference(0, 0), scenario))
+
+    assert statuses == (400, 415, 400, 400)
+
+
+def test_oversized_images_are_rejected(monkeypatch):
+    """Test that a decompression bomb is a client error, not a server error."""
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 100)
+
+    async def scenario(client):
+        response = await client.post("/caption", data=image_form())
+        return response.status, await response.json()
+
+    status, body = asyncio.run(with_client(FakeInference(0, 0), scenario))
+
+    assert status == 400
+    assert body["error"] == "The image has too many pixels."
+
+
+def test_caption_variants_are_requested_in_one_prompt():
+    """Test that several variants are asked for in the prompt and returned."""
+
+    async def scenario(client):
+        response = await client.post("/caption", data=image_form(num_variants=3))
+        return response.status, await response.json()
+
+    status, body = asyncio.run(with_client(FakeInference(0, 0), scenario))
+
+    assert status == 200
+    # The fake chatbot echoes the end of the prompt, which asks for labels
+    assert body["caption"].endswith(
+        "from 1 to 3, and add nothing before the first heading."
+    )
+    assert body["variants"] == [body["caption"]]
@@ -0,0 +1,144 @@
+import asyncio
+import time
+import pytest
+from server.dynamic_batcher import DynamicBatcher, QueueFullError
+
+
+class RecordingModel:
+    """Captions images by name and records the batches it was given."""
+
+    def __init__(self, latency=0.0, error=None):
+        self.latency = latency
+        self.error = error
+        self.batches = []
+
+    def __call__(self, images):
+        self.batches.append(list(images))
+        time.sleep(self.latency)
+        if self.error:
+            raise self.error
+        return [f"caption of {image}" for image in images]
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_requests_share_a_batch():
+    """Test that requests arriving together are captioned in one call."""
+    model = RecordingModel()
+
+    async def scenario():
+        batcher = DynamicBatcher(model, max_batch_size=8, max_latency=0.2)
+        await batcher.start()
+        captions = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        await batcher.stop()
+        return captions, batcher.get_stats()
+
+    captions, stats = run(scenario())
+
+    assert captions == [f"caption of {i}" for i in range(5)]
+    assert model.batches == [[0, 1, 2, 3, 4]]
+    assert stats["batches"] == 1 and stats["mean_batch_size"] == 5
+
+
+def test_batches_respect_max_batch_size():
+    """Test that a burst is split into batches of at most max_batch_size."""
+    model = RecordingModel()
+
+    async def scenario():
+        batcher = DynamicBatcher(model, max_batch_size=3, max_latency=0.2)
+        await batcher.start()
+        captions = await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+        await batcher.stop()
+        return captions
+
+    captions = run(scenario())
+
+    assert captions == [f"caption of {i}" for i in range(7)]
+    assert [len(batch) for batch in model.batches] == [3, 3, 1]
+
+
+def test_lone_request_waits_at_most_max_latency():
+    """Test that a single request is not held back by an unfilled batch."""
+    model = RecordingModel()
+
+    async def scenario():
+        batcher = DynamicBatcher(model, max_batch_size=8, max_latency=0.05)
+        await batcher.start()
+        start = time.monotonic()
+        caption = await batcher.submit("only")
+        elapsed = time.monotonic() - start
+        await batcher.stop()
+        return caption, elapsed
+
+    caption, elapsed = run(scenario())
+
+    assert caption == "caption of only"
+    assert 0.04 <= elapsed < 1.0
+
+
+def test_full_queue_rejects_requests():
+    """Test that requests beyond max_queue_size are rejected at once."""
+    model = RecordingModel(latency=0.2)
+
+    async def scenario():
+        batcher = DynamicBatcher(
+            model, max_batch_size=1, max_latency=0, max_queue_size=1
+        )
+        await batcher.start()
+        first = asyncio.ensure_future(batcher.submit("first"))
+        await asyncio.sleep(0.05)  # first is being captioned
+        second = asyncio.ensure_future(batcher.submit("second"))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError):
+            await batcher.submit("third")
+        results = await asyncio.gather(first, second)
+        stats = batcher.get_stats()
+        await batcher.stop()
+        return results, stats
+
+    results, stats = run(scenario())
+
+    assert results == ["caption of first", "caption of second"]
+    assert stats["rejected"] == 1
+
+
+def test_model_errors_fail_the_whole_batch():
+    """Test that every request of a failed batch gets the error."""
+    model = RecordingModel(error=RuntimeError("out of memory"))
+
+    async def scenario():
+        batcher = DynamicBatcher(model, max_batch_size=4, max_latency=0.1)
+        await batcher.start()
+        results = await asyncio.gather(
+            batcher.submit("a"), batcher.submit("b"), return_exceptions=True
+        )
+        await batcher.stop()
+        return results, batcher.get_stats()
+
+    results, stats = run(scenario())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert stats["failed"] == 2
+
+
+def test_stop_fails_the_batch_being_captioned():
+    """Test that stopping mid-batch rejects in-flight and queued requests."""
+    model = RecordingModel(latency=0.2)
+
+    async def scenario():
+        batcher = DynamicBatcher(model, max_batch_size=1, max_latency=0)
+        await batcher.start()
+        running = asyncio.ensure_future(batcher.submit("running"))
+        await asyncio.sleep(0.05)  # running is being captioned
+        queued = asyncio.ensure_future(batcher.submit("queued"))
+        await asyncio.sleep(0)
+        await batcher.stop()
+        return await asyncio.wait_for(
+            asyncio.gather(running, queued, return_exceptions=True), 1
+        )
+
+    results = run(scenario())
+
+    assert [str(result) for result in results] == ["The batcher was stopped."] * 2
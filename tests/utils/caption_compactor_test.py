@@ -0,0 +1,53 @@
+from utils.caption_compactor import compact_captions, estimate_tokens
+
+
+def test_repeated_phrases_are_merged():
+    """
+    Test that the same phrase from several scenes appears once.
+    """
+    captions = [
+        "a man riding a bike on a road",
+        "A man riding a bike on the road.",
+        "a dog sitting on a couch",
+    ]
+
+    description = compact_captions(captions, token_budget=0)
+
+    assert description == "a man riding a bike on a road a dog sitting on a couch"
+
+
+def test_budget_keeps_most_frequent_phrases_in_video_order():
+    """
+    Test that the budget drops the phrases seen in the fewest scenes and
+    keeps the rest in the order of the video.
+    """
+    captions = [
+        "a red car parked on a street",
+        "people dancing at a concert",
+        "a crowd of people dancing at a concert",
+        "people dancing at a concert",
+        "a red car parked on a street",
+        "a cat sleeping",
+    ]
+
+    description = compact_captions(captions, token_budget=18, similarity=0.7)
+
+    assert description == "a red car parked on a street people dancing at a concert"
+    assert estimate_tokens(description) <= 18
+
+
+def test_oversized_phrase_is_truncated():
+    """
+    Test that a single phrase larger than the budget is cut to fit.
+    """
+    description = compact_captions(["one two three four five six seven"], 4)
+
+    assert description == "one two three"
+    assert estimate_tokens(description) <= 4
+
+
+def test_no_captions():
+    """
+    Test that a video without scenes gives an empty description.
+    """
+    assert compact_captions([]) == ""
@@ -0,0 +1,33 @@
+import pytest
+from utils.caption_variants import MAX_VARIANTS, parse_variants, variant_instructions
+
+
+def test_variant_instructions():
+    """Test that only several variants add instructions to the prompt."""
+    assert variant_instructions(1) == ""
+    assert "Write 3 clearly different versions" in variant_instructions(3)
+    assert "### Variant N" in variant_instructions(3)
+    for num_variants in (0, MAX_VARIANTS + 1):
+        with pytest.raises(ValueError):
+            variant_instructions(num_variants)
+
+
+def test_parse_variants_splits_on_headings():
+    """Test that labelled captions are split and stripped."""
+    text = (
+        "### Variant 1\nSun and sand #beach\n\n"
+        "### variant 2:\nGolden hour #sunset\n"
+        "## Variant 3\nWaves all day #surf"
+    )
+
+    assert parse_variants(text) == [
+        "Sun and sand #beach",
+        "Golden hour #sunset",
+        "Waves all day #surf",
+    ]
+
+
+def test_parse_variants_without_headings():
+    """Test that an unlabelled response is a single caption."""
+    assert parse_variants("  Just one caption #one \n") == ["Just one caption #one"]
+    assert parse_variants("") == []
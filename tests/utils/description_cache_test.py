@@ -0,0 +1,28 @@
+from utils.description_cache import VisualDescriptionCache
+
+
+def test_least_recently_used_entry_is_dropped():
+    """
+    Test that a lookup refreshes an entry and the oldest one is dropped.
+    """
+    cache = VisualDescriptionCache(max_entries=2)
+    cache.set(("a", "Blip2Model"), "first")
+    cache.set(("b", "Blip2Model"), "second")
+    assert cache.get(("a", "Blip2Model")) == "first"
+
+    cache.set(("c", "Blip2Model"), "third")
+
+    assert len(cache) == 2
+    assert cache.get(("b", "Blip2Model")) is None
+    assert cache.get(("a", "Blip2Model")) == "first"
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_model_is_part_of_the_key():
+    """
+    Test that another model does not reuse a description.
+    """
+    cache = VisualDescriptionCache()
+    cache.set(("a", "Blip2Model"), "first")
+
+    assert cache.get(("a", "LlavaModel")) is None
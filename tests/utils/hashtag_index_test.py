@@ -0,0 +1,78 @@
+from utils.hashtag_index import HashtagIndex, extract_hashtags, extract_keywords
+
+
+def test_extract_keywords_and_hashtags():
+    """Test that hashtags are kept apart from the caption keywords."""
+    caption = "Sunset at the Beach with my dog #Sunset #beachlife #sunset"
+
+    assert extract_keywords(caption) == ["sunset", "beach", "dog"]
+    assert extract_hashtags(caption) == ["#sunset", "#beachlife"]
+
+
+def test_suggest_from_keywords():
+    """Test that hashtags are suggested for captions with shared keywords."""
+    index = HashtagIndex()
+    index.add_caption("Golden sunset over the beach #sunset #goldenhour")
+    index.add_caption("Beach volleyball with friends #beach #summer")
+    index.add_caption("Morning coffee #coffee")
+
+    suggestions = index.suggest("Waves rolling onto the beach at sunset", 3)
+
+    # Both captions mention the beach, only the first one the sunset
+    assert suggestions == ["#sunset", "#goldenhour", "#beach"]
+    assert index.suggest("Nothing in common", 3) == []
+
+
+def test_suggest_from_cooccurring_hashtags():
+    """Test that hashtags seen together with existing ones are suggested."""
+    index = HashtagIndex()
+    index.add_caption("Lunch #food #foodie #yummy")
+    index.add_caption("Dinner #food #foodie")
+
+    assert index.suggest("Something tasty #food", 2) == ["#foodie", "#yummy"]
+    assert index.suggest("Something tasty #food", 2, exclude=["#foodie"]) == ["#yummy"]
+
+
+def test_single_shared_word_is_not_enough():
+    """Test that a hashtag needs more than one unrelated shared keyword."""
+    index = HashtagIndex()
+    index.add_caption("Best day at the beach with my dog #dog #beach #puppylove")
+
+    assert index.suggest("The best plate of sushi", 3) == []
+    assert index.suggest("A dog running on the beach", 3) == [
+        "#dog",
+        "#beach",
+        "#puppylove",
+    ]
+
+
+def test_index_is_rebuilt_from_its_file(tmp_path):
+    """Test that added captions survive a restart and plain captions are skipped."""
+    path = str(tmp_path / "hashtags.jsonl")
+    index = HashtagIndex(path)
+
+    assert index.add_caption("Hiking the mountains #hiking #outdoors")
+    assert not index.add_caption("A caption without hashtags")
+
+    reloaded = HashtagIndex.load(path)
+    assert len(reloaded) == 1
+    assert reloaded.suggest("Snowy mountains for hiking", 1) == ["#hiking"]
+
+
+def test_index_file_is_compacted_on_load(tmp_path):
+    """Test that only the newest captions are kept and written back."""
+    path = tmp_path / "hashtags.jsonl"
+    index = HashtagIndex(str(path))
+    for number in range(5):
+        index.add_caption(f"Caption number {number} #tag{number}")
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("not json\n")
+
+    reloaded = HashtagIndex.load(str(path), max_captions=2)
+
+    assert len(reloaded) == 2
+    assert path.read_text(encoding="utf-8").splitlines() == [
+        '{"caption": "Caption number 3 #tag3"}',
+        '{"caption": "Caption number 4 #tag4"}',
+    ]
+    assert len(HashtagIndex.load(str(path), max_captions=2)) == 2
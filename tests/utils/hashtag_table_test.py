@@ -0,0 +1,26 @@
+from utils.hashtag_table import HashtagTable
+
+
+def test_suggest_ranks_shared_hashtags_first():
+    """Test that hashtags suggested by several keywords come first."""
+    table = HashtagTable(
+        {"beach": ["#beach", "#summer"], "sunset": ["#sunset", "#summer"]}
+    )
+
+    assert table.suggest("A sunset over the beach", 3) == [
+        "#summer",
+        "#sunset",
+        "#beach",
+    ]
+
+
+def test_suggest_matches_plurals_and_respects_exclusions():
+    """Test that plural keywords match and excluded hashtags are skipped."""
+    table = HashtagTable({"dog": ["#dog", "#pets"]})
+
+    assert table.suggest("Two dogs playing", 5, exclude=["#Dog"]) == ["#pets"]
+
+
+def test_suggest_without_keywords_returns_nothing():
+    """Test that a text without known keywords gets no suggestions."""
+    assert HashtagTable().suggest("Lorem ipsum", 5) == []
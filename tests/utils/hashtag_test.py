@@ -0,0 +1,96 @@
+from unittest.mock import MagicMock
+from utils.hashtag import Hashtag
+from utils.hashtag_index import HashtagIndex
+from utils.hashtag_table import HashtagTable
+
+TABLE = HashtagTable({"beach": ["#beach", "#summer", "#ocean"]})
+
+
+def test_hashtags_come_from_a_single_llm_call():
+    """Test that all missing hashtags are requested in one call."""
+    chatbot = MagicMock()
+    chatbot.get_json_response.return_value = {
+        "hashtags": ["#Sand", "sea side", "#travel", "#sand"]
+    }
+    hashtag = Hashtag("Fun at the beach #travel", chatbot, TABLE)
+
+    caption = hashtag.generate_hashtagged_caption(3)
+
+    chatbot.get_json_response.assert_called_once()
+    chatbot.get_response.assert_not_called()
+    assert caption == "Fun at the beach\n\n#travel #Sand #seaside"
+
+
+def test_offline_table_fills_in_when_llm_fails():
+    """Test that the keyword table is used if the LLM call fails."""
+    chatbot = MagicMock()
+    chatbot.get_json_response.side_effect = ValueError("not JSON")
+    hashtag = Hashtag("Fun at the beach #beach", chatbot, TABLE)
+
+    assert hashtag.generate_hashtagged_caption(3) == (
+        "Fun at the beach\n\n#beach #summer #ocean"
+    )
+
+
+def test_offline_table_tops_up_short_llm_answers():
+    """Test that a short LLM answer is completed from the keyword table."""
+    chatbot = MagicMock()
+    chatbot.get_json_response.return_value = ["#waves"]
+    hashtag = Hashtag("A day at the beach", chatbot, TABLE)
+
+    assert hashtag.generate_additional_hashtags([], 3) == [
+        "#waves",
+        "#beach",
+        "#summer",
+    ]
+
+
+def test_no_chatbot_uses_only_the_table():
+    """Test that hashtags can be generated without a chatbot."""
+    hashtag = Hashtag("A day at the beach", None, TABLE)
+
+    assert hashtag.generate_additional_hashtags([], 1) == ["#beach"]
+
+
+def test_hashtag_index_avoids_the_llm_call():
+    """Test that the LLM is not called when the index fills every slot."""
+    index = HashtagIndex()
+    index.add_caption("Sunny beach day #beachday #sunshine")
+    chatbot = MagicMock()
+    hashtag = Hashtag("A day at the beach", chatbot, TABLE, index)
+
+    assert sorted(hashtag.generate_additional_hashtags([], 2)) == [
+        "#beachday",
+        "#sunshine",
+    ]
+    chatbot.get_json_response.assert_not_called()
+
+
+def test_llm_is_only_asked_for_the_remaining_slots():
+    """Test that the LLM call only covers what the index could not fill."""
+    index = HashtagIndex()
+    index.add_caption("Sunny beach day #beachday")
+    chatbot = MagicMock()
+    chatbot.get_json_response.return_value = {"hashtags": ["#waves", "#sand"]}
+    hashtag = Hashtag("A day at the beach", chatbot, TABLE, index)
+
+    assert hashtag.generate_additional_hashtags([], 3) == [
+        "#beachday",
+        "#waves",
+        "#sand",
+    ]
+    prompt = chatbot.get_json_response.call_args.args[0]
+    assert prompt.startswith("Suggest 2 relevant hashtags")
+
+
+def test_missing_hashtags_only_cover_the_shortfall():
+    """Test that a caption with enough hashtags needs no suggestions."""
+    chatbot = MagicMock()
+    chatbot.get_json_response.return_value = {"hashtags": ["#waves", "#sand"]}
+
+    assert Hashtag("Beach #a #b", chatbot, TABLE).generate_missing_hashtags(2) == []
+    chatbot.get_json_response.assert_not_called()
+    assert Hashtag("Beach #a", chatbot, TABLE).generate_missing_hashtags(2) == [
+        "#waves"
+    ]
+    assert "Post: Beach" in chatbot.get_json_response.call_args.args[0]
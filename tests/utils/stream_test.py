@@ -0,0 +1,46 @@
+import asyncio
+from unittest.mock import patch
+from utils.stream import stream_text
+
+
+def chunks(*texts):
+    return [{"message": {"content": text}} for text in texts]
+
+
+async def async_chunks(*texts):
+    for chunk in chunks(*texts):
+        yield chunk
+
+
+@patch("utils.stream.st")
+def test_stream_text_accepts_async_streams(mock_st):
+    """Test that async streams are displayed in full."""
+    asyncio.run(stream_text(async_chunks("Hello", ", ", "world")))
+
+    placeholder = mock_st.empty.return_value
+    placeholder.success.assert_called_once_with("Hello, world")
+
+
+@patch("utils.stream.st")
+def test_stream_text_shows_first_chunk_and_throttles_the_rest(mock_st):
+    """
+    Test that the first chunk is displayed at once and later chunks wait
+    for the flush interval.
+    """
+    asyncio.run(stream_text(chunks("a", "b", "c"), flush_interval=60))
+
+    placeholder = mock_st.empty.return_value
+    placeholder.markdown.assert_called_once_with("a", unsafe_allow_html=True)
+    placeholder.success.assert_called_once_with("abc")
+
+
+@patch("utils.stream.st")
+def test_stream_text_flushes_every_chunk_without_interval(mock_st):
+    """Test that a zero flush interval updates the display for every chunk."""
+    asyncio.run(stream_text(chunks("a", "b"), flush_interval=0))
+
+    placeholder = mock_st.empty.return_value
+    assert [call.args[0] for call in placeholder.markdown.call_args_list] == [
+        "a",
+        "ab",
+    ]
@@ -0,0 +1,65 @@
+import os
+from utils.file_hash import compute_file_hash
+from utils.video_cache import VideoCaptionCache
+
+
+def test_file_hash_streams_in_chunks(tmp_path):
+    """
+    Test that the hash does not depend on the chunk size.
+    """
+    path = tmp_path / "video.mp4"
+    path.write_bytes(os.urandom(10_000))
+
+    assert compute_file_hash(str(path), chunk_size=7) == compute_file_hash(str(path))
+
+
+def test_key_depends_on_settings():
+    """
+    Test that different detector settings give different keys.
+    """
+    first = VideoCaptionCache.make_key("abc", {"scene_detector": "mean_diff"})
+    second = VideoCaptionCache.make_key("abc", {"scene_detector": "histogram"})
+
+    assert first != second
+    assert first == VideoCaptionCache.make_key("abc", {"scene_detector": "mean_diff"})
+
+
+def test_set_and_get(tmp_path):
+    """
+    Test that stored scenes are returned and unknown keys miss.
+    """
+    cache = VideoCaptionCache(str(tmp_path))
+    scenes = [{"timestamp": 1.5, "caption": "a beach"}]
+
+    cache.set("key", scenes)
+
+    assert cache.get("key") == scenes
+    assert cache.get("other") is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    """
+    Test that an unreadable entry is treated as missing.
+    """
+    (tmp_path / "key.json").write_text("{not json")
+
+    assert VideoCaptionCache(str(tmp_path)).get("key") is None
+
+
+def test_oldest_entries_are_evicted(tmp_path):
+    """
+    Test that only the most recently used entries are kept.
+    """
+    cache = VideoCaptionCache(str(tmp_path), max_entries=2)
+    for index, key in enumerate(("first", "second", "third")):
+        cache.set(key, [])
+        path = tmp_path / f"{key}.json"
+        os.utime(path, (index, index))
+
+    cache.set("fourth", [])
+
+    assert cache.get("first") is None
+    assert cache.get("second") is None
+    assert cache.get("third") == []
+    assert cache.get("fourth") == []
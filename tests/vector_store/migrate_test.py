@@ -0,0 +1,40 @@
+import uuid
+from types import SimpleNamespace
+import chromadb
+import torch
+from vector_store.migrate import migrate_legacy_collections
+
+
+def test_legacy_collection_is_migrated_once():
+    """Test that raw entries are copied to the compact collection and missing ones skipped."""
+    chroma_client = chromadb.EphemeralClient()
+    source_name, target_name = f"raw_{uuid.uuid4().hex}", f"compact_{uuid.uuid4().hex}"
+    tensor = torch.rand(1, 3, 4, 4)
+    chroma_client.create_collection(source_name).add(
+        ids=["unique123"],
+        embeddings=[tensor.flatten().tolist()],
+        metadatas=[
+            {"caption": "a caption", "image_tensor_shape": str(tuple(tensor.shape))}
+        ],
+    )
+    chroma_db_config = SimpleNamespace(blip=target_name, embedding_size=2)
+
+    migrated = migrate_legacy_collections(
+        chroma_client, chroma_db_config, ["blip2"], source=source_name
+    )
+    rerun = migrate_legacy_collections(
+        chroma_client, chroma_db_config, ["blip2"], source=source_name
+    )
+    missing = migrate_legacy_collections(
+        chroma_client, chroma_db_config, ["blip2"], source=f"missing_{uuid.uuid4().hex}"
+    )
+
+    assert migrated == {"blip2": 1}
+    assert rerun == {"blip2": 0}
+    assert missing == {}
+    target = chroma_client.get_collection(target_name).get(
+        include=["embeddings", "metadatas"]
+    )
+    assert len(target["embeddings"][0]) == 3 * 2 * 2
+    assert target["metadatas"][0]["embedding_mode"] == "compact"
+    assert target["metadatas"][0]["caption"] == "a caption"
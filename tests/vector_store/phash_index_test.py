@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import MagicMock
+from PIL import Image, ImageDraw, ImageEnhance
+from vector_store.phash_index import (
+    PerceptualHashIndex,
+    compute_dhash,
+    hamming_distance,
+    is_informative_hash,
+)
+
+
+@pytest.fixture
+def image():
+    """
+    Creates a synthetic image with enough structure to produce a meaningful hash.
+
+    Returns:
+        PIL.Image.Image: A 640x480 RGB image.
+    """
+    image = Image.new("RGB", (640, 480), (30, 60, 90))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((80, 60, 300, 260), fill=(220, 200, 40))
+    draw.ellipse((350, 180, 600, 420), fill=(200, 40, 60))
+    draw.line((0, 479, 639, 0), fill=(255, 255, 255), width=12)
+    return image
+
+
+def test_dhash_survives_resize_and_filters(image):
+    """
+    Test that resized and colour-filtered copies stay within a small distance.
+    """
+    original_hash = compute_dhash(image)
+    resized_hash = compute_dhash(image.resize((320, 240)))
+    filtered_hash = compute_dhash(ImageEnhance.Brightness(image).enhance(1.3))
+
+    assert hamming_distance(original_hash, resized_hash) <= 6
+    assert hamming_distance(original_hash, filtered_hash) <= 6
+    assert original_hash < 2**64
+
+
+def test_dhash_differs_for_different_images(image):
+    """
+    Test that an unrelated image is far away from the original.
+    """
+    other = image.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+
+    assert hamming_distance(compute_dhash(image), compute_dhash(other)) > 6
+
+
+def test_flat_images_are_not_informative(image):
+    """
+    Test that flat images, which all hash to 0, are told apart from
+    structured ones.
+    """
+    black = Image.new("RGB", (640, 480), "black")
+    blue = Image.new("RGB", (640, 480), (20, 40, 200))
+
+    assert compute_dhash(black) == compute_dhash(blue) == 0
+    assert not is_informative_hash(compute_dhash(black))
+    assert not is_informative_hash(2**64 - 1)
+    assert is_informative_hash(compute_dhash(image))
+
+
+def test_index_finds_closest_match():
+    """
+    Test that the BK-tree returns the closest hash within the distance limit.
+    """
+    index = PerceptualHashIndex()
+    index.add(0b0000, "zero")
+    index.add(0b0111, "three bits")
+    index.add(0b1111, "four bits")
+
+    assert index.find(0b0001, max_distance=2) == ("zero", 1)
+    assert index.find(0b1111, max_distance=0) == ("four bits", 0)
+    assert index.find(0b1111 << 8, max_distance=2) is None
+    assert len(index) == 3
+
+
+def test_index_from_collection():
+    """
+    Test that the index is rebuilt from the dhash metadata of a collection.
+    """
+    collection = MagicMock()
+    collection.get.side_effect = [
+        {
+            "ids": ["a", "b"],
+            "metadatas": [
+                {"caption": "hashed", "dhash": "000000000000000f"},
+                {"caption": "legacy entry without hash"},
+            ],
+        },
+        {"ids": [], "metadatas": []},
+    ]
+
+    index = PerceptualHashIndex.from_collection(collection)
+
+    assert len(index) == 1
+    assert index.find(0xF, max_distance=0) == ("hashed", 0)
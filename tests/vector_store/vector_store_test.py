@@ -0,0 +1,135 @@
+import pytest
+import torch
+from unittest.mock import MagicMock
+from vector_store.vector_store import (
+    add_image_to_chroma,
+    add_images_to_chroma,
+    get_compact_embedding,
+    get_max_batch_size,
+    get_reconstructed_flattened_input_tensor,
+    migrate_collection_embeddings,
+)
+
+
+@pytest.fixture
+def image_tensor():
+    """
+    Creates a preprocessed image tensor shaped like the BLIP2 pixel values.
+
+    Returns:
+        torch.Tensor: A (1, 3, 224, 224) float16 tensor.
+    """
+    torch.manual_seed(0)
+    return torch.rand(1, 3, 224, 224, dtype=torch.float16)
+
+
+def test_compact_embedding_is_small_and_normalised(image_tensor):
+    """
+    Test that the compact embedding has a fixed size and unit length.
+    """
+    embedding = get_compact_embedding(image_tensor, embedding_size=16)
+
+    assert len(embedding) == 3 * 16 * 16
+    assert abs(sum(value * value for value in embedding) - 1.0) < 1e-4
+
+
+def test_add_image_to_chroma_stores_compact_embedding(image_tensor):
+    """
+    Test that add_image_to_chroma writes the compact embedding and shape metadata.
+    """
+    collection = MagicMock()
+    collection.get.return_value = {"ids": []}
+
+    add_image_to_chroma(collection, "unique123", image_tensor, "a caption")
+
+    kwargs = collection.add.call_args.kwargs
+    assert kwargs["ids"] == ["unique123"]
+    assert len(kwargs["embeddings"][0]) == 768
+    assert kwargs["metadatas"][0] == {
+        "caption": "a caption",
+        "image_tensor_shape": "(1, 3, 224, 224)",
+        "embedding_mode": "compact",
+    }
+
+
+def test_reconstruct_legacy_shape_string():
+    """
+    Test that the torch.Size shape strings written by older versions can be parsed.
+    """
+    tensor = get_reconstructed_flattened_input_tensor(
+        list(range(12)), "torch.Size([1, 3, 2, 2])"
+    )
+
+    assert tensor.shape == (1, 3, 2, 2)
+
+
+def test_migrate_collection_embeddings(image_tensor):
+    """
+    Test that raw entries are pooled into the target collection and reruns skip them.
+    """
+    source = MagicMock()
+    source.get.side_effect = [
+        {
+            "ids": ["unique123"],
+            "embeddings": [image_tensor.flatten().tolist()],
+            "metadatas": [
+                {
+                    "caption": "a caption",
+                    "image_tensor_shape": "torch.Size([1, 3, 224, 224])",
+                }
+            ],
+        },
+        {"ids": [], "embeddings": [], "metadatas": []},
+    ]
+    target = MagicMock()
+    target.get.return_value = {"ids": []}
+    chroma_client = MagicMock()
+    chroma_client.get_collection.return_value = source
+    chroma_client.create_collection.return_value = target
+
+    migrated = migrate_collection_embeddings(chroma_client, "raw", "compact")
+
+    assert migrated == 1
+    kwargs = target.add.call_args.kwargs
+    assert kwargs["ids"] == ["unique123"]
+    assert len(kwargs["embeddings"][0]) == 768
+    assert kwargs["metadatas"][0]["embedding_mode"] == "compact"
+    assert kwargs["metadatas"][0]["caption"] == "a caption"
+
+
+def test_add_images_to_chroma_deduplicates_and_chunks(image_tensor):
+    """
+    Test that repeated and existing ids are skipped and writes are chunked.
+    """
+    collection = MagicMock()
+    collection.get.side_effect = lambda ids, include: {
+        "ids": [unique_id for unique_id in ids if unique_id == "known"]
+    }
+    entries = [
+        ("a", image_tensor, "caption a"),
+        ("b", image_tensor, "caption b", 15),
+        ("a", image_tensor, "repeated a"),
+        ("known", image_tensor, "caption known"),
+        ("c", image_tensor, "caption c"),
+    ]
+
+    written = add_images_to_chroma(collection, entries, max_batch_size=2)
+
+    assert written == 3
+    assert collection.get.call_count == 2
+    upserted_ids = [call.kwargs["ids"] for call in collection.upsert.call_args_list]
+    assert upserted_ids == [["a", "b"], ["c"]]
+    first_metadatas = collection.upsert.call_args_list[0].kwargs["metadatas"]
+    assert first_metadatas[0]["caption"] == "caption a"
+    assert first_metadatas[1]["dhash"] == "000000000000000f"
+
+
+def test_max_batch_size_comes_from_the_client():
+    """Test that the limit is read from the client, with a fallback."""
+    chroma_client = MagicMock()
+    chroma_client.get_max_batch_size.return_value = 41
+
+    assert get_max_batch_size(chroma_client) == 41
+
+    chroma_client.get_max_batch_size.side_effect = RuntimeError("not supported")
+    assert get_max_batch_size(chroma_client, default=7) == 7
@@ -0,0 +1,145 @@
+import gc
+import threading
+import weakref
+import torch
+from unittest.mock import MagicMock
+from vector_store import write_behind
+from vector_store.write_behind import ChromaWriteBehindQueue
+
+
+def make_collection(existing_ids=()):
+    """
+    Creates a mock chroma collection that already contains `existing_ids`.
+
+    Args:
+        existing_ids (tuple): Ids reported as present by `collection.get`.
+
+    Returns:
+        MagicMock: The mock collection.
+    """
+    collection = MagicMock()
+    collection.get.side_effect = lambda ids, include: {
+        "ids": [unique_id for unique_id in ids if unique_id in existing_ids]
+    }
+    return collection
+
+
+def test_entries_are_written_in_one_batch():
+    """
+    Test that queued entries end up in a single upsert call, skipping known and repeated ids.
+    """
+    collection = make_collection(existing_ids=("known",))
+    write_queue = ChromaWriteBehindQueue(collection, batch_size=10, flush_interval=5)
+    tensor = torch.rand(1, 3, 32, 32)
+
+    for unique_id in ("a", "b", "known", "a"):
+        write_queue.submit(unique_id, tensor, f"caption {unique_id}", image_hash=15)
+    write_queue.close()
+
+    collection.upsert.assert_called_once()
+    kwargs = collection.upsert.call_args.kwargs
+    assert kwargs["ids"] == ["a", "b"]
+    assert kwargs["metadatas"][0]["dhash"] == "000000000000000f"
+    stats = write_queue.get_stats()
+    assert stats["enqueued"] == 4
+    assert stats["written"] == 2
+    assert stats["skipped"] == 2
+    assert stats["batches"] == 1
+    assert stats["depth"] == 0
+
+
+def test_submit_does_not_wait_for_the_database():
+    """
+    Test that submit returns while the collection is still busy and flush waits for it.
+    """
+    release = threading.Event()
+    collection = make_collection()
+    collection.upsert.side_effect = lambda **kwargs: release.wait(5)
+    write_queue = ChromaWriteBehindQueue(collection, batch_size=1, flush_interval=0)
+
+    write_queue.submit("a", torch.rand(1, 3, 8, 8), "caption")
+    assert write_queue.get_stats()["written"] == 0
+
+    release.set()
+    write_queue.flush()
+    assert write_queue.get_stats()["written"] == 1
+    write_queue.close()
+
+
+def test_failed_batches_are_counted():
+    """
+    Test that a database error is logged and counted instead of killing the worker.
+    """
+    collection = make_collection()
+    collection.upsert.side_effect = [RuntimeError("database is locked"), None]
+    write_queue = ChromaWriteBehindQueue(collection, batch_size=1, flush_interval=0)
+
+    write_queue.submit("a", torch.rand(1, 3, 8, 8), "caption")
+    write_queue.flush()
+    write_queue.submit("b", torch.rand(1, 3, 8, 8), "caption")
+    write_queue.close()
+
+    stats = write_queue.get_stats()
+    assert stats["failed"] == 1
+    assert stats["written"] == 1
+
+
+def test_exit_hook_closes_open_queues_without_keeping_them_alive():
+    """
+    Test that open queues are flushed at exit while unreferenced ones can be collected.
+    """
+    collection = make_collection()
+    write_queue = ChromaWriteBehindQueue(collection, batch_size=10, flush_interval=5)
+    write_queue.submit("a", torch.rand(1, 3, 8, 8), "caption")
+
+    write_behind._close_open_queues()
+
+    assert write_queue.get_stats()["written"] == 1
+    unused_queue = weakref.ref(ChromaWriteBehindQueue(make_collection()))
+    closed_queue = weakref.ref(write_queue)
+    del write_queue
+    gc.collect()
+    assert unused_queue() is None
+    assert closed_queue() is None
+
+
+def test_submit_after_close_writes_directly():
+    """
+    Test that a closed queue never starts a new worker and still stores entries.
+    """
+    collection = make_collection()
+    write_queue = ChromaWriteBehindQueue(collection, batch_size=10, flush_interval=5)
+    write_queue.close()
+
+    write_queue.submit("a", torch.rand(1, 3, 8, 8), "caption")
+
+    assert write_queue._worker is None
+    assert collection.upsert.call_args.kwargs["ids"] == ["a"]
+    assert write_queue.get_stats()["written"] == 1
+
+
+def test_close_waits_for_a_blocked_submit():
+    """
+    Test that an entry whose submit is blocked on a full queue is still written by close.
+    """
+    release = threading.Event()
+    collection = make_collection()
+    collection.upsert.side_effect = lambda **kwargs: release.wait(5)
+    write_queue = ChromaWriteBehindQueue(
+        collection, max_queue_size=1, batch_size=1, flush_interval=0
+    )
+    write_queue.submit("a", torch.rand(1, 3, 8, 8), "caption")
+    write_queue.submit("b", torch.rand(1, 3, 8, 8), "caption")
+    blocked = threading.Thread(
+        target=write_queue.submit, args=("c", torch.rand(1, 3, 8, 8), "caption")
+    )
+    blocked.start()
+    closer = threading.Thread(target=write_queue.close)
+    closer.start()
+
+    release.set()
+    blocked.join(5)
+    closer.join(5)
+
+    assert not closer.is_alive()
+    assert write_queue.get_stats()["written"] == 3